@@ -1,6 +1,12 @@
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
+from common.logger import logger
+from config.settings import settings
 from modules.department.router import router as department_router
 from modules.employee.router import router as employee_router
 from modules.jd.router import router as jd_router
@@ -12,9 +18,33 @@ from modules.ai_qa.router import router as ai_qa_router
 from modules.task.router import router as task_router
 # 新增能力管理路由
 from modules.capability.router import router as capability_router
+from modules.capability.skill_matrix import skill_matrix
+from utils.candidate_ranking import candidate_ranking
+from utils.parse_executor import parse_executor
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 同步接口（def）和 run_in_threadpool 都在 anyio 线程池中执行数据库操作，
+    # 按配置调整线程池大小，使其与数据库连接池匹配
+    anyio.to_thread.current_default_thread_limiter().total_tokens = (
+        settings.DB_THREADPOOL_SIZE
+    )
+    # 预先构建员工技能矩阵，失败时在首次查询时再构建
+    try:
+        await run_in_threadpool(skill_matrix.build)
+    except Exception as e:
+        logger.error(f"构建员工技能矩阵失败: {e}")
+    yield
+    parse_executor.shutdown()
+    candidate_ranking.shutdown()
+
 
 app = FastAPI(
-    title="AI HR 后端服务", description="AI HR 简历管理系统后端API", version="1.0.0"
+    title="AI HR 后端服务",
+    description="AI HR 简历管理系统后端API",
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # 添加CORS中间件，允许前端访问
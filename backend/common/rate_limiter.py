@@ -0,0 +1,43 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    异步令牌桶限流器
+
+    rate_per_minute 为每分钟补充的令牌数，小于等于0时不限流；
+    等待令牌时持有锁，保证调用方按先来后到的顺序获得令牌
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    async def acquire(self, amount: float = 1):
+        """获取指定数量的令牌，令牌不足时等待补充"""
+        if not self.enabled:
+            return
+        # 单次请求超过桶容量时按桶容量计，避免永远等不到
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= amount
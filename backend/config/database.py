@@ -1,13 +1,24 @@
-from sqlalchemy import create_engine
+from collections import defaultdict
+from itertools import chain
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from common.logger import logger
 from config.settings import settings
 
 # 创建数据库引擎
+# 连接池大小与数据库工作线程数（DB_THREADPOOL_SIZE）相匹配，
+# 避免线程拿不到连接而排队
 engine = create_engine(
-    settings.DATABASE_URL, pool_pre_ping=True, pool_recycle=3600, echo=settings.DEBUG
+    settings.DATABASE_URL,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    echo=settings.DEBUG,
 )
 
 # 创建会话工厂
@@ -26,8 +37,82 @@ def get_db():
         db.close()
 
 
+# 数据表变更回调：表名 -> 回调列表
+_table_listeners: Dict[str, List[Callable[[], None]]] = defaultdict(list)
+
+
+def register_table_listener(table_name: str, callback: Callable[[], None]):
+    """
+    注册数据表变更回调，在写入过该表的事务提交后触发
+    用于让进程内的索引、缓存在数据变更后失效
+    """
+    _table_listeners[table_name].append(callback)
+
+
+def mark_tables_synced(session: Session, *table_names: str):
+    """
+    声明本事务对这些表的写入已由调用方增量同步到进程内索引，提交时不再触发这些表的变更回调
+    只用于单行写入后紧接着增量更新的场景，同一事务中的批量写入也会被一并跳过
+    """
+    session.info.setdefault("synced_tables", set()).update(table_names)
+
+
+def _mark_changed_tables(session: Session, table_names):
+    session.info.setdefault("changed_tables", set()).update(table_names)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    # after_flush 时 new/dirty/deleted 仍保留本次flush前的状态
+    _mark_changed_tables(
+        session,
+        (
+            obj.__tablename__
+            for obj in chain(session.new, session.dirty, session.deleted)
+            if hasattr(obj, "__tablename__")
+        ),
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_tables(orm_execute_state):
+    # query.update()/query.delete() 等批量写入不经过flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _mark_changed_tables(orm_execute_state.session, [mapper.local_table.name])
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_table_listeners(session):
+    changed_tables = session.info.pop("changed_tables", None)
+    synced_tables = session.info.pop("synced_tables", set())
+    if not changed_tables:
+        return
+    for table_name in changed_tables - synced_tables:
+        for callback in _table_listeners.get(table_name, ()):
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"数据表变更回调执行失败 {table_name}: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_tables(session):
+    session.info.pop("changed_tables", None)
+    session.info.pop("synced_tables", None)
+
+
 def init_db():
-    from models import OKR, Department, Employee, JobDescription, Resume
+    from models import (
+        OKR,
+        Department,
+        Employee,
+        EvaluationPlan,
+        JobDescription,
+        Resume,
+        ResumeJDScore,
+    )
 
     logger.info(f"init db, url: {engine.url}")
     Base.metadata.create_all(bind=engine)
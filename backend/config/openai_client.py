@@ -1,7 +1,114 @@
-from openai import OpenAI
+import asyncio
+import random
+from typing import Any, AsyncIterator, Dict, List
 
+import httpx
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    AsyncOpenAI,
+    RateLimitError,
+)
+
+from common.logger import logger
+from common.rate_limiter import TokenBucket
 from config.settings import settings
 
-openai_client = OpenAI(
-    api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL
+# 复用连接的异步客户端，重试由 chat_completion 统一处理
+async_openai_client = AsyncOpenAI(
+    api_key=settings.OPENAI_API_KEY,
+    base_url=settings.OPENAI_BASE_URL,
+    max_retries=0,
+    http_client=httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=10.0),
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=60.0,
+        ),
+    ),
 )
+
+# 全局限流：每分钟请求数、每分钟token数
+request_limiter = TokenBucket(settings.OPENAI_RPM_LIMIT)
+token_limiter = TokenBucket(settings.OPENAI_TPM_LIMIT)
+
+# 未指定 max_tokens 时，按此值预估输出token数
+DEFAULT_COMPLETION_TOKENS = 1000
+
+
+def _estimate_tokens(messages: List[Dict[str, Any]], max_tokens: int) -> int:
+    """粗略估算一次请求消耗的token数（中文约每字一个token，按字符数计偏保守）"""
+    prompt_tokens = sum(len(str(message.get("content") or "")) for message in messages)
+    return prompt_tokens + max_tokens
+
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    """指数退避 + 全抖动，429 时优先使用服务端返回的 Retry-After"""
+    if isinstance(error, APIStatusError):
+        retry_after = error.response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after) + random.uniform(0, 1)
+            except ValueError:
+                pass
+    backoff = min(
+        settings.OPENAI_RETRY_MAX_DELAY, settings.OPENAI_RETRY_BASE_DELAY * 2**attempt
+    )
+    return random.uniform(0, backoff)
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (RateLimitError, APIConnectionError, APITimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+async def chat_completion(**kwargs):
+    """
+    带全局限流和抖动重试的 chat.completions.create
+
+    参数与 OpenAI SDK 一致，未指定 model 时使用配置的默认模型；
+    stream=True 时返回异步流，只对建立请求的过程重试
+    """
+    kwargs.setdefault("model", settings.OPENAI_MODEL)
+    estimated_tokens = _estimate_tokens(
+        kwargs.get("messages", []),
+        kwargs.get("max_tokens") or DEFAULT_COMPLETION_TOKENS,
+    )
+
+    attempt = 0
+    while True:
+        await request_limiter.acquire()
+        await token_limiter.acquire(estimated_tokens)
+        try:
+            return await async_openai_client.chat.completions.create(**kwargs)
+        except Exception as e:
+            if not _is_retryable(e) or attempt >= settings.OPENAI_MAX_RETRIES:
+                raise
+            delay = _retry_delay(attempt, e)
+            logger.warning(
+                f"大模型请求失败，{delay:.1f}s 后重试（第{attempt + 1}次）: {e}"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+async def stream_chat_completion(**kwargs) -> AsyncIterator[str]:
+    """
+    流式调用大模型，逐段产出回答文本（delta.content）
+
+    参数与 chat_completion 一致；迭代结束、出错或调用方取消（如客户端断开连接）时
+    关闭上游响应，不再继续生成
+    """
+    stream = await chat_completion(stream=True, **kwargs)
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                yield content
+    finally:
+        await stream.close()
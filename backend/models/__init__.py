@@ -1,6 +1,6 @@
 # 数据库模型包初始化文件
 from models.department import Department
 from models.employee import Employee
-from models.jd import JobDescription
+from models.jd import EvaluationPlan, JobDescription
 from models.okr import OKR
-from models.resume import Resume
+from models.resume import JDScoreState, Resume, ResumeJDScore
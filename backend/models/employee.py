@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import Column, DateTime, Index, Integer, String
 from sqlalchemy.sql import func
 
 from config.database import Base
@@ -24,3 +24,8 @@ class Employee(Base, ToDictMixin):
     updated_at = Column(
         DateTime, default=func.now(), onupdate=func.now(), comment="更新时间"
     )
+
+    # AI问答按部门、状态过滤并按ID游标分页
+    __table_args__ = (
+        Index("ix_employees_department_status_id", "department_id", "status", "id"),
+    )
@@ -26,3 +26,16 @@ class JobDescription(Base, ToDictMixin):
 
     full_text = Column(Text, nullable=True, comment="职位描述全文")
     evaluation_criteria = Column(Text, nullable=True, comment="评价标准prompt")
+
+
+class EvaluationPlan(Base, ToDictMixin):
+    """评估步骤拆解缓存，按评分标准内容哈希寻址"""
+
+    __tablename__ = "evaluation_plans"
+
+    id = Column(Integer, primary_key=True, index=True, comment="记录ID")
+    criteria_hash = Column(
+        String(64), nullable=False, unique=True, index=True, comment="评分标准SHA-256"
+    )
+    steps = Column(Text, nullable=False, comment="拆解出的评估步骤（JSON）")
+    created_at = Column(DateTime, default=func.now(), comment="创建时间")
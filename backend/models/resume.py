@@ -1,7 +1,17 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String, Text
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.sql import func
 
 from config.database import Base
@@ -30,3 +40,31 @@ class Resume(Base, ToDictMixin):
     updated_at = Column(
         DateTime, default=func.now(), onupdate=func.now(), comment="更新时间"
     )
+
+
+class ResumeJDScore(Base, ToDictMixin):
+    """简历与JD的匹配分，用于按JD查询候选人排名"""
+
+    __tablename__ = "resume_jd_scores"
+    __table_args__ = (
+        UniqueConstraint("resume_id", "jd_id", name="uq_resume_jd"),
+        Index("ix_resume_jd_scores_jd_score", "jd_id", "score"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, comment="ID")
+    resume_id = Column(Integer, nullable=False, index=True, comment="简历ID")
+    jd_id = Column(Integer, nullable=False, comment="职位描述ID")
+    score = Column(Float, nullable=False, default=0.0, comment="匹配度评分")
+    jd_version = Column(String(8), nullable=False, comment="打分时JD匹配文本的版本号")
+    created_at = Column(DateTime, default=func.now(), comment="创建时间")
+
+
+class JDScoreState(Base, ToDictMixin):
+    """JD对全部简历完成打分时的版本，resume_jd_scores 中该JD的记录只有在此之后才是完整的"""
+
+    __tablename__ = "jd_score_states"
+
+    jd_id = Column(Integer, primary_key=True, comment="职位描述ID")
+    jd_version = Column(String(8), nullable=False, comment="打分时JD匹配文本的版本号")
+    corpus_version = Column(String(8), nullable=False, comment="打分时开放JD语料（IDF）的版本号")
+    scored_at = Column(DateTime, nullable=False, comment="全量打分时间")
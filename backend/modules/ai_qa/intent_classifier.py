@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地意图分类器
+在调用大模型之前，用同义词归一化 + 字符 n-gram 相似度匹配已注册查询，
+命中时直接返回 registered_query，模糊输入再交给大模型
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import settings
+from .query_registry import QUERY_REGISTRY
+
+# 同义词归一化：把常见说法统一成注册查询描述和示例中使用的词
+SYNONYMS: Dict[str, List[str]] = {
+    "员工": ["职工", "员工们", "人员", "雇员", "同事", "人"],
+    "在职": ["在岗", "在册", "在编"],
+    "离职": ["离开公司", "辞职", "离开"],
+    "部门": ["团队", "科室", "事业部"],
+    "职位": ["岗位", "职务", "jd", "职位描述"],
+    "开放": ["在招", "招聘中", "正在招聘", "招人"],
+    "简历": ["候选人", "履历", "cv"],
+    "待筛选": ["未筛选", "没筛选", "待处理", "未处理", "还没看"],
+    "多少": ["几个", "几名", "几位", "几人", "几份", "多少个", "多少名", "多少位", "多少份", "数量", "总数", "人数", "数目", "几"],
+    "分布": ["占比", "比例", "构成"],
+    "OKR": ["okr", "目标与关键结果"],
+}
+
+# 语气词、标点等不参与匹配的字符
+_NOISE_PATTERN = re.compile(r"[\s，。！？、,.!?;；:：\"'“”‘’（）()【】\[\]《》<>·~～]|请问|请|帮我|一下|查询|查一下|告诉我|现在|目前|当前|我们|一共|总共|还|都|有|是|了|呢|吗|吧|啊|呀|的")
+
+# 从问题中抽取部门名称，例如“技术部有多少人”
+_DEPARTMENT_PATTERN = re.compile(r"([一-龥A-Za-z]{1,10}?部)(?!门)")
+_DEPARTMENT_STOPWORDS = {"各部", "全部", "每个部", "所有部", "内部", "外部", "总部"}
+
+# 按长度降序替换，避免短词先替换破坏长词
+_SYNONYM_ITEMS = sorted(
+    ((alias.lower(), canonical) for canonical, aliases in SYNONYMS.items() for alias in aliases),
+    key=lambda item: len(item[0]),
+    reverse=True,
+)
+
+
+def normalize_message(message: str) -> str:
+    """规范化用户问题：小写、去除标点和语气词、同义词归一"""
+    text = _NOISE_PATTERN.sub("", message.lower())
+    for alias, canonical in _SYNONYM_ITEMS:
+        if alias in text:
+            text = text.replace(alias, canonical)
+    return text
+
+
+def char_ngrams(text: str, sizes: Tuple[int, ...] = (1, 2, 3)) -> Counter:
+    """字符 n-gram 词频"""
+    grams = Counter()
+    for size in sizes:
+        grams.update(text[i:i + size] for i in range(len(text) - size + 1))
+    return grams
+
+
+def _is_department_name(name: str) -> bool:
+    return name not in _DEPARTMENT_STOPWORDS and not name.startswith(("各", "每", "所有"))
+
+
+def extract_department(message: str) -> Optional[str]:
+    """从问题中抽取部门名称"""
+    for match in _DEPARTMENT_PATTERN.finditer(message):
+        if _is_department_name(match.group(1)):
+            return match.group(1)
+    return None
+
+
+def extract_status(message: str) -> Optional[str]:
+    """从问题中抽取员工状态（在职/离职），两者都出现时不抽取"""
+    text = normalize_message(message)
+    statuses = [status for status in ("在职", "离职") if status in text]
+    return statuses[0] if len(statuses) == 1 else None
+
+
+def _mask_departments(message: str) -> str:
+    """把具体部门名称替换为统一占位，避免未见过的部门名拉低相似度"""
+    return _DEPARTMENT_PATTERN.sub(
+        lambda match: "某部" if _is_department_name(match.group(1)) else match.group(0),
+        message,
+    )
+
+
+class IntentClassifier:
+    """
+    基于注册查询描述和示例问句的本地意图分类器
+
+    - 每条描述/示例按 n-gram 的 TF-IDF 向量表示，问题与各查询的最高余弦相似度作为置信度
+    - 置信度不低于阈值，且与第二名拉开足够差距时才认为命中，否则交给大模型
+    - 注册表变化后自动重建索引
+    """
+
+    def __init__(self, threshold: float, margin: float = 0.08):
+        self.threshold = threshold
+        self.margin = margin
+        self._lock = threading.Lock()
+        self._version: Optional[Tuple[str, ...]] = None
+        self._idf: Dict[str, float] = {}
+        self._default_idf = 1.0
+        # 示例所属的查询名称、向量模长，以及 n-gram 到 (示例下标, 权重) 的倒排索引
+        self._example_names: List[str] = []
+        self._example_norms: List[float] = []
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+
+    def _vectorize(self, grams: Counter) -> Tuple[Dict[str, float], float]:
+        vector = {
+            gram: (1 + math.log(count)) * self._idf.get(gram, self._default_idf)
+            for gram, count in grams.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return vector, norm
+
+    def _ensure_index(self):
+        version = tuple(QUERY_REGISTRY)
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            documents = []
+            for name, info in QUERY_REGISTRY.items():
+                for text in [info["description"], *info.get("examples", [])]:
+                    documents.append((name, char_ngrams(normalize_message(_mask_departments(text)))))
+
+            document_frequency = Counter()
+            for _, grams in documents:
+                document_frequency.update(grams.keys())
+            total = len(documents)
+            self._idf = {
+                gram: math.log((total + 1) / (count + 1)) + 1
+                for gram, count in document_frequency.items()
+            }
+            self._default_idf = math.log(total + 1) + 1
+
+            names, norms, postings = [], [], {}
+            for name, grams in documents:
+                vector, norm = self._vectorize(grams)
+                if not norm:
+                    continue
+                for gram, weight in vector.items():
+                    postings.setdefault(gram, []).append((len(names), weight))
+                names.append(name)
+                norms.append(norm)
+            self._example_names = names
+            self._example_norms = norms
+            self._postings = postings
+            self._version = version
+
+    def scores(self, message: str) -> List[Tuple[str, float]]:
+        """问题与每个注册查询的相似度，按相似度降序"""
+        self._ensure_index()
+        vector, norm = self._vectorize(char_ngrams(normalize_message(_mask_departments(message))))
+        if not norm:
+            return []
+        dots: Dict[int, float] = {}
+        for gram, weight in vector.items():
+            for index, example_weight in self._postings.get(gram, ()):
+                dots[index] = dots.get(index, 0.0) + weight * example_weight
+
+        best: Dict[str, float] = {}
+        for index, dot in dots.items():
+            name = self._example_names[index]
+            score = dot / (norm * self._example_norms[index])
+            if score > best.get(name, 0.0):
+                best[name] = score
+        return sorted(best.items(), key=lambda item: item[1], reverse=True)
+
+    def classify(self, message: str) -> Optional[Dict[str, Any]]:
+        """
+        识别问题对应的注册查询
+
+        Returns:
+            命中时返回与 identify_intent 相同结构的意图字典，否则返回None
+        """
+        ranked = self.scores(message)
+        if not ranked:
+            return None
+        query_name, confidence = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if confidence < self.threshold or confidence - runner_up < self.margin:
+            return None
+
+        parameters: Dict[str, Any] = {"query_name": query_name}
+        department = extract_department(message)
+        if department:
+            parameters["department"] = department
+        status = extract_status(message)
+        if status:
+            parameters["status"] = status
+        return {
+            "intent": "registered_query",
+            "parameters": parameters,
+            "confidence": round(confidence, 4),
+        }
+
+
+intent_classifier = IntentClassifier(threshold=settings.AI_QA_INTENT_THRESHOLD)
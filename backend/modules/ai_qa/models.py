@@ -1,6 +1,7 @@
-from typing import Optional, Any
+from datetime import date
+from typing import Optional, Any, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ChatMessage(BaseModel):
@@ -12,6 +13,8 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     """聊天请求模型"""
     message: str
+    # 覆盖意图识别抽取的查询参数，例如翻页时传入上一页返回的 next_cursor
+    parameters: Optional[dict[str, Any]] = None
 
 
 class EmployeeStatsResponse(BaseModel):
@@ -41,4 +44,27 @@ class AIChatResponse(BaseModel):
     """AI聊天响应模型"""
     message: str
     chart_data: Optional[ChartData] = None
-    raw_data: Optional[dict[str, Any]] = None
\ No newline at end of file
+    raw_data: Optional[dict[str, Any]] = None
+
+
+class EmployeeQueryParams(BaseModel):
+    """员工类预定义查询的参数"""
+    department: Optional[str] = Field(None, max_length=100, description="部门名称")
+    status: Optional[Literal["在职", "离职", "其他"]] = Field(None, description="员工状态")
+
+
+class EmployeeListParams(EmployeeQueryParams):
+    """员工列表查询参数（按员工ID做游标分页）"""
+    cursor: Optional[int] = Field(None, ge=0, description="上一页最后一名员工的ID")
+    page_size: int = Field(20, ge=1, le=100, description="每页数量")
+
+
+class DepartmentParams(BaseModel):
+    """按部门过滤的查询参数"""
+    department: Optional[str] = Field(None, max_length=100, description="部门名称")
+
+
+class DateRangeParams(BaseModel):
+    """按创建日期过滤的查询参数"""
+    date_from: Optional[date] = Field(None, description="开始日期（含）")
+    date_to: Optional[date] = Field(None, description="结束日期（含）")
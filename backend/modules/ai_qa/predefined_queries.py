@@ -6,54 +6,110 @@
 实现常用的HR数据查询功能
 """
 
+from datetime import timedelta
 from typing import Dict, Any, List
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from sqlalchemy import and_, func, case, select
 from models.employee import Employee as EmployeeModel
 from models.department import Department as DepartmentModel
 from models.jd import JobDescription as JDModel
 from models.resume import Resume as ResumeModel
 from models.okr import OKR as OKRModel
 from .query_registry import register_query
-from .models import ChartData
+from .models import (
+    ChartData, DateRangeParams, DepartmentParams, EmployeeListParams, EmployeeQueryParams
+)
+
+# 员工状态与 status 字段的对应关系
+EMPLOYEE_STATUS_VALUES = {"在职": 0, "离职": 1}
+EMPLOYEE_STATUS_NAMES = {0: "在职", 1: "离职"}
+
+
+def _department_id_subquery(department: str):
+    """按部门名称查部门ID的子查询（departments.name 有唯一索引）"""
+    return select(DepartmentModel.id).where(DepartmentModel.name == department).scalar_subquery()
+
+
+def _employee_filters(params: Dict[str, Any]) -> list:
+    """把部门、状态参数转换为员工表的过滤条件"""
+    filters = []
+    if params.get("department"):
+        filters.append(EmployeeModel.department_id == _department_id_subquery(params["department"]))
+    status = params.get("status")
+    if status in EMPLOYEE_STATUS_VALUES:
+        filters.append(EmployeeModel.status == EMPLOYEE_STATUS_VALUES[status])
+    elif status == "其他":
+        filters.append(EmployeeModel.status.notin_(list(EMPLOYEE_STATUS_VALUES.values())))
+    return filters
+
+
+def _date_filters(column, params: Dict[str, Any]) -> list:
+    """把日期范围参数转换为过滤条件，结束日期包含当天"""
+    filters = []
+    if params.get("date_from"):
+        filters.append(column >= params["date_from"])
+    if params.get("date_to"):
+        filters.append(column < params["date_to"] + timedelta(days=1))
+    return filters
+
+
+def _scope_text(params: Dict[str, Any]) -> str:
+    """查询范围的文字描述，例如“技术部在职”"""
+    return f"{params.get('department', '')}{params.get('status', '')}"
+
+
+def _date_range_text(params: Dict[str, Any]) -> str:
+    if not params.get("date_from") and not params.get("date_to"):
+        return ""
+    return f"{params.get('date_from', '')}至{params.get('date_to', '')}期间，"
 
 
 def employee_count_query(params: Dict[str, Any], db: Session) -> Dict[str, Any]:
-    """员工总数查询"""
-    count = db.query(func.count(EmployeeModel.id)).scalar()
+    """员工总数查询，可按部门和状态过滤"""
+    count = db.query(func.count(EmployeeModel.id)).filter(*_employee_filters(params)).scalar()
+    scope = _scope_text(params)
     return {
         "result": {"total": count},
-        "message": f"公司目前共有 {count} 名员工"
+        "message": f"{scope}员工共有 {count} 名" if scope else f"公司目前共有 {count} 名员工"
     }
 
 
 def active_employee_count_query(params: Dict[str, Any], db: Session) -> Dict[str, Any]:
-    """在职员工数查询"""
-    count = db.query(func.count(EmployeeModel.id)).filter(EmployeeModel.status == 0).scalar()
+    """在职员工数查询，可按部门过滤"""
+    count = db.query(func.count(EmployeeModel.id)).filter(
+        *_employee_filters({**params, "status": "在职"})
+    ).scalar()
     return {
         "result": {"active_count": count},
-        "message": f"在职员工数：{count}人"
+        "message": f"{params.get('department', '')}在职员工数：{count}人"
     }
 
 
 def inactive_employee_count_query(params: Dict[str, Any], db: Session) -> Dict[str, Any]:
-    """离职员工数查询"""
-    count = db.query(func.count(EmployeeModel.id)).filter(EmployeeModel.status == 1).scalar()
+    """离职员工数查询，可按部门过滤"""
+    count = db.query(func.count(EmployeeModel.id)).filter(
+        *_employee_filters({**params, "status": "离职"})
+    ).scalar()
     return {
         "result": {"inactive_count": count},
-        "message": f"离职员工数：{count}人"
+        "message": f"{params.get('department', '')}离职员工数：{count}人"
     }
 
 
 def department_stats_query(params: Dict[str, Any], db: Session) -> Dict[str, Any]:
-    """各部门人数统计查询"""
-    # 使用LEFT JOIN获取所有部门及其员工数
-    result = db.query(
+    """各部门人数统计查询，可按部门和员工状态过滤"""
+    # 员工状态条件放在 JOIN 条件中，保证没有符合条件员工的部门也返回 0
+    join_condition = [DepartmentModel.id == EmployeeModel.department_id]
+    join_condition += _employee_filters({"status": params.get("status")})
+    query = db.query(
         DepartmentModel.name,
         func.count(EmployeeModel.id).label('count')
     ).outerjoin(
-        EmployeeModel, DepartmentModel.id == EmployeeModel.department_id
-    ).group_by(
+        EmployeeModel, and_(*join_condition)
+    )
+    if params.get("department"):
+        query = query.filter(DepartmentModel.name == params["department"])
+    result = query.group_by(
         DepartmentModel.id, DepartmentModel.name
     ).all()
     
@@ -63,9 +119,16 @@ def department_stats_query(params: Dict[str, Any], db: Session) -> Dict[str, Any
         for row in result
     ]
     
+    if params.get("department"):
+        if department_stats:
+            message = f"{params['department']}目前有 {department_stats[0]['count']} 名{params.get('status', '')}员工"
+        else:
+            message = f"没有找到部门：{params['department']}"
+    else:
+        message = "各部门员工数量统计已完成"
     return {
         "result": department_stats,
-        "message": "各部门员工数量统计已完成"
+        "message": message
     }
 
 
@@ -98,7 +161,7 @@ def department_stats_chart_generator(query_result: Dict[str, Any]) -> Dict[str,
 
 
 def employee_status_distribution_query(params: Dict[str, Any], db: Session) -> Dict[str, Any]:
-    """员工状态分布查询"""
+    """员工状态分布查询，可按部门过滤"""
     result = db.query(
         case(
             (EmployeeModel.status == 0, "在职"),
@@ -106,6 +169,8 @@ def employee_status_distribution_query(params: Dict[str, Any], db: Session) -> D
             else_="其他"
         ).label('status'),
         func.count(EmployeeModel.id).label('count')
+    ).filter(
+        *_employee_filters({"department": params.get("department")})
     ).group_by(
         case(
             (EmployeeModel.status == 0, "在职"),
@@ -159,8 +224,11 @@ def department_count_query(params: Dict[str, Any], db: Session) -> Dict[str, Any
 
 
 def jd_count_query(params: Dict[str, Any], db: Session) -> Dict[str, Any]:
-    """职位描述总数查询"""
-    count = db.query(func.count(JDModel.id)).scalar()
+    """职位描述总数查询，可按部门过滤"""
+    query = db.query(func.count(JDModel.id))
+    if params.get("department"):
+        query = query.filter(JDModel.department_id == _department_id_subquery(params["department"]))
+    count = query.scalar()
     return {
         "result": {"total": count},
         "message": f"职位描述总数：{count}个"
@@ -168,8 +236,11 @@ def jd_count_query(params: Dict[str, Any], db: Session) -> Dict[str, Any]:
 
 
 def open_jd_count_query(params: Dict[str, Any], db: Session) -> Dict[str, Any]:
-    """开放职位数查询"""
-    count = db.query(func.count(JDModel.id)).filter(JDModel.is_open == True).scalar()
+    """开放职位数查询，可按部门过滤"""
+    query = db.query(func.count(JDModel.id)).filter(JDModel.is_open == True)
+    if params.get("department"):
+        query = query.filter(JDModel.department_id == _department_id_subquery(params["department"]))
+    count = query.scalar()
     return {
         "result": {"open_count": count},
         "message": f"当前开放的职位数量：{count}个"
@@ -177,20 +248,25 @@ def open_jd_count_query(params: Dict[str, Any], db: Session) -> Dict[str, Any]:
 
 
 def resume_count_query(params: Dict[str, Any], db: Session) -> Dict[str, Any]:
-    """简历总数查询"""
-    count = db.query(func.count(ResumeModel.id)).scalar()
+    """简历总数查询，可按上传日期过滤"""
+    count = db.query(func.count(ResumeModel.id)).filter(
+        *_date_filters(ResumeModel.created_at, params)
+    ).scalar()
     return {
         "result": {"total": count},
-        "message": f"简历总数：{count}份"
+        "message": f"{_date_range_text(params)}简历总数：{count}份"
     }
 
 
 def pending_resume_count_query(params: Dict[str, Any], db: Session) -> Dict[str, Any]:
-    """待筛选简历数查询"""
-    count = db.query(func.count(ResumeModel.id)).filter(ResumeModel.status == "待筛选").scalar()
+    """待筛选简历数查询，可按上传日期过滤"""
+    count = db.query(func.count(ResumeModel.id)).filter(
+        ResumeModel.status == "待筛选",
+        *_date_filters(ResumeModel.created_at, params)
+    ).scalar()
     return {
         "result": {"pending_count": count},
-        "message": f"待筛选的简历数量：{count}份"
+        "message": f"{_date_range_text(params)}待筛选的简历数量：{count}份"
     }
 
 
@@ -203,28 +279,138 @@ def okr_count_query(params: Dict[str, Any], db: Session) -> Dict[str, Any]:
     }
 
 
-# 注册所有预定义查询
-register_query("employee_count", "查询公司员工总数", employee_count_query)
-register_query("active_employee_count", "查询在职员工数量", active_employee_count_query)
-register_query("inactive_employee_count", "查询离职员工数量", inactive_employee_count_query)
-register_query("department_count", "查询公司部门总数", department_count_query)
-register_query("jd_count", "查询职位描述总数", jd_count_query)
-register_query("open_jd_count", "查询当前开放的职位数量", open_jd_count_query)
-register_query("resume_count", "查询简历总数", resume_count_query)
-register_query("pending_resume_count", "查询待筛选的简历数量", pending_resume_count_query)
-register_query("okr_count", "查询OKR总数", okr_count_query)
+def employee_list_query(params: Dict[str, Any], db: Session) -> Dict[str, Any]:
+    """
+    员工列表查询，可按部门和状态过滤
+    按员工ID游标分页：返回 next_cursor，下一页以 cursor 参数传入，不使用 OFFSET
+    """
+    page_size = params.get("page_size", 20)
+    query = db.query(
+        EmployeeModel.id,
+        EmployeeModel.name,
+        EmployeeModel.position,
+        EmployeeModel.status,
+        DepartmentModel.name
+    ).outerjoin(
+        DepartmentModel, DepartmentModel.id == EmployeeModel.department_id
+    ).filter(*_employee_filters(params))
+    if params.get("cursor"):
+        query = query.filter(EmployeeModel.id > params["cursor"])
+    
+    # 多取一条判断是否还有下一页，结果逐行读取，不在内存中组装完整结果集
+    rows = query.order_by(EmployeeModel.id).limit(page_size + 1).execution_options(
+        stream_results=True, yield_per=page_size + 1
+    )
+    employees = []
+    has_more = False
+    for employee_id, name, position, status, department_name in rows:
+        if len(employees) == page_size:
+            has_more = True
+            break
+        employees.append({
+            "id": employee_id,
+            "name": name,
+            "position": position,
+            "department": department_name,
+            "status": EMPLOYEE_STATUS_NAMES.get(status, "其他")
+        })
+    
+    scope = _scope_text(params)
+    if employees:
+        message = f"查询到以下{scope}员工（本页 {len(employees)} 人）：" + "、".join(
+            employee["name"] for employee in employees
+        )
+        if has_more:
+            message += "，还有更多员工"
+    else:
+        message = f"没有找到{scope}员工"
+    return {
+        "result": {
+            "employees": employees,
+            "next_cursor": employees[-1]["id"] if has_more else None
+        },
+        "message": message
+    }
+
+
+# 注册所有预定义查询（tables 为查询依赖的数据表，写入后结果缓存失效）
+EMPLOYEES = EmployeeModel.__tablename__
+DEPARTMENTS = DepartmentModel.__tablename__
+JDS = JDModel.__tablename__
+RESUMES = ResumeModel.__tablename__
+OKRS = OKRModel.__tablename__
+
+register_query(
+    "employee_count", "查询公司员工总数", employee_count_query,
+    tables=[EMPLOYEES, DEPARTMENTS], params_model=EmployeeQueryParams,
+    examples=["公司有多少员工", "员工总数是多少", "员工人数", "公司一共有多少人", "公司总人数", "全公司有多少名员工"]
+)
+register_query(
+    "active_employee_count", "查询在职员工数量", active_employee_count_query,
+    tables=[EMPLOYEES, DEPARTMENTS], params_model=DepartmentParams,
+    examples=["在职员工有多少", "目前在职人数", "现在有多少在职员工", "在职的有几个人"]
+)
+register_query(
+    "inactive_employee_count", "查询离职员工数量", inactive_employee_count_query,
+    tables=[EMPLOYEES, DEPARTMENTS], params_model=DepartmentParams,
+    examples=["离职员工有多少", "离职人数是多少", "有多少人离职了", "离职了多少人", "已经离职的员工数"]
+)
+register_query(
+    "department_count", "查询公司部门总数", department_count_query, tables=[DEPARTMENTS],
+    examples=["公司有多少个部门", "部门总数", "部门数", "一共有几个部门", "部门数量"]
+)
+register_query(
+    "jd_count", "查询职位描述总数", jd_count_query,
+    tables=[JDS, DEPARTMENTS], params_model=DepartmentParams,
+    examples=["一共有多少个职位", "职位描述有多少", "总共有多少岗位", "职位数量是多少"]
+)
+register_query(
+    "open_jd_count", "查询当前开放的职位数量", open_jd_count_query,
+    tables=[JDS, DEPARTMENTS], params_model=DepartmentParams,
+    examples=["现在开放的职位有多少", "开放多少岗位", "正在招聘的岗位数量", "在招职位有几个", "开放岗位数"]
+)
+register_query(
+    "resume_count", "查询简历总数", resume_count_query,
+    tables=[RESUMES], params_model=DateRangeParams,
+    examples=["简历总数", "一共收到多少份简历", "收到了多少简历", "有多少份简历", "简历数量"]
+)
+register_query(
+    "pending_resume_count", "查询待筛选的简历数量", pending_resume_count_query,
+    tables=[RESUMES], params_model=DateRangeParams,
+    examples=["待筛选的简历有多少", "还有多少简历没筛选", "未处理的简历数量", "待处理简历有几份"]
+)
+register_query(
+    "okr_count", "查询OKR总数", okr_count_query, tables=[OKRS],
+    examples=["OKR总数", "有多少个OKR", "OKR数量是多少"]
+)
 
 # 注册带图表的查询
 register_query(
     "department_stats", 
     "按部门统计员工人数", 
     department_stats_query, 
-    department_stats_chart_generator
+    department_stats_chart_generator,
+    tables=[DEPARTMENTS, EMPLOYEES],
+    params_model=EmployeeQueryParams,
+    examples=["各部门人数", "每个部门有多少人", "各个部门的员工数量", "部门人数分布", "技术部有多少人", "技术部在职的有多少人"]
 )
 
 register_query(
     "employee_status_distribution", 
     "统计员工状态分布情况", 
     employee_status_distribution_query, 
-    employee_status_chart_generator
-)
\ No newline at end of file
+    employee_status_chart_generator,
+    tables=[EMPLOYEES, DEPARTMENTS],
+    params_model=DepartmentParams,
+    examples=["员工状态分布", "在职离职比例", "员工状态统计", "在职和离职各有多少人"]
+)
+
+# 注册列表查询（游标分页）
+register_query(
+    "employee_list",
+    "查询员工名单，可按部门和在职状态筛选",
+    employee_list_query,
+    tables=[EMPLOYEES, DEPARTMENTS],
+    params_model=EmployeeListParams,
+    examples=["员工名单", "列出所有员工", "技术部有哪些员工", "技术部在职员工", "离职员工名单", "查看市场部的员工列表"]
+)
@@ -6,16 +6,26 @@
 使用简单的Dict[str, Any]结构，包含可执行函数，便于扩展
 """
 
-from typing import Dict, Any, Callable, Optional
+import json
+from typing import Dict, Any, Callable, List, Optional, Type
+from pydantic import BaseModel, ValidationError
 from sqlalchemy.orm import Session
 
+from common.cache import LRUCache
+from config.database import register_table_listener
+from config.settings import settings
+
 
 # 查询注册表结构
 # {
 #     "查询名称": {
 #         "description": "查询描述",
 #         "executor": 可执行函数,
-#         "chart_generator": 可选的图表生成函数
+#         "chart_generator": 可选的图表生成函数,
+#         "examples": 示例问句（用于本地意图识别）,
+#         "params_model": 参数模型（pydantic），用于校验和转换意图识别抽取的参数,
+#         "tables": 查询依赖的数据表（为空表示不缓存结果）,
+#         "cache": 查询结果缓存（LRUCache，键为规范化后的参数）
 #     }
 # }
 
@@ -26,7 +36,11 @@ def register_query(
     name: str,
     description: str,
     executor: Callable[[Dict[str, Any], Session], Dict[str, Any]],
-    chart_generator: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+    chart_generator: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    tables: Optional[List[str]] = None,
+    ttl: Optional[float] = None,
+    examples: Optional[List[str]] = None,
+    params_model: Optional[Type[BaseModel]] = None
 ):
     """
     注册一个新的查询
@@ -36,11 +50,26 @@ def register_query(
         description: 查询描述
         executor: 执行函数，接收参数字典和数据库会话，返回结果字典
         chart_generator: 可选的图表生成函数，接收查询结果，返回图表数据
+        tables: 查询依赖的数据表名，声明后缓存查询结果，这些表写入提交后缓存失效
+        ttl: 结果缓存秒数，默认使用 AI_QA_QUERY_CACHE_TTL
+        examples: 示例问句，本地意图分类器据此识别用户问题，不经过大模型
+        params_model: 参数模型，执行前按模型校验和转换参数，未声明的参数和校验失败的参数被忽略
     """
+    ttl = settings.AI_QA_QUERY_CACHE_TTL if ttl is None else ttl
+    cache = None
+    if tables and ttl > 0:
+        cache = LRUCache(settings.AI_QA_QUERY_CACHE_SIZE, ttl=ttl)
+        for table_name in tables:
+            register_table_listener(table_name, cache.clear)
+    
     QUERY_REGISTRY[name] = {
         "description": description,
         "executor": executor,
-        "chart_generator": chart_generator
+        "chart_generator": chart_generator,
+        "examples": list(examples or []),
+        "params_model": params_model,
+        "tables": list(tables or []),
+        "cache": cache
     }
 
 
@@ -84,7 +113,68 @@ def execute_query(name: str, params: Dict[str, Any], db: Session) -> Optional[Di
         return None
     
     executor = query_info["executor"]
-    return executor(params, db)
+    params = bind_params(query_info.get("params_model"), params)
+    cache = query_info.get("cache")
+    if cache is None:
+        return executor(params, db)
+    
+    cache_key = _normalize_params(params)
+    result = cache.get(cache_key)
+    if result is None:
+        result = executor(params, db)
+        if result is not None:
+            cache.set(cache_key, result)
+    return result
+
+
+def bind_params(params_model: Optional[Type[BaseModel]],
+                params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    按参数模型校验和转换参数
+    
+    意图识别抽取的参数不一定可靠，校验失败的字段直接丢弃，不影响其余参数
+    """
+    if params_model is None:
+        return dict(params or {})
+    values = {
+        key: value for key, value in (params or {}).items()
+        if value is not None and value != ""
+    }
+    try:
+        return params_model(**values).dict(exclude_none=True)
+    except ValidationError as e:
+        invalid = {error["loc"][0] for error in e.errors() if error.get("loc")}
+        values = {key: value for key, value in values.items() if key not in invalid}
+        return params_model(**values).dict(exclude_none=True)
+
+
+def _normalize_params(params: Optional[Dict[str, Any]]) -> str:
+    """把查询参数规范化为缓存键：忽略空值，去掉字符串首尾空白，键排序"""
+    normalized = {}
+    for key, value in (params or {}).items():
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            continue
+        normalized[key] = value
+    return json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def get_query_cache_stats() -> Dict[str, Any]:
+    """
+    各查询的结果缓存统计
+    
+    Returns:
+        查询名称到缓存统计（命中率等）的映射，未启用缓存的查询 cached 为 False
+    """
+    stats = {}
+    for name, info in QUERY_REGISTRY.items():
+        cache = info.get("cache")
+        if cache is None:
+            stats[name] = {"cached": False}
+        else:
+            stats[name] = {"cached": True, "ttl": cache.ttl, "tables": info["tables"], **cache.stats()}
+    return stats
 
 
 def generate_chart(name: str, query_result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+AI问答响应缓存
+按规范化后的问题缓存意图识别结果，并用 MinHash + LSH 识别近似重复的问法复用意图；
+一般性问题的大模型回答按原始问题单独缓存，只有完全相同的问题才复用回答
+"""
+
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from common.cache import LRUCache
+from config.settings import settings
+from .intent_classifier import normalize_message
+
+# MinHash 哈希函数的模数（小于 2^32 的最大素数）与签名长度（BANDS × ROWS）
+_PRIME = 4294967291
+_BANDS = 16
+_ROWS = 4
+
+
+class ChatResponseCache:
+    """
+    问题 → 意图（及一般性问题的回答）的缓存
+
+    - 一般性问题的回答以去掉首尾空白的原始问题为键，只有完全相同的问题才返回回答；
+      规范化会去掉“现在”“有”等词并归并同义词，“现在北京天气”与“北京天气”规范化后相同，回答却不能通用
+    - 意图以规范化后的问题为键，规范化后相同的问题直接复用意图
+    - 近似重复的问题通过 LSH 分桶找到候选，MinHash 估计的 Jaccard 相似度不低于阈值时复用意图；
+      带抽取参数（如部门）的条目只允许规范化后相同的问题命中，避免把“技术部”的参数用到“市场部”
+    - 数据类问题只缓存意图，查询结果每次重新执行
+    """
+
+    def __init__(self, maxsize: int, ttl: float, similarity: float, shingle_size: int = 2):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.similarity = similarity
+        self.shingle_size = shingle_size
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # 原始问题 -> {"intent": 意图字典, "answer": 回答}
+        self._answers = LRUCache(maxsize, ttl)
+        # 规范化问题 -> (意图条目, MinHash签名, 过期时间)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], np.ndarray, float]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+
+        rng = np.random.default_rng(20240601)
+        num_perm = _BANDS * _ROWS
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def _signature(self, text: str) -> np.ndarray:
+        """字符 shingle 集合的 MinHash 签名"""
+        size = self.shingle_size
+        shingles = {text[i:i + size] for i in range(max(len(text) - size + 1, 1))}
+        hashes = np.array(
+            [zlib.crc32(shingle.encode("utf-8")) % _PRIME for shingle in shingles], dtype=np.uint64
+        )
+        # (a * x + b) mod p：a、b、x 均小于 p < 2^32，乘积取模后再加，不会溢出 uint64
+        permuted = (np.outer(hashes, self._a) % _PRIME + self._b) % _PRIME
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * _ROWS:(band + 1) * _ROWS].tobytes())
+            for band in range(_BANDS)
+        ]
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band_key in self._band_keys(entry[1]):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def _live(self, key: str, now: float) -> Optional[Tuple[Dict[str, Any], np.ndarray, float]]:
+        item = self._entries.get(key)
+        if item is not None and item[2] < now:
+            self._remove(key)
+            return None
+        return item
+
+    def get(self, message: str) -> Optional[Dict[str, Any]]:
+        """
+        查找问题的缓存条目
+
+        Returns:
+            {"intent": 意图字典, "answer": 一般性问题的回答或None}，未命中返回None；
+            只有与原始问题完全相同时 answer 才不为None
+        """
+        if not self.enabled:
+            return None
+        answered = self._answers.get(message.strip())
+        if answered is not None:
+            with self._lock:
+                self.hits += 1
+            return answered
+        key = normalize_message(message)
+        if not key:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            item = self._live(key, now)
+            if item is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return {"intent": item[0]["intent"], "answer": None}
+
+        signature = self._signature(key)
+        with self._lock:
+            candidates = set()
+            for band_key in self._band_keys(signature):
+                candidates |= self._buckets.get(band_key, set())
+
+            best_key, best_score = None, 0.0
+            for candidate in candidates:
+                item = self._live(candidate, now)
+                if item is None or not _allow_near_match(item[0]):
+                    continue
+                score = float(np.mean(item[1] == signature))
+                if score > best_score:
+                    best_key, best_score = candidate, score
+
+            if best_key is not None and best_score >= self.similarity:
+                self._entries.move_to_end(best_key)
+                self.near_hits += 1
+                return {"intent": self._entries[best_key][0]["intent"], "answer": None}
+            self.misses += 1
+            return None
+
+    def set(self, message: str, intent: Dict[str, Any], answer: Optional[str] = None):
+        """缓存问题的意图识别结果，一般性问题可同时缓存回答"""
+        if not self.enabled:
+            return
+        if answer is not None and message.strip():
+            self._answers.set(message.strip(), {"intent": intent, "answer": answer})
+        key = normalize_message(message)
+        if not key:
+            return
+        signature = self._signature(key)
+        entry = {"intent": intent}
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (entry, signature, time.monotonic() + self.ttl)
+            for band_key in self._band_keys(signature):
+                self._buckets.setdefault(band_key, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        self._answers.clear()
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.near_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "answers": len(self._answers),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.near_hits) / total, 4) if total else 0.0,
+        }
+
+
+def _allow_near_match(entry: Dict[str, Any]) -> bool:
+    """只有不带抽取参数的条目才允许近似命中"""
+    parameters = entry["intent"].get("parameters") or {}
+    return all(name == "query_name" for name in parameters)
+
+
+response_cache = ChatResponseCache(
+    maxsize=settings.AI_QA_RESPONSE_CACHE_SIZE,
+    ttl=settings.AI_QA_RESPONSE_CACHE_TTL,
+    similarity=settings.AI_QA_RESPONSE_CACHE_SIMILARITY,
+)
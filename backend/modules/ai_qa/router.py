@@ -1,11 +1,15 @@
+import json
 import traceback
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
+from sse_starlette.sse import EventSourceResponse
 
-from config.database import get_db
+from config.database import SessionLocal, get_db
 from modules import BaseResponse
 from .models import ChatRequest, AIChatResponse
-from .service import process_employee_query
+from .service import process_employee_query, stream_employee_query
+from .query_registry import get_query_cache_stats
+from .response_cache import response_cache
 from common.logger import logger
 from utils.logger_format_utils import log_safe_json
 
@@ -29,7 +33,7 @@ async def chat_with_ai(
     """
     try:
         # 处理用户查询
-        result = process_employee_query(request.message, db) 
+        result = await process_employee_query(request.message, db, request.parameters)
         
         # 检查结果并构造响应
         if result is None:
@@ -59,4 +63,61 @@ async def chat_with_ai(
             code=500,
             message=f"处理请求时发生错误: {str(e)}",
             data=None
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/chat-stream")
+async def chat_with_ai_stream(request: ChatRequest):
+    """
+    与AI助手聊天 - 流式接口（SSE）
+    
+    依次推送 start、intent、result/chart（数据类问题）或 delta（大模型逐段回答）、complete 事件，
+    每条消息的 data 为 {"event": 事件类型, "data": 事件数据} 的JSON，最后发送 [DONE]
+    """
+    async def generate_chat_stream():
+        # 响应体开始输出前依赖注入的会话已经关闭，流式过程中使用独立的会话
+        db = SessionLocal()
+        try:
+            async for event in stream_employee_query(request.message, db, request.parameters):
+                yield json.dumps(event, ensure_ascii=False, default=str)
+        except Exception as e:
+            log_safe_json(logger, "处理AI问答流式请求时发生错误", {"error": str(e)})
+            yield json.dumps({
+                "event": "error",
+                "data": {"message": f"处理请求时发生错误: {str(e)}"}
+            }, ensure_ascii=False)
+        finally:
+            db.close()
+        yield "[DONE]"
+    
+    return EventSourceResponse(generate_chat_stream())
+
+
+@router.get("/query-cache/stats", response_model=BaseResponse[dict])
+def query_cache_stats():
+    """
+    预定义查询的结果缓存统计
+    
+    Returns:
+        每个查询的缓存条目数、命中次数、未命中次数与命中率
+    """
+    return BaseResponse(
+        code=200,
+        message="success",
+        data=get_query_cache_stats()
+    )
+
+
+@router.get("/response-cache/stats", response_model=BaseResponse[dict])
+def response_cache_stats():
+    """
+    问答响应缓存统计
+    
+    Returns:
+        缓存条目数，完全命中、近似命中、未命中次数与命中率
+    """
+    return BaseResponse(
+        code=200,
+        message="success",
+        data=response_cache.stats()
+    )
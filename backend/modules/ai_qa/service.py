@@ -1,8 +1,13 @@
 import json
-from typing import Dict, Any
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, Any, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from config.openai_client import openai_client
+from common.cache import LRUCache
+from config.database import register_table_listener
+from config.openai_client import chat_completion, stream_chat_completion
 from config.settings import settings
 from models.employee import Employee as EmployeeModel
 from models.department import Department as DepartmentModel
@@ -10,12 +15,14 @@ from .models import ChartData
 from common.logger import logger
 from utils.logger_format_utils import log_safe_json
 from .query_registry import get_query, list_queries, execute_query, generate_chart
+from .intent_classifier import intent_classifier
+from .response_cache import response_cache
 from .predefined_queries import *  # 导入所有预定义查询
 
 
-def identify_intent(user_message: str) -> Dict[str, Any]:
+async def identify_intent(user_message: str) -> Dict[str, Any]:
     """
-    使用大模型识别用户意图
+    识别用户意图：先本地匹配已注册查询，无法确定时再使用大模型识别
     
     Args:
         user_message: 用户输入的消息
@@ -35,6 +42,11 @@ def identify_intent(user_message: str) -> Dict[str, Any]:
                 "confidence": 0.95
             }
     
+    # 本地意图分类器命中已注册查询时，不再调用大模型
+    local_result = intent_classifier.classify(user_message)
+    if local_result:
+        return local_result
+    
     # 定义系统提示词，告诉模型如何识别意图
     system_prompt =  f"""
 你是一个精确的意图识别与参数抽取助手，专注于"人力资源管理系统（HRMS）"相关的自然语言查询。目标：把用户的自然语言问题映射为严格、可机器解析的 JSON（仅返回 JSON，不允许多余文本、注释或代码块），以便后端直接调用预定义的 SQL 查询或其他处理逻辑。
@@ -94,8 +106,7 @@ def identify_intent(user_message: str) -> Dict[str, Any]:
     log_safe_json(logger,"system prompt: ", system_prompt[:200] + "...")
     
     try:
-        response = openai_client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
+        response = await chat_completion(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message}
@@ -127,41 +138,52 @@ def get_employee_stats(db: Session) -> Dict[str, Any]:
     """
     获取员工统计信息
     
+    优先返回员工统计快照，员工或部门表写入后快照失效，下次调用时重新统计
+    
     Args:
         db: 数据库会话
         
     Returns:
         员工统计信息字典
     """
-    # 查询所有员工
-    employees = db.query(EmployeeModel).all()
+    stats = _employee_stats_snapshot.get("employee_stats")
+    if stats is None:
+        stats = _query_employee_stats(db)
+        _employee_stats_snapshot.set("employee_stats", stats)
+    return stats
+
+
+def _query_employee_stats(db: Session) -> Dict[str, Any]:
+    """按 (状态, 部门) 一次分组查询统计员工人数"""
+    rows = db.query(
+        EmployeeModel.status,
+        DepartmentModel.name,
+        func.count(EmployeeModel.id)
+    ).outerjoin(
+        DepartmentModel, DepartmentModel.id == EmployeeModel.department_id
+    ).group_by(
+        EmployeeModel.status, DepartmentModel.name
+    ).all()
     
-    # 统计各类状态的员工数量
-    total = len(employees)
+    total = 0
     active = 0  # 在职 (status = 0)
     inactive = 0  # 离职 (status = 1)
     pending = 0  # 其他状态 (status = 2, 3, 4, 5)
     
-    # 按部门统计
+    # 按部门统计（没有部门或部门不存在的员工不计入）
     department_stats = {}
     
-    for emp in employees:
-        # 统计员工状态
-        if emp.status == 0:
-            active += 1
-        elif emp.status == 1:
-            inactive += 1
+    for status, dept_name, count in rows:
+        total += count
+        if status == 0:
+            active += count
+        elif status == 1:
+            inactive += count
         else:
-            pending += 1
-            
-        # 统计部门人数
-        if emp.department_id:
-            department = db.query(DepartmentModel).filter(
-                DepartmentModel.id == emp.department_id
-            ).first()
-            if department:
-                dept_name = department.name
-                department_stats[dept_name] = department_stats.get(dept_name, 0) + 1
+            pending += count
+        
+        if dept_name:
+            department_stats[dept_name] = department_stats.get(dept_name, 0) + count
     
     return {
         "total": total,
@@ -172,6 +194,19 @@ def get_employee_stats(db: Session) -> Dict[str, Any]:
     }
 
 
+def _clear_employee_stats_snapshot():
+    _employee_stats_snapshot.clear()
+
+
+# 员工统计快照，员工或部门表写入提交后清空
+_employee_stats_snapshot = LRUCache(
+    maxsize=1 if settings.EMPLOYEE_STATS_CACHE_TTL > 0 else 0,
+    ttl=settings.EMPLOYEE_STATS_CACHE_TTL,
+)
+register_table_listener(EmployeeModel.__tablename__, _clear_employee_stats_snapshot)
+register_table_listener(DepartmentModel.__tablename__, _clear_employee_stats_snapshot)
+
+
 def generate_chart_data(stats: Dict[str, Any]) -> Dict[str, Any]:
     """
     根据员工统计数据生成图表数据
@@ -228,21 +263,136 @@ def generate_chart_data(stats: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def process_employee_query(user_message: str, db: Session) -> Dict[str, Any]:
+async def process_employee_query(user_message: str, db: Session,
+                                 parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     处理员工相关的查询
     
     Args:
         user_message: 用户查询
         db: 数据库会话
+        parameters: 可选的查询参数，覆盖意图识别抽取的同名参数（如翻页游标 cursor）
         
     Returns:
         处理结果，包含回答文本和图表数据
     """
-    # 识别用户意图
-    intent_result = identify_intent(user_message)
+    # 原文完全相同的一般性问题直接返回缓存的回答；规范化后相同或近似的问题和数据类问题只复用意图，
+    # 回答重新生成、查询重新执行
+    cached = response_cache.get(user_message)
+    if cached and cached["answer"] is not None:
+        return _text_result(cached["answer"])
+    
+    intent_result = await _resolve_intent(user_message, cached)
+    
+    result = await _answer_data_intent(intent_result, db, parameters)
+    if result is not None:
+        return result
+    
+    # 一般性问题，使用大模型回答
+    try:
+        response = await chat_completion(
+            messages=_general_messages(user_message),
+            temperature=0.7,
+            max_tokens=300
+        )
+        
+        response_text = response.choices[0].message.content.strip()
+        response_cache.set(user_message, intent_result, response_text)
+        return _text_result(response_text)
+    except Exception as e:
+        return _text_result(GENERAL_ANSWER_FALLBACK)
+
+
+async def stream_employee_query(user_message: str, db: Session,
+                                parameters: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    流式处理员工相关的查询
+    
+    先立即发送 start 事件，识别出意图后发送 intent 事件；数据类问题在查询完成后发送 result 和 chart 事件，
+    一般性问题以 delta 事件逐段转发大模型的回答；最后发送 complete 事件（出错时为 error 事件）
+    
+    Args:
+        user_message: 用户查询
+        db: 数据库会话
+        parameters: 可选的查询参数，覆盖意图识别抽取的同名参数
+        
+    Yields:
+        {"event": 事件类型, "data": 事件数据}
+    """
+    yield {"event": "start", "data": {"message": "正在理解您的问题..."}}
+    
+    cached = response_cache.get(user_message)
+    if cached and cached["answer"] is not None:
+        yield {"event": "intent", "data": cached["intent"]}
+        yield {"event": "delta", "data": {"content": cached["answer"]}}
+        yield {"event": "complete", "data": {"message": cached["answer"]}}
+        return
+    
+    intent_result = await _resolve_intent(user_message, cached)
+    yield {"event": "intent", "data": intent_result}
+    
+    result = await _answer_data_intent(intent_result, db, parameters)
+    if result is not None:
+        yield {"event": "result", "data": {"message": result["message"], "raw_data": result["raw_data"]}}
+        if result["chart_data"] is not None:
+            yield {"event": "chart", "data": result["chart_data"].dict()}
+        yield {"event": "complete", "data": {"message": result["message"]}}
+        return
+    
+    parts = []
+    deltas = stream_chat_completion(
+        messages=_general_messages(user_message),
+        temperature=0.7,
+        max_tokens=300
+    )
+    try:
+        # 客户端断开时生成器被关闭，aclosing 保证同时关闭上游的流式响应
+        async with aclosing(deltas):
+            async for content in deltas:
+                parts.append(content)
+                yield {"event": "delta", "data": {"content": content}}
+    except Exception as e:
+        logger.error(f"流式回答失败: {e}")
+        if not parts:
+            yield {"event": "delta", "data": {"content": GENERAL_ANSWER_FALLBACK}}
+            yield {"event": "complete", "data": {"message": GENERAL_ANSWER_FALLBACK}}
+        else:
+            yield {"event": "error", "data": {"message": "回答生成中断，请稍后再试。"}}
+        return
+    
+    response_text = "".join(parts).strip()
+    response_cache.set(user_message, intent_result, response_text)
+    yield {"event": "complete", "data": {"message": response_text}}
+
+
+async def _resolve_intent(user_message: str, cached: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """命中缓存时复用缓存的意图，否则识别意图；一般性问题在得到回答后再缓存"""
+    if cached:
+        intent_result = cached["intent"]
+    else:
+        intent_result = await identify_intent(user_message)
+        if intent_result.get("intent") != "general_question":
+            response_cache.set(user_message, intent_result)
     log_safe_json(logger, "意图识别结果", intent_result)
+    return intent_result
+
+
+def _text_result(message: str) -> Dict[str, Any]:
+    return {
+        "message": message,
+        "chart_data": None,
+        "raw_data": None
+    }
+
+
+async def _answer_data_intent(intent_result: Dict[str, Any], db: Session,
+                              parameters: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    执行数据类意图（注册查询、员工统计、部门统计）
     
+    Returns:
+        处理结果，包含回答文本和图表数据；一般性问题返回None，由调用方交给大模型回答
+    """
     # 根据意图处理查询
     if intent_result["intent"] == "registered_query":
         # 使用预定义查询注册表
@@ -251,7 +401,13 @@ def process_employee_query(user_message: str, db: Session) -> Dict[str, Any]:
             query_info = get_query(query_name)
             if query_info:
                 # 执行查询
-                query_result = execute_query(query_name, {}, db)
+                # 意图识别抽取的参数按查询声明的参数模型绑定到SQL过滤条件
+                query_params = {
+                    key: value for key, value in intent_result["parameters"].items()
+                    if key != "query_name"
+                }
+                query_params.update(parameters or {})
+                query_result = await run_in_threadpool(execute_query, query_name, query_params, db)
                 if query_result:
                     # 生成回答文本
                     response_text = query_result.get("message", f"查询 '{query_name}' 执行完成")
@@ -301,7 +457,7 @@ def process_employee_query(user_message: str, db: Session) -> Dict[str, Any]:
         
     elif intent_result["intent"] == "employee_count":
         # 获取员工统计数据
-        stats = get_employee_stats(db)
+        stats = await run_in_threadpool(get_employee_stats, db)
         chart_data_dict = generate_chart_data(stats)
         
         # 选择一个图表作为主要图表数据（这里选择柱状图）
@@ -325,7 +481,7 @@ def process_employee_query(user_message: str, db: Session) -> Dict[str, Any]:
         
     elif intent_result["intent"] == "department_stats":
         # 获取员工统计数据
-        stats = get_employee_stats(db)
+        stats = await run_in_threadpool(get_employee_stats, db)
         
         # 获取特定部门信息
         department_name = intent_result["parameters"].get("department", "")
@@ -340,10 +496,12 @@ def process_employee_query(user_message: str, db: Session) -> Dict[str, Any]:
             "chart_data": None,  # 不返回图表数据
             "raw_data": stats
         }
-        
-    else:
-        # 一般性问题，使用大模型回答
-        system_prompt = """
+    
+    return None
+
+
+# 一般性问题的系统提示词
+GENERAL_SYSTEM_PROMPT = """
 你是一个专业的人力资源管理系统AI助手，请用专业、友好的语气回答用户的问题。
 
 回答要求：
@@ -355,27 +513,12 @@ def process_employee_query(user_message: str, db: Session) -> Dict[str, Any]:
 
 请直接回答用户问题，不要包含任何额外的解释或格式。
 """
-        
-        try:
-            response = openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                temperature=0.7,
-                max_tokens=300
-            )
-            
-            response_text = response.choices[0].message.content.strip()
-            return {
-                "message": response_text,
-                "chart_data": None,
-                "raw_data": None
-            }
-        except Exception as e:
-            return {
-                "message": "抱歉，我暂时无法回答您的问题。请稍后再试。",
-                "chart_data": None,
-                "raw_data": None
-            }
\ No newline at end of file
+
+GENERAL_ANSWER_FALLBACK = "抱歉，我暂时无法回答您的问题。请稍后再试。"
+
+
+def _general_messages(user_message: str):
+    return [
+        {"role": "system", "content": GENERAL_SYSTEM_PROMPT},
+        {"role": "user", "content": user_message}
+    ]
@@ -118,7 +118,7 @@ class TeamSkillAnalysis(BaseModel):
     department_name: Optional[str] = None
     total_employees: int
     skill_coverage: List[dict]  # 技能覆盖情况
-    skill_gaps: List[SkillGapAnalysis]  # 技能差距
+    skill_gaps: List[dict]  # 技能差距
     recommendations: List[str]  # 改进建议
 
 
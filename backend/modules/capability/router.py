@@ -21,7 +21,7 @@ router = APIRouter(prefix="/api/capabilities", tags=["能力管理"])
 
 # 技能管理接口
 @router.post("/skills", response_model=SkillInDB, summary="创建技能")
-async def create_skill_endpoint(
+def create_skill_endpoint(
     skill: SkillCreate,
     db: Session = Depends(get_db)
 ):
@@ -33,7 +33,7 @@ async def create_skill_endpoint(
 
 
 @router.get("/skills/{skill_id}", response_model=SkillInDB, summary="获取技能详情")
-async def get_skill_endpoint(
+def get_skill_endpoint(
     skill_id: int,
     db: Session = Depends(get_db)
 ):
@@ -45,7 +45,7 @@ async def get_skill_endpoint(
 
 
 @router.put("/skills/{skill_id}", response_model=SkillInDB, summary="更新技能")
-async def update_skill_endpoint(
+def update_skill_endpoint(
     skill_id: int,
     skill_update: SkillUpdate,
     db: Session = Depends(get_db)
@@ -58,7 +58,7 @@ async def update_skill_endpoint(
 
 
 @router.delete("/skills/{skill_id}", summary="删除技能")
-async def delete_skill_endpoint(
+def delete_skill_endpoint(
     skill_id: int,
     db: Session = Depends(get_db)
 ):
@@ -70,7 +70,7 @@ async def delete_skill_endpoint(
 
 
 @router.get("/skills", summary="获取技能列表")
-async def get_skills_endpoint(
+def get_skills_endpoint(
     category: Optional[SkillCategory] = Query(None, description="技能分类"),
     keyword: Optional[str] = Query(None, description="关键词搜索"),
     page: int = Query(1, ge=1, description="页码"),
@@ -83,7 +83,7 @@ async def get_skills_endpoint(
 
 # 员工技能管理接口
 @router.post("/employee-skills", response_model=EmployeeSkillInDB, summary="创建员工技能记录")
-async def create_employee_skill_endpoint(
+def create_employee_skill_endpoint(
     emp_skill: EmployeeSkillCreate,
     db: Session = Depends(get_db)
 ):
@@ -97,7 +97,7 @@ async def create_employee_skill_endpoint(
 
 
 @router.put("/employee-skills/{emp_skill_id}", response_model=EmployeeSkillInDB, summary="更新员工技能")
-async def update_employee_skill_endpoint(
+def update_employee_skill_endpoint(
     emp_skill_id: int,
     emp_skill_update: EmployeeSkillUpdate,
     db: Session = Depends(get_db)
@@ -110,7 +110,7 @@ async def update_employee_skill_endpoint(
 
 
 @router.get("/employees/{employee_id}/skills", response_model=List[EmployeeSkillInDB], summary="获取员工技能列表")
-async def get_employee_skills_endpoint(
+def get_employee_skills_endpoint(
     employee_id: int,
     db: Session = Depends(get_db)
 ):
@@ -119,7 +119,7 @@ async def get_employee_skills_endpoint(
 
 
 @router.get("/employees/{employee_id}/skill-matrix", response_model=EmployeeSkillMatrix, summary="获取员工技能矩阵")
-async def get_employee_skill_matrix_endpoint(
+def get_employee_skill_matrix_endpoint(
     employee_id: int,
     db: Session = Depends(get_db)
 ):
@@ -131,7 +131,7 @@ async def get_employee_skill_matrix_endpoint(
 
 
 @router.post("/assessments", response_model=EmployeeSkillInDB, summary="评估员工技能")
-async def assess_employee_skill_endpoint(
+def assess_employee_skill_endpoint(
     assessment: SkillAssessmentRequest,
     db: Session = Depends(get_db)
 ):
@@ -146,7 +146,7 @@ async def assess_employee_skill_endpoint(
 
 # 分析和统计接口
 @router.get("/statistics", response_model=SkillStatistics, summary="获取技能统计")
-async def get_skill_statistics_endpoint(
+def get_skill_statistics_endpoint(
     db: Session = Depends(get_db)
 ):
     """获取技能统计信息"""
@@ -154,7 +154,7 @@ async def get_skill_statistics_endpoint(
 
 
 @router.get("/team-analysis", response_model=TeamSkillAnalysis, summary="获取团队技能分析")
-async def get_team_skill_analysis_endpoint(
+def get_team_skill_analysis_endpoint(
     department_id: Optional[int] = Query(None, description="部门ID"),
     db: Session = Depends(get_db)
 ):
@@ -246,7 +246,7 @@ async def get_skill_categories():
 
 
 @router.get("/employees/{employee_id}/skill-gaps", summary="获取员工技能差距分析")
-async def get_employee_skill_gaps(
+def get_employee_skill_gaps(
     employee_id: int,
     target_position: Optional[str] = Query(None, description="目标职位"),
     db: Session = Depends(get_db)
@@ -3,9 +3,11 @@ from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
 
+from config.database import mark_tables_synced
 from models.capability import Skill, EmployeeSkill, SkillAssessmentHistory, SkillLevel, SkillCategory
 from models.employee import Employee
 from models.department import Department
+from .skill_matrix import skill_matrix
 from .models import (
     SkillCreate, SkillUpdate, SkillInDB, EmployeeSkillCreate, EmployeeSkillUpdate,
     EmployeeSkillInDB, EmployeeSkillMatrix, SkillQuery, SkillStatistics,
@@ -110,8 +112,11 @@ def create_employee_skill(emp_skill_create: EmployeeSkillCreate, db: Session) ->
     
     db_emp_skill = EmployeeSkill(**emp_skill_dict)
     db.add(db_emp_skill)
+    # 技能矩阵由 set_level 增量更新，提交后不必整体重建
+    mark_tables_synced(db, EmployeeSkill.__tablename__)
     db.commit()
     db.refresh(db_emp_skill)
+    skill_matrix.set_level(db_emp_skill.employee_id, db_emp_skill.skill_id, db_emp_skill.level)
     
     # 记录评估历史
     _record_assessment_history(db_emp_skill.id, None, emp_skill_create.level, 
@@ -140,8 +145,10 @@ def update_employee_skill(emp_skill_id: int, emp_skill_update: EmployeeSkillUpda
     for field, value in update_data.items():
         setattr(db_emp_skill, field, value)
     
+    mark_tables_synced(db, EmployeeSkill.__tablename__)
     db.commit()
     db.refresh(db_emp_skill)
+    skill_matrix.set_level(db_emp_skill.employee_id, db_emp_skill.skill_id, db_emp_skill.level)
     
     # 记录评估历史
     if new_level and new_level != old_level:
@@ -159,7 +166,7 @@ def get_employee_skills(employee_id: int, db: Session) -> List[EmployeeSkillInDB
         EmployeeSkill.employee_id == employee_id
     ).all()
     
-    return [_build_employee_skill_in_db(emp_skill, db) for emp_skill in emp_skills]
+    return _build_employee_skills_in_db(emp_skills, db)
 
 
 def get_employee_skill_matrix(employee_id: int, db: Session) -> EmployeeSkillMatrix:
@@ -223,8 +230,10 @@ def assess_employee_skill(assessment: SkillAssessmentRequest, db: Session) -> Em
     if assessment.assessment_notes:
         emp_skill.assessment_notes = assessment.assessment_notes
     
+    mark_tables_synced(db, EmployeeSkill.__tablename__)
     db.commit()
     db.refresh(emp_skill)
+    skill_matrix.set_level(emp_skill.employee_id, emp_skill.skill_id, emp_skill.level)
     
     # 记录评估历史
     _record_assessment_history(
@@ -238,13 +247,12 @@ def assess_employee_skill(assessment: SkillAssessmentRequest, db: Session) -> Em
 
 def get_team_skill_analysis(department_id: Optional[int], db: Session) -> TeamSkillAnalysis:
     """获取团队技能分析"""
-    # 构建员工查询
-    employee_query = db.query(Employee).filter(Employee.status == 0)  # 在职员工
+    # 在职员工的筛选条件
+    employee_filters = [Employee.status == 0]
     if department_id:
-        employee_query = employee_query.filter(Employee.department_id == department_id)
+        employee_filters.append(Employee.department_id == department_id)
     
-    employees = employee_query.all()
-    total_employees = len(employees)
+    total_employees = db.query(func.count(Employee.id)).filter(*employee_filters).scalar()
     
     if total_employees == 0:
         return TeamSkillAnalysis(
@@ -262,11 +270,11 @@ def get_team_skill_analysis(department_id: Optional[int], db: Session) -> TeamSk
         if department:
             department_name = department.name
     
-    # 分析技能覆盖情况
-    skill_coverage = _analyze_skill_coverage(employees, db)
+    # 分析技能覆盖情况（只统计一次，技能差距和建议复用该结果）
+    skill_coverage = _analyze_skill_coverage(employee_filters, total_employees, db)
     
     # 分析技能差距
-    skill_gaps = _analyze_skill_gaps(employees, db)
+    skill_gaps = _analyze_skill_gaps(skill_coverage)
     
     # 生成改进建议
     recommendations = _generate_skill_recommendations(skill_coverage, skill_gaps)
@@ -331,29 +339,41 @@ def get_skill_statistics(db: Session) -> SkillStatistics:
 # 辅助函数
 def _build_employee_skill_in_db(db_emp_skill: EmployeeSkill, db: Session) -> EmployeeSkillInDB:
     """构建EmployeeSkillInDB对象，包含关联信息"""
+    return _build_employee_skills_in_db([db_emp_skill], db)[0]
+
+
+def _build_employee_skills_in_db(db_emp_skills: List[EmployeeSkill],
+                                 db: Session) -> List[EmployeeSkillInDB]:
+    """批量构建EmployeeSkillInDB对象，技能和员工（含评估人）各用一次查询获取"""
+    if not db_emp_skills:
+        return []
+    
     # 获取技能信息
-    skill = db.query(Skill).filter(Skill.id == db_emp_skill.skill_id).first()
-    skill_name = skill.name if skill else None
-    skill_category = skill.category.value if skill else None
+    skill_ids = {emp_skill.skill_id for emp_skill in db_emp_skills}
+    skills = {
+        skill_id: (name, category)
+        for skill_id, name, category in db.query(Skill.id, Skill.name, Skill.category)
+        .filter(Skill.id.in_(skill_ids))
+    }
     
-    # 获取员工信息
-    employee = db.query(Employee).filter(Employee.id == db_emp_skill.employee_id).first()
-    employee_name = employee.name if employee else None
-    
-    # 获取评估人信息
-    assessor_name = None
-    if db_emp_skill.assessed_by:
-        assessor = db.query(Employee).filter(Employee.id == db_emp_skill.assessed_by).first()
-        if assessor:
-            assessor_name = assessor.name
-    
-    return EmployeeSkillInDB(
-        **db_emp_skill.__dict__,
-        skill_name=skill_name,
-        skill_category=skill_category,
-        employee_name=employee_name,
-        assessor_name=assessor_name
+    # 获取员工和评估人信息
+    employee_ids = {emp_skill.employee_id for emp_skill in db_emp_skills}
+    employee_ids |= {emp_skill.assessed_by for emp_skill in db_emp_skills if emp_skill.assessed_by}
+    employee_names = dict(
+        db.query(Employee.id, Employee.name).filter(Employee.id.in_(employee_ids))
     )
+    
+    result = []
+    for db_emp_skill in db_emp_skills:
+        skill_name, skill_category = skills.get(db_emp_skill.skill_id, (None, None))
+        result.append(EmployeeSkillInDB(
+            **db_emp_skill.__dict__,
+            skill_name=skill_name,
+            skill_category=skill_category.value if skill_category else None,
+            employee_name=employee_names.get(db_emp_skill.employee_id),
+            assessor_name=employee_names.get(db_emp_skill.assessed_by)
+        ))
+    return result
 
 
 def _record_assessment_history(emp_skill_id: int, previous_level: Optional[SkillLevel],
@@ -377,45 +397,47 @@ def _record_assessment_history(emp_skill_id: int, previous_level: Optional[Skill
     db.commit()
 
 
-def _analyze_skill_coverage(employees: List[Employee], db: Session) -> List[dict]:
+def _analyze_skill_coverage(employee_filters: list, total_employees: int,
+                            db: Session) -> List[dict]:
     """分析技能覆盖情况"""
     # 获取所有技能
-    all_skills = db.query(Skill).filter(Skill.is_active == 1).all()
+    all_skills = db.query(Skill).filter(Skill.is_active == 1).order_by(Skill.id).all()
+    
+    # 一次分组查询统计每项技能的掌握人数，员工筛选条件在SQL中完成
+    skilled_counts = dict(
+        db.query(EmployeeSkill.skill_id, func.count(func.distinct(EmployeeSkill.employee_id)))
+        .join(Employee, Employee.id == EmployeeSkill.employee_id)
+        .filter(*employee_filters)
+        .group_by(EmployeeSkill.skill_id)
+        .all()
+    )
     
     coverage = []
     for skill in all_skills:
-        # 统计有此技能的员工数
-        skilled_employees = db.query(EmployeeSkill).filter(
-            and_(
-                EmployeeSkill.skill_id == skill.id,
-                EmployeeSkill.employee_id.in_([emp.id for emp in employees])
-            )
-        ).count()
-        
-        coverage_rate = (skilled_employees / len(employees)) * 100 if employees else 0
+        skilled_employees = skilled_counts.get(skill.id, 0)
+        coverage_rate = (skilled_employees / total_employees) * 100 if total_employees else 0
         
         coverage.append({
             "skill_id": skill.id,
             "skill_name": skill.name,
             "category": skill.category.value,
             "skilled_employees": skilled_employees,
-            "total_employees": len(employees),
+            "total_employees": total_employees,
             "coverage_rate": coverage_rate
         })
     
     return sorted(coverage, key=lambda x: x["coverage_rate"], reverse=True)
 
 
-def _analyze_skill_gaps(employees: List[Employee], db: Session) -> List[dict]:
+def _analyze_skill_gaps(coverage: List[dict]) -> List[dict]:
     """分析技能差距"""
     # 这里可以根据职位要求分析技能差距
     # 简化实现：找出覆盖率低的技能
-    coverage = _analyze_skill_coverage(employees, db)
-    
     gaps = []
     for skill_info in coverage:
         if skill_info["coverage_rate"] < 50:  # 覆盖率低于50%认为有差距
             gaps.append({
+                "skill_id": skill_info["skill_id"],
                 "skill_name": skill_info["skill_name"],
                 "current_coverage": skill_info["coverage_rate"],
                 "gap_severity": "高" if skill_info["coverage_rate"] < 20 else "中",
@@ -0,0 +1,182 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from common.logger import logger
+from config.database import SessionLocal, register_table_listener
+from config.settings import settings
+from models.capability import EmployeeSkill, SkillLevel
+
+# 矩阵扩容时预留的行/列数
+_GROWTH = 64
+
+
+class SkillMatrix:
+    """
+    进程内的 员工 × 技能 等级分数矩阵，供智能任务分配按候选员工批量读取技能等级
+
+    元素为 EmployeeSkill.get_level_score_static 的分数（1-5），0 表示没有该技能。
+    启动时从 employee_skills 全量构建，之后由员工技能的创建、更新、评估接口通过 set_level 增量更新，
+    这些接口提交时声明已同步（mark_tables_synced），不触发重建；
+    其他写入（如批量删除）提交后标记失效，下次查询时重建；
+    其他进程的写入无法通知到本进程，构建超过 max_age 秒后同样重建
+    """
+
+    def __init__(self, max_age: float = 0):
+        self.max_age = max_age
+        # _lock 保护矩阵状态，只在读写内存时短暂持有；_build_lock 保证同一时间只有一个构建
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._built = False
+        self._dirty = False
+        self._built_at = 0.0
+        # 构建期间到达的增量更新，构建完成后重放到新矩阵；None 表示当前没有在构建
+        self._pending: Optional[List[Tuple[int, int, Optional[SkillLevel]]]] = None
+        self._employee_index: Dict[int, int] = {}
+        self._skill_index: Dict[int, int] = {}
+        self._levels = np.zeros((0, 0), dtype=np.int8)
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    @property
+    def stale(self) -> bool:
+        return (
+            not self._built
+            or self._dirty
+            or (self.max_age > 0 and time.monotonic() - self._built_at > self.max_age)
+        )
+
+    def invalidate(self):
+        self._dirty = True
+
+    def build(self, db: Optional[Session] = None):
+        """从数据库全量构建矩阵"""
+        with self._build_lock:
+            self._build(db)
+
+    def _build(self, db: Optional[Session] = None):
+        with self._lock:
+            self._pending = []
+            # 先清除标记再读库，构建期间的新写入会再次标记失效
+            self._dirty = False
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            rows = db.query(
+                EmployeeSkill.employee_id, EmployeeSkill.skill_id, EmployeeSkill.level
+            ).all()
+        except Exception:
+            with self._lock:
+                self._pending = None
+                self._dirty = True
+            raise
+        finally:
+            if own_session:
+                db.close()
+
+        employee_index: Dict[int, int] = {}
+        skill_index: Dict[int, int] = {}
+        for employee_id, skill_id, _ in rows:
+            employee_index.setdefault(employee_id, len(employee_index))
+            skill_index.setdefault(skill_id, len(skill_index))
+
+        levels = np.zeros(
+            (len(employee_index) + _GROWTH, len(skill_index) + _GROWTH), dtype=np.int8
+        )
+        for employee_id, skill_id, level in rows:
+            levels[employee_index[employee_id], skill_index[skill_id]] = (
+                EmployeeSkill.get_level_score_static(level)
+            )
+
+        with self._lock:
+            self._employee_index = employee_index
+            self._skill_index = skill_index
+            self._levels = levels
+            # 读库之后才提交的增量更新可能不在查询结果中，重放一遍
+            pending, self._pending = self._pending, None
+            for employee_id, skill_id, level in pending:
+                self._apply(employee_id, skill_id, level)
+            self._built = True
+            self._built_at = time.monotonic()
+        logger.info(
+            f"员工技能矩阵构建完成：{len(employee_index)} 名员工 × {len(skill_index)} 项技能"
+        )
+
+    def ensure_built(self):
+        if self.stale:
+            with self._build_lock:
+                if self.stale:
+                    self._build()
+
+    def _slot(self, index: Dict[int, int], key: int) -> int:
+        """返回行/列下标，不存在时分配新下标"""
+        if key not in index:
+            index[key] = len(index)
+        return index[key]
+
+    def set_level(self, employee_id: int, skill_id: int, level: Optional[SkillLevel]):
+        """更新一名员工的技能等级，level 为空表示移除该技能"""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((employee_id, skill_id, level))
+            if self._built:
+                self._apply(employee_id, skill_id, level)
+
+    def _apply(self, employee_id: int, skill_id: int, level: Optional[SkillLevel]):
+        with self._lock:
+            row = self._slot(self._employee_index, employee_id)
+            column = self._slot(self._skill_index, skill_id)
+            rows, columns = self._levels.shape
+            if row >= rows or column >= columns:
+                # 扩容后整体替换，读取方持有的旧数组不受影响
+                levels = np.zeros(
+                    (max(rows, row + _GROWTH), max(columns, column + _GROWTH)),
+                    dtype=np.int8,
+                )
+                levels[:rows, :columns] = self._levels
+                self._levels = levels
+            self._levels[row, column] = (
+                EmployeeSkill.get_level_score_static(level) if level else 0
+            )
+
+    def levels(self, employee_ids: Iterable[int], skill_ids: Iterable[int]) -> np.ndarray:
+        """取出指定员工 × 技能的等级分数子矩阵，没有记录的位置为0"""
+        self.ensure_built()
+        employee_ids = list(employee_ids)
+        skill_ids = list(skill_ids)
+        with self._lock:
+            levels = self._levels
+            rows = np.array([self._employee_index.get(i, -1) for i in employee_ids], dtype=np.int64)
+            columns = np.array([self._skill_index.get(i, -1) for i in skill_ids], dtype=np.int64)
+
+        result = np.zeros((len(rows), len(columns)), dtype=np.int8)
+        row_mask = rows >= 0
+        column_mask = columns >= 0
+        if row_mask.any() and column_mask.any():
+            result[np.ix_(row_mask, column_mask)] = levels[
+                np.ix_(rows[row_mask], columns[column_mask])
+            ]
+        return result
+
+    def has_any_skill(self, employee_ids: Iterable[int]) -> np.ndarray:
+        """每名员工是否有任意技能记录"""
+        self.ensure_built()
+        employee_ids = list(employee_ids)
+        with self._lock:
+            levels = self._levels
+            rows = np.array([self._employee_index.get(i, -1) for i in employee_ids], dtype=np.int64)
+
+        result = np.zeros(len(rows), dtype=bool)
+        mask = rows >= 0
+        if mask.any():
+            result[mask] = (levels[rows[mask]] > 0).any(axis=1)
+        return result
+
+
+skill_matrix = SkillMatrix(settings.SKILL_MATRIX_MAX_AGE)
+register_table_listener(EmployeeSkill.__tablename__, skill_matrix.invalidate)
@@ -17,7 +17,7 @@ router = APIRouter(prefix="/api/departments", tags=["部门管理"])
 
 
 @router.post("/", response_model=BaseResponse[DepartmentInDB])
-async def create_department_info(
+def create_department_info(
     department: DepartmentCreate, db: Session = Depends(get_db)
 ):
     """创建部门"""
@@ -29,7 +29,7 @@ async def create_department_info(
 
 
 @router.get("/{department_id}", response_model=BaseResponse[DepartmentInDB])
-async def read_department(department_id: int, db: Session = Depends(get_db)):
+def read_department(department_id: int, db: Session = Depends(get_db)):
     """获取部门详情"""
     try:
         department = get_department(department_id, db)
@@ -41,7 +41,7 @@ async def read_department(department_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=BaseResponse[list[DepartmentInDB]])
-async def read_departments(
+def read_departments(
     skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
 ):
     """获取部门列表"""
@@ -53,7 +53,7 @@ async def read_departments(
 
 
 @router.put("/{department_id}", response_model=DepartmentInDB)
-async def update_department_info(
+def update_department_info(
     department_id: int,
     department_update: DepartmentUpdate,
     db: Session = Depends(get_db),
@@ -66,7 +66,7 @@ async def update_department_info(
 
 
 @router.delete("/{department_id}")
-async def delete_department_info(department_id: int, db: Session = Depends(get_db)):
+def delete_department_info(department_id: int, db: Session = Depends(get_db)):
     """删除部门"""
     success = delete_department(department_id, db)
     if not success:
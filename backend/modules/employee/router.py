@@ -42,13 +42,13 @@ async def upload_resume(file: UploadFile = File(...), db: Session = Depends(get_
 
 
 @router.post("/", response_model=EmployeeInDB)
-async def create_employee_info(employee: EmployeeCreate, db: Session = Depends(get_db)):
+def create_employee_info(employee: EmployeeCreate, db: Session = Depends(get_db)):
     """创建员工"""
     return create_employee(employee, db)
 
 
 @router.get("/{employee_id}", response_model=EmployeeInDB)
-async def read_employee(employee_id: int, db: Session = Depends(get_db)):
+def read_employee(employee_id: int, db: Session = Depends(get_db)):
     """获取员工详情"""
     employee = get_employee(employee_id, db)
     if employee is None:
@@ -57,7 +57,7 @@ async def read_employee(employee_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=list[EmployeeInDB])
-async def read_employees(
+def read_employees(
     skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
 ):
     """获取员工列表"""
@@ -65,7 +65,7 @@ async def read_employees(
 
 
 @router.put("/{employee_id}", response_model=EmployeeInDB)
-async def update_employee_info(
+def update_employee_info(
     employee_id: int, employee_update: EmployeeUpdate, db: Session = Depends(get_db)
 ):
     """更新员工信息"""
@@ -76,7 +76,7 @@ async def update_employee_info(
 
 
 @router.delete("/{employee_id}")
-async def delete_employee_info(employee_id: int, db: Session = Depends(get_db)):
+def delete_employee_info(employee_id: int, db: Session = Depends(get_db)):
     """删除员工"""
     success = delete_employee(employee_id, db)
     if not success:
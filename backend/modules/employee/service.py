@@ -3,6 +3,7 @@ import os
 from typing import List, Optional
 
 import xlrd
+from fastapi.concurrency import run_in_threadpool
 from openpyxl import load_workbook
 from sqlalchemy.orm import Session
 
@@ -27,6 +28,15 @@ async def process_file(file, db: Session):
         employees_data = await process_xls_file(file_location)
     elif file.filename.endswith(".xlsx"):
         employees_data = await process_xlsx_file(file_location)
+    try:
+        return await run_in_threadpool(_save_imported_employees, employees_data, db)
+    finally:
+        # 删除临时文件
+        os.remove(file_location)
+
+
+def _save_imported_employees(employees_data: List[dict], db: Session):
+    """保存导入的员工数据，部门不存在时自动创建"""
     try:
         created_employees = []
         for emp_data in employees_data:
@@ -76,8 +86,6 @@ async def process_file(file, db: Session):
         raise e
     finally:
         db.close()
-        # 删除临时文件
-        os.remove(file_location)
 
 
 async def process_xls_file(file_path: str):
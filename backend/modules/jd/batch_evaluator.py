@@ -0,0 +1,262 @@
+import asyncio
+import json
+import os
+import tempfile
+import zipfile
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from common.logger import logger
+from config.database import SessionLocal
+from config.settings import settings
+from modules.resume.service import analyze_resumes
+from utils.parse_cache import parse_cache
+from utils.parse_executor import parse_executor
+
+from .service import evaluate_resume, prepare_resume_evaluation
+
+SUPPORTED_RESUME_EXTENSIONS = (".pdf", ".docx", ".txt")
+_CHUNK_SIZE = 1024 * 1024
+
+# 全局限制同时进行大模型打分的简历数（跨请求共享）
+_scoring_semaphore = asyncio.Semaphore(settings.BATCH_EVALUATION_CONCURRENCY)
+
+
+def _decode_zip_name(info: zipfile.ZipInfo) -> str:
+    """Windows 下打包的 zip 文件名通常是 GBK 编码且未设置 UTF-8 标记"""
+    if info.flag_bits & 0x800:
+        return info.filename
+    try:
+        return info.filename.encode("cp437").decode("gbk")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return info.filename
+
+
+def _extract_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, max_bytes: int) -> Optional[str]:
+    """把压缩包中的一个文件分块解压到临时文件，超过大小上限时返回None"""
+    suffix = os.path.splitext(info.filename)[1]
+    fd, path = tempfile.mkstemp(prefix="aihr_batch_", suffix=suffix)
+    try:
+        written = 0
+        with os.fdopen(fd, "wb") as target, archive.open(info) as source:
+            while chunk := source.read(_CHUNK_SIZE):
+                written += len(chunk)
+                if max_bytes and written > max_bytes:
+                    break
+                target.write(chunk)
+        if max_bytes and written > max_bytes:
+            os.remove(path)
+            return None
+        return path
+    except BaseException:
+        os.remove(path)
+        raise
+
+
+def expand_resume_files(
+    files: List[Tuple[str, str]],
+) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """
+    展开上传文件列表中的 zip 压缩包，只保留支持的简历格式
+
+    files 为 (文件名, 临时文件路径)；压缩包中的简历逐个解压到临时文件，不整体读入内存
+
+    Returns:
+        (简历列表 [(文件名, 临时文件路径)], 解压产生的临时文件路径，由调用方删除)
+    """
+    resumes, extracted = [], []
+    try:
+        for filename, path in files:
+            extension = os.path.splitext(filename)[1].lower()
+            if extension == ".zip":
+                with zipfile.ZipFile(path) as archive:
+                    for info in archive.infolist():
+                        name = _decode_zip_name(info)
+                        if info.is_dir() or name.startswith("__MACOSX/"):
+                            continue
+                        if not name.lower().endswith(SUPPORTED_RESUME_EXTENSIONS):
+                            continue
+                        member_path = _extract_member(archive, info, settings.PARSE_MAX_FILE_BYTES)
+                        if member_path is None:
+                            logger.warning(f"压缩包中的文件过大，已跳过: {name}")
+                            continue
+                        extracted.append(member_path)
+                        resumes.append((os.path.basename(name), member_path))
+            elif extension in SUPPORTED_RESUME_EXTENSIONS:
+                resumes.append((filename, path))
+    except BaseException:
+        remove_files(extracted)
+        raise
+    return resumes, extracted
+
+
+def remove_files(paths: List[str]):
+    """删除临时文件，忽略已不存在的文件"""
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _total_score(step_results: List[Dict[str, Any]]) -> float:
+    """汇总各评估步骤的分数"""
+    total = 0.0
+    for result in step_results:
+        try:
+            total += float(result.get("score") or 0)
+        except (TypeError, ValueError):
+            continue
+    return total
+
+
+def _event(event: str, data: Dict[str, Any]) -> str:
+    return json.dumps({"event": event, "data": data}, ensure_ascii=False)
+
+
+async def evaluate_resumes_batch(
+    jd_id: int, files: List[Tuple[str, str]]
+) -> AsyncGenerator[str, None]:
+    """
+    批量评估多份简历与同一JD的匹配度
+    - files 为 (文件名, 临时文件路径)，评估结束后删除这些临时文件
+    - JD与评分规则只加载一次，评估步骤复用缓存
+    - 文档在进程池中并行解析，同一批次同时解析的文档数不超过解析进程数
+    - 大模型打分受全局并发数限制
+    - 全部解析完成后批量提取候选人信息（姓名、联系方式等），与打分并行
+    通过同一个SSE通道推送每份简历的进度，最后推送按总分排序的结果
+    """
+    extracted: List[str] = []
+    tasks: List[asyncio.Task] = []
+    # 响应体开始输出前依赖注入的会话已经关闭，流式过程中使用独立的会话
+    db = SessionLocal()
+    try:
+        try:
+            resumes, extracted = await run_in_threadpool(expand_resume_files, files)
+        except zipfile.BadZipFile as e:
+            yield _event("error", {"message": f"压缩包解析失败: {str(e)}"})
+            return
+
+        if not resumes:
+            yield _event("error", {"message": "没有可评估的简历文件（支持PDF/DOCX/TXT或zip压缩包）"})
+            return
+
+        try:
+            evaluation_context = await prepare_resume_evaluation(jd_id, db)
+        except Exception as e:
+            yield _event("error", {"message": f"加载评估标准失败: {str(e)}"})
+            return
+
+        yield _event(
+            "start",
+            {
+                "total": len(resumes),
+                "steps": evaluation_context["steps"],
+                "message": f"开始批量评估 {len(resumes)} 份简历",
+            },
+        )
+
+        queue: asyncio.Queue = asyncio.Queue()
+        parse_semaphore = asyncio.Semaphore(parse_executor.max_workers)
+        loop = asyncio.get_running_loop()
+        # 每份简历的解析结果，解析失败为None
+        parsed: List[asyncio.Future] = [loop.create_future() for _ in resumes]
+
+        async def evaluate_one(index: int, filename: str, path: str):
+            base = {"index": index, "filename": filename}
+            try:
+                extension = os.path.splitext(filename)[1]
+                async with parse_semaphore:
+                    resume_text = await parse_cache.parse(path, extension)
+                parsed[index].set_result(resume_text)
+                await queue.put(_event("parsed", base))
+
+                step_results = []
+                async with _scoring_semaphore:
+                    await queue.put(_event("evaluating", base))
+                    async for result in evaluate_resume(
+                        jd_id, resume_text, db, evaluation_context=evaluation_context
+                    ):
+                        if result.get("step") == 0:
+                            continue
+                        step_results.append(result)
+                        await queue.put(_event("step", {**base, "result": result}))
+
+                completed = {
+                    **base,
+                    "total_score": _total_score(step_results),
+                    "steps": step_results,
+                }
+                await queue.put(_event("resume_completed", completed))
+                return completed
+            except Exception as e:
+                logger.error(f"批量评估简历失败 {filename}: {e}")
+                if not parsed[index].done():
+                    parsed[index].set_result(None)
+                await queue.put(_event("resume_error", {**base, "message": str(e)}))
+                return None
+
+        async def extract_candidates() -> Dict[int, Dict[str, Any]]:
+            texts = await asyncio.gather(*parsed)
+            indexes = [index for index, text in enumerate(texts) if text is not None]
+            if not indexes:
+                return {}
+            try:
+                infos = await analyze_resumes([texts[index] for index in indexes])
+            except Exception as e:
+                logger.warning(f"批量提取候选人信息失败: {e}")
+                return {}
+            candidates = dict(zip(indexes, infos))
+            await queue.put(
+                _event(
+                    "candidates",
+                    {"candidates": [{"index": index, **info} for index, info in candidates.items()]},
+                )
+            )
+            return candidates
+
+        tasks = [
+            asyncio.create_task(evaluate_one(index, filename, path))
+            for index, (filename, path) in enumerate(resumes)
+        ]
+        candidates_task = asyncio.create_task(extract_candidates())
+        tasks.append(candidates_task)
+        waiter = asyncio.gather(*tasks)
+        while not (waiter.done() and queue.empty()):
+            getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait({getter, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+            else:
+                getter.cancel()
+
+        candidates = candidates_task.result()
+        ranking = sorted(
+            (result for result in waiter.result()[:-1] if result is not None),
+            key=lambda item: item["total_score"],
+            reverse=True,
+        )
+        yield _event(
+            "ranking",
+            {
+                "total": len(resumes),
+                "evaluated": len(ranking),
+                "results": [
+                    {
+                        "rank": rank,
+                        "index": item["index"],
+                        "filename": item["filename"],
+                        "total_score": item["total_score"],
+                        "candidate": candidates.get(item["index"]),
+                    }
+                    for rank, item in enumerate(ranking, start=1)
+                ],
+            },
+        )
+    finally:
+        # 客户端断开时取消未完成的评估
+        for task in tasks:
+            task.cancel()
+        db.close()
+        remove_files([path for _, path in files] + extracted)
@@ -1,8 +1,9 @@
+import asyncio
 import json
 import re
-from typing import Any, Dict, Generator
+from typing import Any, AsyncGenerator, Dict, List, Optional
 
-from config.openai_client import openai_client as client
+from config.openai_client import chat_completion
 from config.settings import settings
 
 
@@ -32,26 +33,21 @@ def safe_json_parse(s: str):
         raise ValueError(f"无法解析为 JSON: {s}")
 
 
-def evaluate_resume_stepwise(
-    jd_text: str, resume_text: str, scoring_rules: Dict[str, Any]
-) -> Generator[Dict[str, Any], None, None]:
-    """
-    基于用户自定义评分规则，对简历与JD逐步评估。
-    - 第一步：任务拆分
-    - 后续步骤：逐个执行打分
-    每一步结果用 yield 返回。
-    """
+DEFAULT_SCORING_RULES: Dict[str, Any] = {
+    "学历": {"本科": 5, "研究生": 10, "博士及以上": 20},
+    "技能": {"Python": 10, "SQL": 5, "Java": 8, "JavaScript": 8},
+    "年限": {">=3年": 10, "<3年": 5, "<1年": 0},
+    "真实性": {"AI生成嫌疑": -10, "具体案例丰富": 10},
+}
 
-    # 默认评分规则
-    if not scoring_rules:
-        scoring_rules = {
-            "学历": {"本科": 5, "研究生": 10, "博士及以上": 20},
-            "技能": {"Python": 10, "SQL": 5, "Java": 8, "JavaScript": 8},
-            "年限": {">=3年": 10, "<3年": 5, "<1年": 0},
-            "真实性": {"AI生成嫌疑": -10, "具体案例丰富": 10},
-        }
+# 全局限制同时进行中的步骤打分请求数
+_scoring_semaphore = asyncio.Semaphore(settings.EVALUATION_MAX_CONCURRENCY)
 
-    # 第一步：任务拆解
+
+async def plan_evaluation_steps(scoring_rules: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    任务拆解：根据评分标准拆分出 3-5 个评估步骤
+    """
     step_prompt = f"""
 你是一个招聘评估专家。
 用户提供了一套简历评分标准，请你拆解整个评估流程，分为 3-5 个具体的评估步骤。
@@ -73,20 +69,53 @@ def evaluate_resume_stepwise(
 【用户提供的评分标准】
 {scoring_rules}
 """
-    step_response = client.chat.completions.create(
-        model=settings.OPENAI_MODEL,
+    step_response = await chat_completion(
         messages=[{"role": "user", "content": step_prompt}],
         response_format={"type": "json_object"},
     )
     steps_json = step_response.choices[0].message.content
-    steps = json.loads(steps_json)["steps"]
+    return normalize_evaluation_steps(json.loads(steps_json).get("steps"))
 
-    # 先返回任务拆解结果
-    yield {"step": 0, "name": "任务拆解", "steps": steps}
 
-    # 然后逐个执行步骤
-    for step in steps:
-        score_prompt = f"""
+def normalize_evaluation_steps(steps: Any) -> List[Dict[str, Any]]:
+    """
+    校验拆解出的评估步骤：丢弃非字典项，补全缺失的 id（按位置编号）、name 和 desc
+
+    并发打分按 step 字段区分结果，因此 id 必须存在且互不相同
+    """
+    if not isinstance(steps, list):
+        raise ValueError("评估步骤拆解结果格式错误：steps 不是列表")
+
+    normalized = []
+    used_ids = set()
+    for position, step in enumerate((step for step in steps if isinstance(step, dict)), start=1):
+        step = dict(step)
+        step_id = step.get("id")
+        if step_id is None or step_id in used_ids:
+            step_id = position
+            while step_id in used_ids:
+                step_id += 1
+        step["id"] = step_id
+        used_ids.add(step_id)
+        step.setdefault("name", f"评估步骤{position}")
+        step.setdefault("desc", step["name"])
+        normalized.append(step)
+
+    if not normalized:
+        raise ValueError("评估步骤拆解结果为空")
+    return normalized
+
+
+async def score_evaluation_step(
+    step: Dict[str, Any],
+    jd_text: str,
+    resume_text: str,
+    scoring_rules: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    执行单个评估步骤的打分，返回结果中的 step 字段始终为步骤ID
+    """
+    score_prompt = f"""
 你是一个招聘评估专家，请执行以下评估步骤：
 
 步骤名称：{step['name']}
@@ -112,11 +141,66 @@ def evaluate_resume_stepwise(
 【简历内容】
 {resume_text}
 """
-        score_response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
+    async with _scoring_semaphore:
+        score_response = await chat_completion(
             messages=[{"role": "user", "content": score_prompt}],
             response_format={"type": "json_object"},
         )
-        result = score_response.choices[0].message.content
-        step_result = safe_json_parse(result)
-        yield step_result
+    result = score_response.choices[0].message.content
+    step_result = safe_json_parse(result)
+    # 并发模式下结果乱序到达，以步骤ID为准，方便前端归位
+    step_result["step"] = step["id"]
+    return step_result
+
+
+async def evaluate_resume_stepwise(
+    jd_text: str,
+    resume_text: str,
+    scoring_rules: Dict[str, Any],
+    concurrent: bool = True,
+    steps: Optional[List[Dict[str, Any]]] = None,
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    基于用户自定义评分规则，对简历与JD逐步评估。
+    - 第一步：任务拆分（传入 steps 时直接复用已拆解的步骤）
+    - 后续步骤：执行打分，concurrent=True 时所有步骤同时打分，
+      哪个步骤先完成就先返回（通过 step 字段区分）；否则逐个执行
+    每一步结果用 yield 返回。
+    """
+
+    # 默认评分规则
+    if not scoring_rules:
+        scoring_rules = DEFAULT_SCORING_RULES
+
+    # 第一步：任务拆解
+    if steps is None:
+        steps = await plan_evaluation_steps(scoring_rules)
+    else:
+        # 复用的步骤可能来自旧版本缓存，同样需要校验
+        steps = normalize_evaluation_steps(steps)
+
+    # 先返回任务拆解结果
+    yield {"step": 0, "name": "任务拆解", "steps": steps}
+
+    if not concurrent:
+        # 逐个执行步骤
+        for step in steps:
+            yield await score_evaluation_step(
+                step, jd_text, resume_text, scoring_rules
+            )
+        return
+
+    # 并发执行所有步骤，按完成顺序返回
+    tasks = [
+        asyncio.create_task(
+            score_evaluation_step(step, jd_text, resume_text, scoring_rules)
+        )
+        for step in steps
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # 出错或客户端断开时，取消尚未完成的步骤
+        for task in tasks:
+            task.cancel()
@@ -1,11 +1,10 @@
 import json
 from typing import Any, Dict
 
-from config.openai_client import openai_client as client
-from config.settings import settings
+from config.openai_client import chat_completion
 
 
-def extract_jd_keywords(full_text: str) -> Dict[str, Any]:
+async def extract_jd_keywords(full_text: str) -> Dict[str, Any]:
     """
     从完整的JD描述中提取关键字并结构化
     """
@@ -41,8 +40,7 @@ def extract_jd_keywords(full_text: str) -> Dict[str, Any]:
 """
 
     try:
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
+        response = await chat_completion(
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
             temperature=0.3,
@@ -13,6 +13,17 @@ class JDBase(BaseModel):
     status: str = "草稿"
 
 
+class JDCandidate(BaseModel):
+    """JD候选人排名条目"""
+
+    rank: int
+    resume_id: int
+    score: float
+    filename: Optional[str] = None
+    name: Optional[str] = None
+    status: Optional[str] = None
+
+
 class JDCreate(JDBase):
     pass
 
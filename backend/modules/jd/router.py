@@ -1,20 +1,28 @@
 import asyncio
 import json
+import os
 import traceback
+from contextlib import aclosing
 from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sse_starlette.sse import EventSourceResponse
 
-from config.database import get_db
+from common.logger import logger
+from config.database import SessionLocal, get_db
+from config.settings import settings
 from models.jd import JobDescription
 from modules import BaseResponse, PageResponse
-from utils.document_parser import parse_document
+from utils.document_parser import spool_upload
+from utils.parse_cache import parse_cache
 
+from .batch_evaluator import evaluate_resumes_batch, remove_files
 from .models import (
     EvaluationCriteriaUpdate,
+    JDCandidate,
     JDCreate,
     JDFullInfoUpdate,
     JDInDB,
@@ -26,19 +34,21 @@ from .service import (
     delete_jd,
     evaluate_resume,
     get_jd,
+    get_jd_candidates,
     get_jd_evaluation_criteria,
     get_jds,
-    polish_jd_text,
+    polish_jd_text_stream,
     update_jd,
     update_jd_evaluation_criteria,
     update_jd_full_info,
+    update_jd_keywords,
 )
 
 router = APIRouter(prefix="/api/jd", tags=["JD管理"])
 
 
 @router.post("/", response_model=BaseResponse[JDInDB])
-async def create_jd_info(jd: JDCreate, db: Session = Depends(get_db)):
+def create_jd_info(jd: JDCreate, db: Session = Depends(get_db)):
     """创建JD"""
     try:
         result = create_jd(jd, db)
@@ -48,7 +58,7 @@ async def create_jd_info(jd: JDCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{jd_id}", response_model=BaseResponse[JDInDB])
-async def read_jd(jd_id: int, db: Session = Depends(get_db)):
+def read_jd(jd_id: int, db: Session = Depends(get_db)):
     """获取JD详情"""
     try:
         jd = get_jd(jd_id, db)
@@ -60,7 +70,7 @@ async def read_jd(jd_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=BaseResponse[PageResponse[JDInDB]])
-async def read_jds(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_jds(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """获取JD列表"""
     try:
         jds = get_jds(skip=skip, limit=limit, db=db)
@@ -73,7 +83,7 @@ async def read_jds(skip: int = 0, limit: int = 100, db: Session = Depends(get_db
 
 
 @router.put("/{jd_id}", response_model=BaseResponse[JDInDB])
-async def update_jd_info(
+def update_jd_info(
     jd_id: int, jd_update: JDUpdate, db: Session = Depends(get_db)
 ):
     """更新JD信息"""
@@ -87,7 +97,7 @@ async def update_jd_info(
 
 
 @router.delete("/{jd_id}", response_model=BaseResponse[dict])
-async def delete_jd_info(jd_id: int, db: Session = Depends(get_db)):
+def delete_jd_info(jd_id: int, db: Session = Depends(get_db)):
     """删除JD"""
     try:
         success = delete_jd(jd_id, db)
@@ -100,20 +110,34 @@ async def delete_jd_info(jd_id: int, db: Session = Depends(get_db)):
 
 @router.post("/{jd_id}/evaluate-resume")
 async def evaluate_resume_stream(
-    jd_id: int, resume_file: UploadFile = File(...), db: Session = Depends(get_db)
+    jd_id: int,
+    resume_file: UploadFile = File(...),
+    concurrent: bool = True,
 ):
     """
     流式评估简历与JD的匹配度
+
+    concurrent=true（默认）时所有评估步骤同时打分，每个步骤完成后立即推送，
+    结果中的 step 字段为步骤ID，前端据此归位；concurrent=false 时逐个打分
     """
     filename = resume_file.filename
     file_extension = filename.split(".")[-1]
 
-    # 读取简历文件内容
-    resume_content = parse_document(await resume_file.read(), file_extension)
+    # 读取简历文件内容（先落盘，再在解析进程池中按页/段落流式解析）
+    try:
+        file_path = await spool_upload(resume_file)
+        try:
+            resume_content = await parse_cache.parse(file_path, file_extension)
+        finally:
+            os.remove(file_path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    def generate_evaluation_stream():
+    async def generate_evaluation_stream():
+        # 响应体开始输出前依赖注入的会话已经关闭，流式过程中使用独立的会话
+        db = SessionLocal()
         try:
-            for result in evaluate_resume(jd_id, resume_content, db):
+            async for result in evaluate_resume(jd_id, resume_content, db, concurrent):
                 yield f"data: {json.dumps(result, ensure_ascii=False)}\n\n"
         except ValueError as e:
             error_data = {"error": str(e), "type": "not_found"}
@@ -125,6 +149,7 @@ async def evaluate_resume_stream(
             }
             yield f"data: {json.dumps(error_data, ensure_ascii=False)}\n\n"
         finally:
+            db.close()
             # 发送结束信号
             yield "data: [DONE]\n\n"
 
@@ -140,8 +165,36 @@ async def evaluate_resume_stream(
     )
 
 
+@router.post("/{jd_id}/evaluate-resumes")
+async def evaluate_resumes_batch_stream(
+    jd_id: int,
+    resume_files: List[UploadFile] = File(...),
+):
+    """
+    批量评估多份简历与JD的匹配度（SSE）
+
+    支持一次上传多个简历文件或zip压缩包，通过同一个流推送每份简历的
+    解析/打分进度，最后推送按总分排序的结果（ranking 事件）
+    """
+
+    async def error_generator(message: str):
+        yield json.dumps({"event": "error", "data": {"message": message}}, ensure_ascii=False)
+
+    # 响应开始流式输出前上传文件就会被关闭，这里逐个写入临时文件，不整体读入内存
+    files = []
+    try:
+        for file in resume_files:
+            max_bytes = settings.BATCH_EVALUATION_MAX_ZIP_BYTES if file.filename.lower().endswith(".zip") else None
+            files.append((file.filename, await spool_upload(file, max_bytes)))
+    except ValueError as e:
+        remove_files([path for _, path in files])
+        return EventSourceResponse(error_generator(f"{file.filename}: {str(e)}"))
+
+    return EventSourceResponse(evaluate_resumes_batch(jd_id, files))
+
+
 @router.put("/{jd_id}/evaluation-criteria", response_model=BaseResponse[dict])
-async def update_evaluation_criteria(
+def update_evaluation_criteria(
     jd_id: int, criteria_data: EvaluationCriteriaUpdate, db: Session = Depends(get_db)
 ):
     """
@@ -157,7 +210,7 @@ async def update_evaluation_criteria(
 
 
 @router.get("/{jd_id}/evaluation-criteria", response_model=BaseResponse[dict])
-async def get_evaluation_criteria(jd_id: int, db: Session = Depends(get_db)):
+def get_evaluation_criteria(jd_id: int, db: Session = Depends(get_db)):
     """
     获取JD的评估标准
     """
@@ -170,8 +223,26 @@ async def get_evaluation_criteria(jd_id: int, db: Session = Depends(get_db)):
         return BaseResponse(code=500, message=f"获取评估标准失败: {str(e)}", data=None)
 
 
+@router.get(
+    "/{jd_id}/candidates", response_model=BaseResponse[PageResponse[JDCandidate]]
+)
+def get_candidates(
+    jd_id: int, skip: int = 0, limit: int = 20, db: Session = Depends(get_db)
+):
+    """
+    获取JD的候选人排名（按简历与JD的匹配分从高到低，支持分页）
+    """
+    try:
+        candidates = get_jd_candidates(jd_id, skip, limit, db)
+        if candidates is None:
+            return BaseResponse(code=404, message="JD未找到", data=None)
+        return BaseResponse(data=candidates)
+    except Exception as e:
+        return BaseResponse(code=500, message=f"获取候选人排名失败: {str(e)}", data=None)
+
+
 @router.put("/{jd_id}/full-info", response_model=BaseResponse[JDInDB])
-async def update_jd_full_info_endpoint(
+def update_jd_full_info_endpoint(
     jd_id: int, full_info: JDFullInfoUpdate, db: Session = Depends(get_db)
 ):
     """
@@ -189,7 +260,7 @@ async def update_jd_full_info_endpoint(
 
 
 @router.get("/{jd_id}/full-info", response_model=BaseResponse[dict])
-async def get_jd_full_info(jd_id: int, db: Session = Depends(get_db)):
+def get_jd_full_info(jd_id: int, db: Session = Depends(get_db)):
     """
     获取JD的完整信息
     """
@@ -219,8 +290,8 @@ async def extract_keywords_from_jd(
     """
     try:
         # 获取JD
-        db_jd = db.query(JobDescription).filter(JobDescription.id == jd_id).first()
-        if db_jd is None:
+        jd = await run_in_threadpool(get_jd, jd_id, db)
+        if jd is None:
             return BaseResponse(code=404, message="JD未找到", data=None)
 
         full_text = request_data.get("full_text", "")
@@ -230,31 +301,14 @@ async def extract_keywords_from_jd(
         # 调用大模型提取关键字
         from .keyword_extractor import extract_jd_keywords
 
-        extracted_data = extract_jd_keywords(full_text)
-
-        # 更新JD字段
-        if extracted_data.get("title"):
-            db_jd.title = extracted_data["title"]
-        if extracted_data.get("department"):
-            db_jd.department = extracted_data["department"]
-        if extracted_data.get("location"):
-            db_jd.location = extracted_data["location"]
-        if extracted_data.get("description"):
-            db_jd.description = extracted_data["description"]
-        if extracted_data.get("requirements"):
-            db_jd.requirements = extracted_data["requirements"]
-        if extracted_data.get("salary_range"):
-            db_jd.salary_range = extracted_data["salary_range"]
+        extracted_data = await extract_jd_keywords(full_text)
 
-        # 更新full_text
-        db_jd.full_text = full_text
-
-        db.commit()
-        db.refresh(db_jd)
-
-        # 返回更新后的JD信息
-        from .service import _build_jd_in_db
-        result = _build_jd_in_db(db_jd, db)
+        # 更新JD字段，返回更新后的JD信息
+        result = await run_in_threadpool(
+            update_jd_keywords, jd_id, full_text, extracted_data, db
+        )
+        if result is None:
+            return BaseResponse(code=404, message="JD未找到", data=None)
 
         return BaseResponse(data=result)
 
@@ -266,6 +320,9 @@ async def extract_keywords_from_jd(
 async def polish_jd_text_endpoint(request_data: dict):
     """
     AI润色JD文本 - 流式接口
+
+    start 事件后以 delta 事件逐段转发大模型生成的Markdown文本，complete 事件携带完整润色结果；
+    客户端断开连接时生成器被取消，同时中止上游的大模型请求
     """
     original_text = request_data.get("original_text", "")
     if not original_text.strip():
@@ -273,46 +330,37 @@ async def polish_jd_text_endpoint(request_data: dict):
         return BaseResponse(code=400, message="原始文本不能为空", data=None)
 
     async def generate_polish_stream():
+        parts = []
         try:
             # 发送开始信号
             yield json.dumps({
                 "event": "start",
-                "data": {"message": "开始AI润色处理..."}
+                "data": {"message": "开始AI润色处理...", "progress": 0}
             }, ensure_ascii=False)
-            
-            # 模拟分步处理（实际可以根据需要调整）
-            yield json.dumps({
-                "event": "progress", 
-                "data": {"message": "正在分析文本内容...", "progress": 20}
-            }, ensure_ascii=False)
-            
-            await asyncio.sleep(0.5)  # 模拟处理时间
-            
-            yield json.dumps({
-                "event": "progress",
-                "data": {"message": "正在生成润色文本...", "progress": 60}
-            }, ensure_ascii=False)
-            
-            # 调用润色服务
-            polished_text = polish_jd_text(original_text)
-            
-            yield json.dumps({
-                "event": "progress",
-                "data": {"message": "润色完成，正在格式化...", "progress": 90}
-            }, ensure_ascii=False)
-            
-            await asyncio.sleep(0.2)
-            
+
+            # 逐段转发大模型生成的润色文本
+            deltas = polish_jd_text_stream(original_text)
+            async with aclosing(deltas):
+                async for content in deltas:
+                    parts.append(content)
+                    yield json.dumps({
+                        "event": "delta",
+                        "data": {"content": content}
+                    }, ensure_ascii=False)
+
             # 发送最终结果
             yield json.dumps({
                 "event": "complete",
                 "data": {
-                    "polished_text": polished_text,
+                    "polished_text": "".join(parts).strip(),
                     "message": "AI润色完成",
                     "progress": 100
                 }
             }, ensure_ascii=False)
-            
+
+        except asyncio.CancelledError:
+            logger.info(f"客户端断开连接，已中止JD润色（已生成 {sum(map(len, parts))} 字）")
+            raise
         except Exception as e:
             yield json.dumps({
                 "event": "error",
@@ -334,7 +382,7 @@ async def create_jd_from_text_endpoint(
         if not text.strip():
             return BaseResponse(code=400, message="文本内容不能为空", data=None)
 
-        jd = create_jd_from_text(text, db)
+        jd = await create_jd_from_text(text, db)
         return BaseResponse(data=jd)
     except Exception as e:
         traceback.print_exc()
@@ -1,13 +1,25 @@
+import copy
+import hashlib
 import json
-from typing import Any, Dict, Generator, List, Optional
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from models.jd import JobDescription
+from common.logger import logger
+from models.jd import EvaluationPlan, JobDescription
 from models.department import Department
-
-from .evaluation_agent import evaluate_resume_stepwise
-from .models import JDCreate, JDFullInfoUpdate, JDInDB, JDUpdate
+from models.resume import Resume
+from modules import PageResponse
+from utils.candidate_ranking import candidate_ranking
+
+from .evaluation_agent import (
+    DEFAULT_SCORING_RULES,
+    evaluate_resume_stepwise,
+    plan_evaluation_steps,
+)
+from .models import JDCandidate, JDCreate, JDFullInfoUpdate, JDInDB, JDUpdate
 from .text_polisher import jd_polisher
 
 
@@ -44,23 +56,37 @@ def _build_jd_in_db(db_jd: JobDescription, db: Session) -> JDInDB:
     )
 
 
-def polish_jd_text(original_text: str) -> str:
+async def polish_jd_text(original_text: str) -> str:
     """
     AI润色JD文本
     """
-    return jd_polisher.polish_text(original_text)
+    return await jd_polisher.polish_text(original_text)
+
+
+def polish_jd_text_stream(original_text: str) -> AsyncGenerator[str, None]:
+    """
+    流式AI润色JD文本，逐段产出Markdown文本
+    """
+    return jd_polisher.polish_text_stream(original_text)
 
 
-def create_jd_from_text(text: str, db: Session) -> JDInDB:
+async def create_jd_from_text(text: str, db: Session) -> JDInDB:
     """
     从文本创建JD
     """
     # 使用AI提取结构化信息
-    extracted_fields = jd_polisher.extract_jd_fields(text)
+    extracted_fields = await jd_polisher.extract_jd_fields(text)
 
     # 生成评估标准 （没必要在这个接口中都一起完成，很容易超时）
     # evaluation_criteria = jd_polisher.generate_evaluation_criteria(text)
 
+    return await run_in_threadpool(_create_jd_from_fields, text, extracted_fields, db)
+
+
+def _create_jd_from_fields(
+    text: str, extracted_fields: Dict[str, Any], db: Session
+) -> JDInDB:
+    """根据AI提取的字段创建JD记录"""
     # 创建JD记录
     db_jd = JobDescription(
         title=extracted_fields.get("title", "未命名职位"),
@@ -80,6 +106,39 @@ def create_jd_from_text(text: str, db: Session) -> JDInDB:
     return _build_jd_in_db(db_jd, db)
 
 
+def update_jd_keywords(
+    jd_id: int, full_text: str, extracted_data: Dict[str, Any], db: Session
+) -> Optional[JDInDB]:
+    """
+    用大模型提取的关键字更新JD字段
+    """
+    db_jd = db.query(JobDescription).filter(JobDescription.id == jd_id).first()
+    if db_jd is None:
+        return None
+
+    # 更新JD字段
+    if extracted_data.get("title"):
+        db_jd.title = extracted_data["title"]
+    if extracted_data.get("department"):
+        db_jd.department = extracted_data["department"]
+    if extracted_data.get("location"):
+        db_jd.location = extracted_data["location"]
+    if extracted_data.get("description"):
+        db_jd.description = extracted_data["description"]
+    if extracted_data.get("requirements"):
+        db_jd.requirements = extracted_data["requirements"]
+    if extracted_data.get("salary_range"):
+        db_jd.salary_range = extracted_data["salary_range"]
+
+    # 更新full_text
+    db_jd.full_text = full_text
+
+    db.commit()
+    db.refresh(db_jd)
+
+    return _build_jd_in_db(db_jd, db)
+
+
 def create_jd(jd_create: JDCreate, db: Session) -> JDInDB:
     """创建新JD"""
     # 创建JD记录
@@ -176,17 +235,63 @@ def delete_jd(jd_id: int, db: Session) -> bool:
     if db_jd is None:
         return False
 
+    candidate_ranking.remove_jd(jd_id, db)
     db.delete(db_jd)
     db.commit()
     return True
 
 
-def evaluate_resume(
-    jd_id: int, resume_text: str, db: Session
-) -> Generator[Dict[str, Any], None, None]:
+def get_jd_candidates(
+    jd_id: int, skip: int, limit: int, db: Session
+) -> Optional[PageResponse[JDCandidate]]:
     """
-    评估简历与指定JD的匹配度
+    获取JD的候选人排名（按匹配分从高到低）
+    """
+    db_jd = db.query(JobDescription).filter(JobDescription.id == jd_id).first()
+    if db_jd is None:
+        return None
+
+    total, page = candidate_ranking.get_page(db_jd, skip, limit, db)
+    resume_ids = [resume_id for resume_id, _ in page]
+    resumes = {
+        resume.id: resume
+        for resume in db.query(Resume).filter(Resume.id.in_(resume_ids)).all()
+    } if resume_ids else {}
+
+    candidates = []
+    for rank, (resume_id, score) in enumerate(page, start=skip + 1):
+        resume = resumes.get(resume_id)
+        if resume is None:
+            continue
+        candidates.append(
+            JDCandidate(
+                rank=rank,
+                resume_id=resume_id,
+                score=score,
+                filename=resume.filename,
+                name=resume.name,
+                status=resume.status,
+            )
+        )
+    return PageResponse(total=total, data=candidates)
+
+
+async def prepare_resume_evaluation(jd_id: int, db: Session) -> Dict[str, Any]:
     """
+    加载评估所需的JD文本、评分规则和评估步骤，批量评估时只需加载一次
+    """
+    jd_text, scoring_rules = await run_in_threadpool(
+        _load_jd_for_evaluation, jd_id, db
+    )
+
+    # 复用缓存的任务拆解结果
+    steps = await get_evaluation_plan(scoring_rules, db)
+
+    return {"jd_text": jd_text, "scoring_rules": scoring_rules, "steps": steps}
+
+
+def _load_jd_for_evaluation(jd_id: int, db: Session) -> Tuple[str, Dict[str, Any]]:
+    """获取评估用的JD文本和评分规则"""
     # 获取JD信息
     db_jd = db.query(JobDescription).filter(JobDescription.id == jd_id).first()
     if not db_jd:
@@ -196,18 +301,115 @@ def evaluate_resume(
     if db_jd.full_text:
         jd_text = db_jd.full_text
     else:
-        jd_text = f"职位名称: {db_jd.title}\n部门: {db_jd.department}\n工作地点: {db_jd.location}\n描述: {db_jd.description}\n要求: {db_jd.requirements}"
+        department = None
+        if db_jd.department_id:
+            department = (
+                db.query(Department).filter(Department.id == db_jd.department_id).first()
+            )
+        department_name = department.name if department else ""
+        jd_text = f"职位名称: {db_jd.title}\n部门: {department_name}\n工作地点: {db_jd.location}\n描述: {db_jd.description}\n要求: {db_jd.requirements}"
+
+    return jd_text, _get_scoring_rules(db_jd)
+
+
+async def evaluate_resume(
+    jd_id: int,
+    resume_text: str,
+    db: Session,
+    concurrent: bool = True,
+    evaluation_context: Optional[Dict[str, Any]] = None,
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    评估简历与指定JD的匹配度
+
+    concurrent 为 True 时各评估步骤并发打分，结果按完成顺序返回；
+    evaluation_context 为 prepare_resume_evaluation 的结果，传入时不再查询数据库
+    """
+    if evaluation_context is None:
+        evaluation_context = await prepare_resume_evaluation(jd_id, db)
 
-    # 获取评分规则
+    # 调用评估智能体
+    async for result in evaluate_resume_stepwise(
+        evaluation_context["jd_text"],
+        resume_text,
+        evaluation_context["scoring_rules"],
+        concurrent=concurrent,
+        steps=evaluation_context["steps"],
+    ):
+        yield result
+
+
+def _get_scoring_rules(db_jd: JobDescription) -> Dict[str, Any]:
+    """获取JD实际生效的评分规则（未配置或解析失败时使用默认规则）"""
     scoring_rules = {}
     if db_jd.evaluation_criteria:
         try:
             scoring_rules = json.loads(db_jd.evaluation_criteria)
         except json.JSONDecodeError:
             scoring_rules = {}
+    # 返回副本，避免调用方修改全局默认规则（同时会改变其评估步骤缓存的哈希）
+    return scoring_rules or copy.deepcopy(DEFAULT_SCORING_RULES)
 
-    # 调用评估智能体
-    return evaluate_resume_stepwise(jd_text, resume_text, scoring_rules)
+
+def _hash_scoring_rules(scoring_rules: Dict[str, Any]) -> str:
+    """计算评分规则的内容哈希（键排序、去空白后再哈希，保证同一规则得到同一哈希）"""
+    normalized = json.dumps(
+        scoring_rules, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+async def get_evaluation_plan(
+    scoring_rules: Dict[str, Any], db: Session
+) -> List[Dict[str, Any]]:
+    """
+    获取评分规则对应的评估步骤，命中缓存时不再调用大模型做任务拆解
+    """
+    criteria_hash = _hash_scoring_rules(scoring_rules)
+    steps = await run_in_threadpool(_load_cached_evaluation_plan, criteria_hash, db)
+    if steps is not None:
+        return steps
+
+    steps = await plan_evaluation_steps(scoring_rules)
+    await run_in_threadpool(_save_evaluation_plan, criteria_hash, steps, db)
+    return steps
+
+
+def _load_cached_evaluation_plan(
+    criteria_hash: str, db: Session
+) -> Optional[List[Dict[str, Any]]]:
+    """读取缓存的评估步骤，内容损坏时删除缓存"""
+    cached = (
+        db.query(EvaluationPlan)
+        .filter(EvaluationPlan.criteria_hash == criteria_hash)
+        .first()
+    )
+    if cached is None:
+        return None
+    try:
+        return json.loads(cached.steps)
+    except json.JSONDecodeError:
+        db.delete(cached)
+        db.commit()
+        return None
+
+
+def _save_evaluation_plan(
+    criteria_hash: str, steps: List[Dict[str, Any]], db: Session
+):
+    """写入评估步骤缓存"""
+    try:
+        db.add(
+            EvaluationPlan(
+                criteria_hash=criteria_hash,
+                steps=json.dumps(steps, ensure_ascii=False),
+            )
+        )
+        db.commit()
+    except IntegrityError:
+        # 并发评估时其他请求已写入同一规则的拆解结果
+        db.rollback()
+        logger.info(f"评估步骤缓存已存在: {criteria_hash}")
 
 
 def update_jd_evaluation_criteria(
@@ -239,13 +441,8 @@ def get_jd_evaluation_criteria(jd_id: int, db: Session) -> Optional[Dict[str, An
         except json.JSONDecodeError:
             return {}
 
-    # 返回默认评估标准
-    return {
-        "学历": {"本科": 5, "研究生": 10, "博士及以上": 20},
-        "技能": {"Python": 10, "SQL": 5, "Java": 8, "JavaScript": 8},
-        "年限": {">=3年": 10, "<3年": 5, "<1年": 0},
-        "真实性": {"AI生成嫌疑": -10, "具体案例丰富": 10},
-    }
+    # 返回默认评估标准（副本）
+    return copy.deepcopy(DEFAULT_SCORING_RULES)
 
 
 def update_jd_full_info(
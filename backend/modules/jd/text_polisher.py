@@ -1,7 +1,8 @@
 import json
-from typing import Any, Dict
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict
 
-from config.openai_client import openai_client as client
+from config.openai_client import chat_completion, stream_chat_completion
 from config.settings import settings
 
 
@@ -11,11 +12,46 @@ class JDTextPolisher:
     def __init__(self):
         self.model = settings.OPENAI_MODEL
 
-    def polish_text(self, original_text: str) -> str:
+    async def polish_text(self, original_text: str) -> str:
         """
         使用AI对JD原文进行润色，输出格式化的Markdown文本
         """
-        prompt = f"""
+        try:
+            response = await chat_completion(
+                model=self.model,
+                messages=[{"role": "user", "content": self._polish_prompt(original_text)}],
+                temperature=0.7,
+                max_tokens=2000,
+            )
+
+            polished_text = response.choices[0].message.content.strip()
+            return polished_text
+
+        except Exception as e:
+            raise ValueError(f"AI润色失败: {str(e)}")
+
+    async def polish_text_stream(self, original_text: str) -> AsyncIterator[str]:
+        """
+        流式润色JD原文，大模型生成的Markdown文本逐段产出
+
+        调用方停止迭代（如客户端断开连接）时中止上游请求
+        """
+        deltas = stream_chat_completion(
+            model=self.model,
+            messages=[{"role": "user", "content": self._polish_prompt(original_text)}],
+            temperature=0.7,
+            max_tokens=2000,
+        )
+        try:
+            async with aclosing(deltas):
+                async for content in deltas:
+                    yield content
+        except Exception as e:
+            raise ValueError(f"AI润色失败: {str(e)}")
+
+    @staticmethod
+    def _polish_prompt(original_text: str) -> str:
+        return f"""
 你是一个专业的HR文档编辑专家。请对以下JD原文进行润色和格式化，输出符合专业标准的Markdown格式文本。
 
 润色要求：
@@ -39,21 +75,7 @@ class JDTextPolisher:
 请输出润色后的Markdown格式文本：
 """
 
-        try:
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=2000,
-            )
-
-            polished_text = response.choices[0].message.content.strip()
-            return polished_text
-
-        except Exception as e:
-            raise ValueError(f"AI润色失败: {str(e)}")
-
-    def extract_jd_fields(self, text: str) -> Dict[str, Any]:
+    async def extract_jd_fields(self, text: str) -> Dict[str, Any]:
         """
         从文本中提取JD的结构化字段信息
         """
@@ -89,7 +111,7 @@ JD文本内容：
 """
 
         try:
-            response = client.chat.completions.create(
+            response = await chat_completion(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 response_format={"type": "json_object"},
@@ -102,7 +124,7 @@ JD文本内容：
         except Exception as e:
             raise ValueError(f"信息提取失败: {str(e)}")
 
-    def generate_evaluation_criteria(self, text: str) -> Dict[str, Any]:
+    async def generate_evaluation_criteria(self, text: str) -> Dict[str, Any]:
         """
         根据JD内容生成智能评估标准
         """
@@ -153,7 +175,7 @@ JD内容：
 """
 
         try:
-            response = client.chat.completions.create(
+            response = await chat_completion(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 response_format={"type": "json_object"},
@@ -0,0 +1,259 @@
+import asyncio
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from common.cache import LRUCache
+from common.logger import logger
+from config.openai_client import chat_completion
+from config.settings import settings
+
+# 提取的字段及对应 Resume 表字段的长度上限（None 表示 Text 字段）
+RESUME_FIELDS: Dict[str, Optional[int]] = {
+    "name": 100,
+    "email": 100,
+    "phone": 20,
+    "education": 255,
+    "experience": None,
+    "skills": None,
+    "position": 100,
+}
+
+FIELD_DESCRIPTIONS = {
+    "name": "候选人姓名",
+    "email": "邮箱",
+    "phone": "手机号或联系电话",
+    "education": "最高学历及毕业院校、专业，如“XX大学 计算机科学 硕士”",
+    "experience": "工作经验概述，如“5年后端开发经验，曾任XX公司高级工程师”",
+    "skills": "主要技能，逗号分隔",
+    "position": "求职意向/应聘职位",
+}
+
+_EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_MOBILE_PATTERN = re.compile(r"(?<!\d)(?:\+?86[-\s]?)?1[3-9]\d[-\s]?\d{4}[-\s]?\d{4}(?!\d)")
+_LABELED_PHONE_PATTERN = re.compile(r"(?:电话|手机|联系方式|Tel|Phone|Mobile)\s*[:：]\s*([+\d][\d\-\s()Xx*]{6,19})", re.I)
+_LABELED_NAME_PATTERN = re.compile(r"姓\s*名\s*[:：]\s*([一-龥·]{2,10}|[A-Za-z]+(?: [A-Za-z]+){0,3})")
+_CHINESE_NAME_PATTERN = re.compile(r"^[一-龥]{1,2}[一-龥·]{1,4}$")
+_ENGLISH_NAME_PATTERN = re.compile(r"^[A-Z][a-z]+(?: [A-Z][a-z]+){1,2}$")
+# 简历开头常见的标题/栏目名，形如姓名但不是姓名
+_NAME_STOPWORDS = {
+    "简历", "个人简历", "求职简历", "中文简历", "英文简历", "应聘简历", "简历表",
+    "基本信息", "个人信息", "个人资料", "联系方式", "求职意向", "教育背景", "教育经历",
+    "工作经历", "工作经验", "项目经历", "项目经验", "专业技能", "技能特长", "自我评价",
+    "个人总结", "获奖情况", "荣誉奖项", "证书", "实习经历", "校园经历", "培训经历",
+    "Resume", "Curriculum Vitae",
+}
+_POSITION_PATTERN = re.compile(r"(?:求职意向|应聘职位|应聘岗位|期望职位|目标职位|意向岗位)\s*[:：]\s*([^\n|，,；;]{2,50})")
+_EXPERIENCE_PATTERN = re.compile(r"(\d{1,2}\s*\+?\s*年(?:以上)?[^\n，。,；;]{0,12}?经验)")
+_LABELED_SKILLS_PATTERN = re.compile(r"(?:专业技能|技能特长|掌握技能|技能)\s*[:：]\s*([^\n]{2,200})")
+# 学历关键词，按从高到低排列
+_DEGREES = ("博士", "硕士", "研究生", "本科", "学士", "大专", "专科")
+_SCHOOL_PATTERN = re.compile(r"[一-龥A-Za-z]{2,20}(?:大学|学院)")
+
+
+def content_hash(content: str) -> str:
+    """简历文本的内容哈希，作为提取结果的缓存键"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _first_match(pattern: re.Pattern, text: str, group: int = 0) -> Optional[str]:
+    match = pattern.search(text)
+    return match.group(group).strip() if match else None
+
+
+def _extract_name(lines: List[str]) -> Optional[str]:
+    """优先取“姓名：”标注的值，没有标注时取开头几行中形如姓名且不是栏目标题的一行"""
+    for line in lines:
+        labeled = _LABELED_NAME_PATTERN.search(line)
+        if labeled:
+            return labeled.group(1).strip()
+    for line in lines[:3]:
+        if line in _NAME_STOPWORDS:
+            continue
+        if _CHINESE_NAME_PATTERN.match(line) or _ENGLISH_NAME_PATTERN.match(line):
+            return line
+    return None
+
+
+def _extract_education(lines: List[str]) -> Optional[str]:
+    for degree in _DEGREES:
+        for line in lines:
+            if degree in line and _SCHOOL_PATTERN.search(line):
+                return line
+    return None
+
+
+def pre_extract_resume_info(content: str) -> Dict[str, Optional[str]]:
+    """
+    用正则和启发式规则预提取简历信息，无法确定的字段为None
+
+    邮箱、电话等格式固定的字段基本都能在这一步得到，剩余字段再交给大模型
+    """
+    lines = [line.strip(" \t◦•·-*") for line in content.splitlines()]
+    lines = [line for line in lines if line]
+
+    info: Dict[str, Optional[str]] = {field: None for field in RESUME_FIELDS}
+    info["name"] = _extract_name(lines)
+    info["email"] = _first_match(_EMAIL_PATTERN, content)
+    info["phone"] = _first_match(_MOBILE_PATTERN, content) or _first_match(_LABELED_PHONE_PATTERN, content, 1)
+    info["education"] = _extract_education(lines)
+    info["experience"] = _first_match(_EXPERIENCE_PATTERN, content, 1)
+    info["skills"] = _first_match(_LABELED_SKILLS_PATTERN, content, 1)
+    info["position"] = _first_match(_POSITION_PATTERN, content, 1)
+    return _clean_info(info)
+
+
+def _clean_value(field: str, value: Any) -> Optional[str]:
+    if isinstance(value, list):
+        value = ", ".join(str(item).strip() for item in value if str(item).strip())
+    if value is None:
+        return None
+    value = re.sub(r"\s+", " ", str(value)).strip()
+    if not value or value.lower() in ("null", "none", "未知", "无"):
+        return None
+    limit = RESUME_FIELDS[field]
+    return value[:limit] if limit else value
+
+
+def _clean_info(info: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    return {field: _clean_value(field, info.get(field)) for field in RESUME_FIELDS}
+
+
+def _missing_fields(info: Dict[str, Optional[str]]) -> List[str]:
+    return [field for field in RESUME_FIELDS if not info.get(field)]
+
+
+class ResumeInfoExtractor:
+    """
+    简历结构化信息提取
+
+    - 先用正则/启发式规则预提取，只把仍缺失的字段交给大模型（JSON 模式）补全
+    - 提取结果按简历内容哈希缓存，同一份简历重复上传不再调用大模型
+    - 批量提取时把多份较短的简历打包到同一次请求中
+    """
+
+    def __init__(self):
+        self.cache = LRUCache(settings.RESUME_EXTRACT_CACHE_SIZE)
+        self.llm_requests = 0
+
+    async def extract(self, content: str) -> Dict[str, Optional[str]]:
+        """提取单份简历的结构化信息"""
+        return (await self.extract_many([content]))[0]
+
+    async def extract_many(self, contents: List[str]) -> List[Dict[str, Optional[str]]]:
+        """
+        批量提取简历的结构化信息，结果顺序与输入一致
+
+        未命中缓存且规则提取不完整的简历，按 RESUME_EXTRACT_BATCH_SIZE 份、
+        RESUME_EXTRACT_BATCH_CHARS 字打包，每个包调用一次大模型
+        """
+        results: List[Optional[Dict[str, Optional[str]]]] = [None] * len(contents)
+        pending = []
+        for index, content in enumerate(contents):
+            key = content_hash(content)
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[index] = dict(cached)
+                continue
+            info = pre_extract_resume_info(content)
+            if not _missing_fields(info):
+                self.cache.set(key, info)
+            else:
+                pending.append((index, key, content[:settings.RESUME_EXTRACT_MAX_CHARS]))
+            results[index] = info
+
+        batches = self._pack(pending)
+        filled = await asyncio.gather(
+            *(self._complete_batch([(results[index], text) for index, _, text in batch]) for batch in batches)
+        )
+        for batch, batch_filled in zip(batches, filled):
+            for (index, key, _), info in zip(batch, batch_filled):
+                if info is not None:
+                    results[index] = info
+                    self.cache.set(key, info)
+        return results
+
+    @staticmethod
+    def _pack(pending: list) -> List[list]:
+        """贪心打包：每个包不超过 RESUME_EXTRACT_BATCH_SIZE 份、RESUME_EXTRACT_BATCH_CHARS 字，超长简历单独一包"""
+        batches, current, current_chars = [], [], 0
+        for item in pending:
+            size = len(item[2])
+            if current and (
+                len(current) >= settings.RESUME_EXTRACT_BATCH_SIZE
+                or current_chars + size > settings.RESUME_EXTRACT_BATCH_CHARS
+            ):
+                batches.append(current)
+                current, current_chars = [], 0
+            current.append(item)
+            current_chars += size
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _complete_batch(self, items: List[tuple]) -> List[Optional[Dict[str, Optional[str]]]]:
+        """
+        一次大模型调用补全一个包内各简历缺失的字段
+
+        Returns:
+            与 items 对应的补全结果；调用失败或模型未返回的简历为None（不缓存，保留规则提取结果）
+        """
+        sections = []
+        for position, (info, text) in enumerate(items):
+            fields = "、".join(f"{field}（{FIELD_DESCRIPTIONS[field]}）" for field in _missing_fields(info))
+            sections.append(f"【简历 {position}】需要提取：{fields}\n{text}")
+
+        prompt = f"""
+你是一个专业的HR简历解析助手。下面有 {len(items)} 份简历，请分别提取每份简历后面列出的字段。
+
+注意事项：
+- 只提取列出的字段，原文中没有明确提到的字段返回null
+- 内容要简洁准确，不要编造
+- index 与【简历 N】中的编号一致
+
+请以JSON格式返回结果：
+{{
+  "resumes": [
+    {{"index": 0, "字段名": "字段值"}}
+  ]
+}}
+
+{chr(10).join(sections)}
+"""
+
+        try:
+            self.llm_requests += 1
+            response = await chat_completion(
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"},
+                temperature=0.1,
+            )
+            data = json.loads(response.choices[0].message.content)
+        except Exception as e:
+            logger.warning(f"大模型提取简历信息失败，使用规则提取结果: {e}")
+            return [None] * len(items)
+
+        extracted = {}
+        for entry in data.get("resumes") or []:
+            if isinstance(entry, dict) and str(entry.get("index", "")).isdigit():
+                extracted[int(entry["index"])] = entry
+
+        filled = []
+        for position, (info, _) in enumerate(items):
+            entry = extracted.get(position)
+            if entry is None:
+                filled.append(None)
+                continue
+            merged = dict(info)
+            for field in _missing_fields(info):
+                merged[field] = _clean_value(field, entry.get(field))
+            filled.append(merged)
+        return filled
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "llm_requests": self.llm_requests}
+
+
+# 全局实例
+resume_extractor = ResumeInfoExtractor()
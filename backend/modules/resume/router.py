@@ -3,7 +3,10 @@ from sqlalchemy.orm import Session
 from sse_starlette import EventSourceResponse
 
 from config.database import get_db
+from utils.document_parser import spool_upload
+from utils.parse_cache import parse_cache
 
+from .info_extractor import resume_extractor
 from .models import ResumeCreate, ResumeInDB, ResumeUpdate
 from .service import (
     delete_resume,
@@ -33,12 +36,30 @@ async def upload_resume_stream(file: UploadFile = File(...)):
     if not file.filename.endswith((".pdf", ".docx")):
         return EventSourceResponse(error_generator("只支持PDF和DOCX格式的文件"))
 
+    # 响应开始流式输出前上传文件就会被关闭，这里先写入临时文件
+    try:
+        file_path = await spool_upload(file)
+    except ValueError as e:
+        return EventSourceResponse(error_generator(str(e)))
+
     # 正常返回流式处理生成器
-    return EventSourceResponse(process_resume_stream(file))
+    return EventSourceResponse(process_resume_stream(file.filename, file_path))
+
+
+@router.get("/parse-cache/stats")
+async def get_parse_cache_stats():
+    """获取文档解析缓存的命中统计"""
+    return parse_cache.stats()
+
+
+@router.get("/extract-cache/stats")
+async def get_extract_cache_stats():
+    """获取简历信息提取缓存的命中统计及大模型调用次数"""
+    return resume_extractor.stats()
 
 
 @router.get("/{resume_id}", response_model=ResumeInDB)
-async def read_resume(resume_id: int, db: Session = Depends(get_db)):
+def read_resume(resume_id: int, db: Session = Depends(get_db)):
     """获取简历详情"""
     resume = get_resume(resume_id, db)
     if resume is None:
@@ -47,13 +68,13 @@ async def read_resume(resume_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=list[ResumeInDB])
-async def read_resumes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_resumes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """获取简历列表"""
     return get_resumes(skip=skip, limit=limit, db=db)
 
 
 @router.put("/{resume_id}", response_model=ResumeInDB)
-async def update_resume_info(
+def update_resume_info(
     resume_id: int, resume_update: ResumeUpdate, db: Session = Depends(get_db)
 ):
     """更新简历信息"""
@@ -65,7 +86,7 @@ async def update_resume_info(
 
 
 @router.delete("/{resume_id}")
-async def delete_resume_info(resume_id: int, db: Session = Depends(get_db)):
+def delete_resume_info(resume_id: int, db: Session = Depends(get_db)):
     """删除简历"""
     success = delete_resume(resume_id, db)
     if not success:
@@ -1,113 +1,168 @@
+import asyncio
 import json
 import os
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from config.database import SessionLocal
+from config.settings import settings
 
 # 创建数据库表
 from models.resume import Resume
-from utils.document_parser import parse_document
-from utils.jd_matcher import find_best_match
+from utils.candidate_ranking import candidate_ranking, get_open_jd_scores
 from utils.llm_mock import mock_llm_analysis
+from utils.parse_cache import parse_cache
 
+from .info_extractor import pre_extract_resume_info, resume_extractor
 
-def extract_resume_info(content: str) -> dict:
-    """从文件内容中提取简历信息（模拟实现）"""
-    # 简单的信息提取逻辑
-    info = {
-        "name": None,
-        "email": None,
-        "phone": None,
-        "education": None,
-        "experience": None,
-        "skills": None,
-        "position": None,
-    }
 
-    # 这里可以添加更复杂的解析逻辑
-    # 现在只是简单示例
-    lines = content.split("\n")
-    if lines:
-        info["name"] = lines[0].strip() if lines[0].strip() else "未知"
+async def analyze_resume(content: str) -> dict:
+    """提取简历的结构化信息（姓名、邮箱等，对应 Resume 表的字段）"""
+    if settings.RESUME_MOCK_LLM:
+        # 测试模式下不调用大模型，只使用规则提取
+        return pre_extract_resume_info(content)
+    return await resume_extractor.extract(content)
 
-    # 查找邮箱
-    for line in lines:
-        if "@" in line and "." in line:
-            info["email"] = line.strip()
-            break
 
-    return info
+async def analyze_resumes(contents: List[str]) -> List[dict]:
+    """批量提取多份简历的结构化信息，较短的简历打包到同一次大模型请求中"""
+    if settings.RESUME_MOCK_LLM:
+        return [pre_extract_resume_info(content) for content in contents]
+    return await resume_extractor.extract_many(contents)
 
 
-async def process_resume_stream(file: UploadFile):
+def _save_processed_resume(filename: str, content: str, info: dict, jd_scores) -> int:
+    """保存解析完成的简历、提取的结构化信息及其对各开放JD的匹配分，返回简历ID"""
+    best_jd, match_score = jd_scores[0] if jd_scores else (None, 0.0)
+    match_score = round(match_score, 1)
+    db = SessionLocal()
+    try:
+        # 创建简历记录
+        now = datetime.now()
+        resume_dict = {
+            "filename": filename,
+            "content": content,
+            "status": "已处理",
+            "score": match_score if match_score > 0 else 0.0,
+            "matched_jd_id": best_jd.id if best_jd else None,
+            "match_score": match_score,
+            "created_at": now,
+            "updated_at": now,
+            **info,
+        }
+
+        db_resume = Resume(**resume_dict)
+        db.add(db_resume)
+        db.flush()
+        records = candidate_ranking.save_resume_scores(db_resume.id, jd_scores, db)
+        db.commit()
+        candidate_ranking.update_resume(db_resume.id, records)
+        return db_resume.id
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _sse(payload: dict) -> str:
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+async def _analysis_stage(content: str, emit) -> dict:
+    """信息提取阶段；测试模式下先转发模拟的大模型分析进度"""
+    if settings.RESUME_MOCK_LLM:
+        async for chunk in mock_llm_analysis(content, settings.RESUME_MOCK_LLM_DELAY):
+            await emit(chunk)
+    return await analyze_resume(content)
+
+
+async def process_resume_stream(filename: str, file_path: str):
+    """
+    流式处理上传的简历，file_path 为上传文件的临时副本，处理结束后删除
+
+    解析完成后，信息提取与JD匹配只依赖解析出的文本，两个阶段并发执行，
+    各自完成时立即推送进度事件，两者都完成后保存
+    """
+    tasks = []
     try:
         # 步骤1: 读取内容
-        yield f"data: {json.dumps({'status': 'reading', 'message': '正在读取文件内容...'})}\n\n"
+        yield _sse({'status': 'reading', 'message': '正在读取文件内容...'})
 
-        # 读取文件内容
-        file_content = await file.read()
-        file_extension = os.path.splitext(file.filename)[1]
+        file_extension = os.path.splitext(filename)[1]
 
         # 解析文档内容
         try:
-            content = parse_document(file_content, file_extension)
-            yield f"data: {json.dumps({'status': 'parsed', 'message': '文件解析完成'})}\n\n"
+            content = await parse_cache.parse(file_path, file_extension)
+            yield _sse({'status': 'parsed', 'message': '文件解析完成'})
         except Exception as e:
-            yield f"data: {json.dumps({'status': 'error', 'message': f'文件解析失败: {str(e)}'})}\n\n"
+            yield _sse({'status': 'error', 'message': f'文件解析失败: {str(e)}'})
             return
 
-        # 步骤2: 用大模型分析要点
-        yield f"data: {json.dumps({'status': 'analyzing', 'message': '正在使用AI分析简历...'})}\n\n"
-
-        # 使用模拟的大模型分析
-        async for chunk in mock_llm_analysis(content):
-            yield chunk
-
-        # 步骤3: 与JD匹配
-        yield f"data: {json.dumps({'status': 'matching', 'message': '正在匹配职位描述...'})}\n\n"
-
-        # 查找最佳匹配的JD
-        best_jd, match_score = find_best_match(content)
-
-        # 保存到数据库
-        db = SessionLocal()
+        # 步骤2: 信息提取与JD匹配并发执行，事件和阶段结果统一经队列返回
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def emit(chunk: str):
+            await queue.put(("event", chunk, None))
+
+        async def run_stage(name: str, coro):
+            try:
+                await queue.put((name, await coro, None))
+            except Exception as e:
+                await queue.put((name, None, e))
+
+        tasks = [
+            asyncio.create_task(run_stage("analysis", _analysis_stage(content, emit))),
+            # 计算与所有开放JD的匹配分，最高分即最佳匹配
+            asyncio.create_task(run_stage("matching", run_in_threadpool(get_open_jd_scores, content))),
+        ]
+        yield _sse({'status': 'analyzing', 'message': '正在提取简历信息...'})
+        yield _sse({'status': 'matching', 'message': '正在匹配职位描述...'})
+
+        results = {}
+        while len(results) < len(tasks):
+            kind, value, error = await queue.get()
+            if kind == "event":
+                yield value
+                continue
+            if error is not None:
+                stage = "信息提取" if kind == "analysis" else "职位匹配"
+                yield _sse({'status': 'error', 'message': f'{stage}失败: {str(error)}'})
+                return
+            results[kind] = value
+            if kind == "analysis":
+                yield _sse({'status': 'analyzed', 'message': '简历信息提取完成', 'result': value})
+            else:
+                best_jd, best_score = value[0] if value else (None, 0.0)
+                yield _sse({
+                    'status': 'matched',
+                    'message': f'最佳匹配职位：{best_jd.title}' if best_jd else '暂无开放职位',
+                    'matched_jd_id': best_jd.id if best_jd else None,
+                    'match_score': round(best_score, 1),
+                })
+
+        # 步骤3: 保存到数据库
         try:
-            # 创建简历记录
-            now = datetime.now()
-            resume_dict = {
-                "filename": file.filename,
-                "content": content,
-                "status": "已处理",
-                "score": match_score if match_score > 0 else 0.0,
-                "matched_jd_id": best_jd.id if best_jd else None,
-                "match_score": match_score,
-                "created_at": now,
-                "updated_at": now,
-                **extract_resume_info(content),
-            }
-
-            db_resume = Resume(**resume_dict)
-            db.add(db_resume)
-            db.commit()
-            db.refresh(db_resume)
-
-            yield f"data: {json.dumps({'status': 'saved', 'message': '简历已保存到数据库', 'resume_id': db_resume.id})}\n\n"
+            resume_id = await run_in_threadpool(
+                _save_processed_resume, filename, content, results["analysis"], results["matching"]
+            )
+            yield _sse({'status': 'saved', 'message': '简历已保存到数据库', 'resume_id': resume_id})
         except Exception as e:
-            db.rollback()
-            yield f"data: {json.dumps({'status': 'error', 'message': f'数据库保存失败: {str(e)}'})}\n\n"
-        finally:
-            db.close()
+            yield _sse({'status': 'error', 'message': f'数据库保存失败: {str(e)}'})
 
         # 完成
-        yield f"data: {json.dumps({'status': 'completed', 'message': '简历处理完成'})}\n\n"
+        yield _sse({'status': 'completed', 'message': '简历处理完成'})
 
     except Exception as e:
-        yield f"data: {json.dumps({'status': 'error', 'message': f'处理过程中发生错误: {str(e)}'})}\n\n"
+        yield _sse({'status': 'error', 'message': f'处理过程中发生错误: {str(e)}'})
     finally:
+        # 出错或客户端断开时取消未完成的阶段
+        for task in tasks:
+            task.cancel()
+        os.remove(file_path)
         yield "data: [DONE]\n\n"
 
 
@@ -142,6 +197,7 @@ def delete_resume(resume_id: int, db: Session) -> bool:
     """删除简历"""
     db_resume = db.query(Resume).filter(Resume.id == resume_id).first()
     if db_resume:
+        candidate_ranking.remove_resume(resume_id, db)
         db.delete(db_resume)
         db.commit()
         return True
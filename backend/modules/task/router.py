@@ -16,7 +16,7 @@ router = APIRouter(prefix="/api/tasks", tags=["任务管理"])
 
 
 @router.post("/", response_model=TaskInDB, summary="创建任务")
-async def create_task_endpoint(
+def create_task_endpoint(
     task: TaskCreate,
     db: Session = Depends(get_db)
 ):
@@ -28,7 +28,7 @@ async def create_task_endpoint(
 
 
 @router.get("/{task_id}", response_model=TaskInDB, summary="获取任务详情")
-async def get_task_endpoint(
+def get_task_endpoint(
     task_id: int,
     db: Session = Depends(get_db)
 ):
@@ -40,7 +40,7 @@ async def get_task_endpoint(
 
 
 @router.put("/{task_id}", response_model=TaskInDB, summary="更新任务")
-async def update_task_endpoint(
+def update_task_endpoint(
     task_id: int,
     task_update: TaskUpdate,
     db: Session = Depends(get_db)
@@ -53,7 +53,7 @@ async def update_task_endpoint(
 
 
 @router.delete("/{task_id}", summary="删除任务")
-async def delete_task_endpoint(
+def delete_task_endpoint(
     task_id: int,
     db: Session = Depends(get_db)
 ):
@@ -65,7 +65,7 @@ async def delete_task_endpoint(
 
 
 @router.post("/{task_id}/assign", response_model=TaskInDB, summary="分配任务")
-async def assign_task_endpoint(
+def assign_task_endpoint(
     task_id: int,
     assignment: TaskAssign,
     db: Session = Depends(get_db)
@@ -80,7 +80,7 @@ async def assign_task_endpoint(
 
 
 @router.get("/", response_model=TaskListResponse, summary="获取任务列表")
-async def get_tasks_endpoint(
+def get_tasks_endpoint(
     assignee_id: Optional[int] = Query(None, description="指派人员ID"),
     assigner_id: Optional[int] = Query(None, description="分配者ID"),
     status: Optional[str] = Query(None, description="任务状态"),
@@ -110,7 +110,7 @@ async def get_tasks_endpoint(
 
 
 @router.get("/statistics/overview", response_model=TaskStatistics, summary="获取任务统计")
-async def get_task_statistics_endpoint(
+def get_task_statistics_endpoint(
     employee_id: Optional[int] = Query(None, description="员工ID"),
     department_id: Optional[int] = Query(None, description="部门ID"),
     db: Session = Depends(get_db)
@@ -120,7 +120,7 @@ async def get_task_statistics_endpoint(
 
 
 @router.post("/smart-assign", response_model=SmartAssignmentResponse, summary="智能任务分配")
-async def smart_assign_task_endpoint(
+def smart_assign_task_endpoint(
     request: SmartAssignmentRequest,
     db: Session = Depends(get_db)
 ):
@@ -134,7 +134,7 @@ async def smart_assign_task_endpoint(
 
 
 @router.get("/employee/{employee_id}/workload", summary="获取员工工作负载")
-async def get_employee_workload(
+def get_employee_workload(
     employee_id: int,
     db: Session = Depends(get_db)
 ):
@@ -1,13 +1,18 @@
 import json
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import Integer, and_, case, cast, extract, func, literal_column, or_
 
+from common.cache import LRUCache
+from config.database import register_table_listener
+from config.settings import settings
 from models.task import Task, TaskStatus, TaskDifficulty
 from models.employee import Employee
 from models.department import Department
 from models.capability import EmployeeSkill, Skill, SkillLevel
+from modules.capability.skill_matrix import skill_matrix
 from .models import (
     TaskCreate, TaskUpdate, TaskInDB, TaskQuery, TaskStatistics,
     TaskAssign, SmartAssignmentRequest, AssignmentCandidate, SmartAssignmentResponse
@@ -148,7 +153,7 @@ def get_tasks(query: TaskQuery, db: Session) -> Dict[str, Any]:
     db_tasks = db_query.order_by(Task.created_at.desc()).offset(offset).limit(query.page_size).all()
     
     # 构建返回数据
-    tasks = [_build_task_in_db(task, db) for task in db_tasks]
+    tasks = _build_tasks_in_db(db_tasks, db)
     
     return {
         "tasks": tasks,
@@ -161,60 +166,89 @@ def get_tasks(query: TaskQuery, db: Session) -> Dict[str, Any]:
 def get_task_statistics(db: Session, employee_id: Optional[int] = None, 
                        department_id: Optional[int] = None) -> TaskStatistics:
     """获取任务统计信息"""
-    # 构建基础查询
-    base_query = db.query(Task)
-    
+    cache_key = (employee_id or None, department_id or None)
+    statistics = _task_statistics_cache.get(cache_key)
+    if statistics is None:
+        statistics = _query_task_statistics(db, employee_id, department_id)
+        _task_statistics_cache.set(cache_key, statistics)
+    return statistics
+
+
+def _query_task_statistics(db: Session, employee_id: Optional[int],
+                           department_id: Optional[int]) -> TaskStatistics:
+    """一次聚合查询统计各状态任务数、逾期数和平均完成天数"""
+    now = datetime.now()
+    is_overdue = and_(
+        Task.due_date < now,
+        Task.status.notin_([TaskStatus.COMPLETED, TaskStatus.CANCELLED])
+    )
+    has_duration = and_(
+        Task.status == TaskStatus.COMPLETED,
+        Task.start_date.isnot(None),
+        Task.completed_at.isnot(None)
+    )
+    completion_days = _days_between(Task.start_date, Task.completed_at, db)
+    
+    query = db.query(
+        func.count(Task.id),
+        func.sum(case((Task.status == TaskStatus.PENDING, 1), else_=0)),
+        func.sum(case((Task.status == TaskStatus.IN_PROGRESS, 1), else_=0)),
+        func.sum(case((Task.status == TaskStatus.COMPLETED, 1), else_=0)),
+        func.sum(case((is_overdue, 1), else_=0)),
+        func.avg(case((has_duration, completion_days), else_=None)),
+    )
     if employee_id:
-        base_query = base_query.filter(Task.assignee_id == employee_id)
+        query = query.filter(Task.assignee_id == employee_id)
     if department_id:
-        base_query = base_query.filter(Task.department_id == department_id)
+        query = query.filter(Task.department_id == department_id)
     
-    # 统计各状态任务数量
-    total_tasks = base_query.count()
-    pending_tasks = base_query.filter(Task.status == TaskStatus.PENDING).count()
-    in_progress_tasks = base_query.filter(Task.status == TaskStatus.IN_PROGRESS).count()
-    completed_tasks = base_query.filter(Task.status == TaskStatus.COMPLETED).count()
-    
-    # 统计逾期任务
-    now = datetime.now()
-    overdue_tasks = base_query.filter(
-        and_(
-            Task.due_date < now,
-            Task.status.notin_([TaskStatus.COMPLETED, TaskStatus.CANCELLED])
-        )
-    ).count()
-    
-    # 计算平均完成时间
-    completed_with_duration = base_query.filter(
-        and_(
-            Task.status == TaskStatus.COMPLETED,
-            Task.start_date.isnot(None),
-            Task.completed_at.isnot(None)
-        )
-    ).all()
-    
-    avg_completion_time = None
-    if completed_with_duration:
-        total_duration = sum([
-            (task.completed_at - task.start_date).days 
-            for task in completed_with_duration
-        ])
-        avg_completion_time = total_duration / len(completed_with_duration)
+    total_tasks, pending_tasks, in_progress_tasks, completed_tasks, overdue_tasks, avg_days = query.one()
+    total_tasks = total_tasks or 0
+    completed_tasks = int(completed_tasks or 0)
     
     # 计算完成率
     completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
     
     return TaskStatistics(
         total_tasks=total_tasks,
-        pending_tasks=pending_tasks,
-        in_progress_tasks=in_progress_tasks,
+        pending_tasks=int(pending_tasks or 0),
+        in_progress_tasks=int(in_progress_tasks or 0),
         completed_tasks=completed_tasks,
-        overdue_tasks=overdue_tasks,
-        avg_completion_time=avg_completion_time,
+        overdue_tasks=int(overdue_tasks or 0),
+        avg_completion_time=float(avg_days) if avg_days is not None else None,
         completion_rate=completion_rate
     )
 
 
+def _days_between(start, end, db: Session):
+    """
+    两个时间列相差的整天数（SQL表达式，按数据库方言生成）
+    与 Python timedelta.days 一致向下取整：结束早于开始时 -1.5 天记为 -2，而不是截断为 -1
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        # TIMESTAMPDIFF(DAY, ...) 向零截断，按秒计算后再向下取整
+        return func.floor(func.timestampdiff(literal_column("SECOND"), start, end) / 86400)
+    if dialect == "sqlite":
+        # CAST 向零截断，负数且有小数部分时再减 1
+        days = func.julianday(end) - func.julianday(start)
+        truncated = cast(days, Integer)
+        return truncated - case((days < truncated, 1), else_=0)
+    return func.floor(extract("epoch", end - start) / 86400)
+
+
+def _clear_task_statistics_cache():
+    _task_statistics_cache.clear()
+
+
+# 任务统计结果缓存，任务表写入提交后清空
+_task_statistics_cache = LRUCache(
+    maxsize=1024 if settings.TASK_STATISTICS_CACHE_TTL > 0 else 0,
+    ttl=settings.TASK_STATISTICS_CACHE_TTL,
+)
+register_table_listener(Task.__tablename__, _clear_task_statistics_cache)
+
+
 def smart_assign_task(request: SmartAssignmentRequest, db: Session) -> SmartAssignmentResponse:
     """智能任务分配"""
     # 获取任务信息
@@ -222,49 +256,65 @@ def smart_assign_task(request: SmartAssignmentRequest, db: Session) -> SmartAssi
     if not task:
         raise ValueError("任务不存在")
     
-    # 获取所有可分配的员工
-    employees = db.query(Employee).filter(Employee.status == 0).all()  # 在职员工
+    # 获取所有可分配的员工（在职员工），按ID排序保证同分时顺序稳定
+    employees = db.query(
+        Employee.id, Employee.name, Employee.department_id
+    ).filter(Employee.status == 0).order_by(Employee.id).all()
+    if not employees:
+        return SmartAssignmentResponse(
+            task_id=task.id, task_name=task.name, candidates=[], recommendation=None
+        )
     
-    candidates = []
+    employee_ids = np.array([employee.id for employee in employees])
     
-    for employee in employees:
-        # 计算技能匹配分数
-        skill_score = _calculate_skill_match_score(task, employee, db) if request.consider_skills else 0.5
-        
-        # 计算工作负载分数
-        workload_score = _calculate_workload_score(employee, db) if request.consider_workload else 0.5
-        
-        # 计算综合分数
-        overall_score = (skill_score * 0.6 + workload_score * 0.4)
-        
-        # 获取当前任务数量
-        current_tasks = db.query(Task).filter(
-            and_(
-                Task.assignee_id == employee.id,
-                Task.status.in_([TaskStatus.ASSIGNED, TaskStatus.IN_PROGRESS])
-            )
-        ).count()
-        
-        # 生成推荐理由
-        reason = _generate_assignment_reason(skill_score, workload_score, current_tasks)
-        
-        candidate = AssignmentCandidate(
-            employee_id=employee.id,
-            employee_name=employee.name,
-            department_name=_get_department_name(employee.department_id, db),
-            skill_match_score=skill_score,
-            workload_score=workload_score,
-            overall_score=overall_score,
-            current_tasks=current_tasks,
-            reason=reason
-        )
-        candidates.append(candidate)
+    # 当前进行中的任务数量（一次分组查询）
+    active_counts = dict(
+        db.query(Task.assignee_id, func.count(Task.id))
+        .filter(Task.status.in_([TaskStatus.ASSIGNED, TaskStatus.IN_PROGRESS]))
+        .group_by(Task.assignee_id)
+        .all()
+    )
+    current_tasks = np.array([active_counts.get(employee.id, 0) for employee in employees])
     
-    # 按综合分数排序
-    candidates.sort(key=lambda x: x.overall_score, reverse=True)
+    # 计算技能匹配分数与工作负载分数
+    if request.consider_skills:
+        skill_scores = _calculate_skill_match_scores(task, employee_ids, db)
+    else:
+        skill_scores = np.full(len(employees), 0.5)
+    if request.consider_workload:
+        workload_scores = _calculate_workload_scores(current_tasks)
+    else:
+        workload_scores = np.full(len(employees), 0.5)
+    
+    # 计算综合分数
+    overall_scores = skill_scores * 0.6 + workload_scores * 0.4
+    
+    # 取前N个候选人：先部分排序筛出不低于第N名分数的员工，再对其排序（同分按员工顺序）
+    top_indices = _top_k_indices(overall_scores, request.max_candidates)
     
-    # 取前N个候选人
-    top_candidates = candidates[:request.max_candidates]
+    department_names = _get_department_names(
+        {employees[index].department_id for index in top_indices}, db
+    )
+    
+    top_candidates = []
+    for index in top_indices:
+        employee = employees[index]
+        skill_score = float(skill_scores[index])
+        workload_score = float(workload_scores[index])
+        task_count = int(current_tasks[index])
+        top_candidates.append(
+            AssignmentCandidate(
+                employee_id=employee.id,
+                employee_name=employee.name,
+                department_name=department_names.get(employee.department_id),
+                skill_match_score=skill_score,
+                workload_score=workload_score,
+                overall_score=float(overall_scores[index]),
+                current_tasks=task_count,
+                # 生成推荐理由
+                reason=_generate_assignment_reason(skill_score, workload_score, task_count)
+            )
+        )
     
     # 最佳推荐
     recommendation = top_candidates[0] if top_candidates else None
@@ -277,117 +327,127 @@ def smart_assign_task(request: SmartAssignmentRequest, db: Session) -> SmartAssi
     )
 
 
+def _top_k_indices(scores: np.ndarray, k: int) -> List[int]:
+    """按分数从高到低取前k个下标，同分时下标小的在前"""
+    if k < len(scores):
+        kth_score = np.partition(scores, len(scores) - k)[len(scores) - k]
+        selected = np.flatnonzero(scores >= kth_score)
+    else:
+        selected = np.arange(len(scores))
+    order = np.lexsort((selected, -scores[selected]))
+    return selected[order][:k].tolist()
+
+
 def _build_task_in_db(db_task: Task, db: Session) -> TaskInDB:
     """构建TaskInDB对象，包含关联信息"""
-    # 获取分配人员信息
-    assignee_name = None
-    if db_task.assignee_id:
-        assignee = db.query(Employee).filter(Employee.id == db_task.assignee_id).first()
-        if assignee:
-            assignee_name = assignee.name
-    
-    # 获取分配者信息
-    assigner_name = None
-    if db_task.assigner_id:
-        assigner = db.query(Employee).filter(Employee.id == db_task.assigner_id).first()
-        if assigner:
-            assigner_name = assigner.name
-    
-    # 获取部门信息
-    department_name = _get_department_name(db_task.department_id, db)
-    
-    return TaskInDB(
-        **db_task.__dict__,
-        assignee_name=assignee_name,
-        assigner_name=assigner_name,
-        department_name=department_name
+    return _build_tasks_in_db([db_task], db)[0]
+
+
+def _build_tasks_in_db(db_tasks: List[Task], db: Session) -> List[TaskInDB]:
+    """批量构建TaskInDB对象，人员和部门名称各用一次查询获取"""
+    employee_names = _get_employee_names(
+        {task.assignee_id for task in db_tasks} | {task.assigner_id for task in db_tasks}, db
+    )
+    department_names = _get_department_names({task.department_id for task in db_tasks}, db)
+    
+    return [
+        TaskInDB(
+            **db_task.__dict__,
+            assignee_name=employee_names.get(db_task.assignee_id),
+            assigner_name=employee_names.get(db_task.assigner_id),
+            department_name=department_names.get(db_task.department_id)
+        )
+        for db_task in db_tasks
+    ]
+
+
+def _get_employee_names(employee_ids, db: Session) -> Dict[int, str]:
+    """批量获取员工姓名"""
+    employee_ids = [employee_id for employee_id in employee_ids if employee_id]
+    if not employee_ids:
+        return {}
+    return dict(
+        db.query(Employee.id, Employee.name)
+        .filter(Employee.id.in_(employee_ids))
+        .all()
     )
 
 
-def _get_department_name(department_id: Optional[int], db: Session) -> Optional[str]:
-    """获取部门名称"""
-    if not department_id:
-        return None
-    
-    department = db.query(Department).filter(Department.id == department_id).first()
-    return department.name if department else None
+def _get_department_names(department_ids, db: Session) -> Dict[int, str]:
+    """批量获取部门名称"""
+    department_ids = [department_id for department_id in department_ids if department_id]
+    if not department_ids:
+        return {}
+    return dict(
+        db.query(Department.id, Department.name)
+        .filter(Department.id.in_(department_ids))
+        .all()
+    )
 
 
-def _calculate_skill_match_score(task: Task, employee: Employee, db: Session) -> float:
-    """计算技能匹配分数"""
+def _calculate_skill_match_scores(task: Task, employee_ids: np.ndarray, db: Session) -> np.ndarray:
+    """批量计算员工的技能匹配分数"""
+    default_scores = np.full(len(employee_ids), 0.5)
     if not task.required_skills:
-        return 0.5  # 没有技能要求时返回中等分数
+        return default_scores  # 没有技能要求时返回中等分数
     
     try:
         required_skills = json.loads(task.required_skills)
     except:
-        return 0.5
+        return default_scores
     
     if not required_skills:
-        return 0.5
+        return default_scores
     
-    # 获取员工技能
-    employee_skills = db.query(EmployeeSkill).filter(
-        EmployeeSkill.employee_id == employee.id
-    ).all()
+    # 一次查出要求的技能
+    skill_names = {required_skill.get("name", "") for required_skill in required_skills}
+    skill_ids = dict(
+        db.query(Skill.name, Skill.id).filter(Skill.name.in_(skill_names)).all()
+    )
     
-    if not employee_skills:
-        return 0.1  # 没有技能记录
+    # 从员工技能矩阵取出要求技能的等级分数（员工 × 技能，0 表示没有该技能）
+    skill_columns = {skill_id: j for j, skill_id in enumerate(skill_ids.values())}
+    level_scores = skill_matrix.levels(employee_ids, skill_columns).astype(float)
+    has_skills = skill_matrix.has_any_skill(employee_ids)
     
     # 计算匹配分数
-    total_score = 0
-    matched_skills = 0
+    total_scores = np.zeros(len(employee_ids))
+    matched_skills = np.zeros(len(employee_ids), dtype=int)
     
     for required_skill in required_skills:
-        skill_name = required_skill.get("name", "")
-        required_level = required_skill.get("level", "C")
+        skill_id = skill_ids.get(required_skill.get("name", ""))
+        if skill_id is None:
+            continue
         
-        # 查找对应的技能
-        skill = db.query(Skill).filter(Skill.name == skill_name).first()
-        if not skill:
+        # 员工是否有这个技能
+        actual_scores = level_scores[:, skill_columns[skill_id]]
+        has_skill = actual_scores > 0
+        if not has_skill.any():
             continue
         
-        # 查找员工是否有这个技能
-        emp_skill = next((es for es in employee_skills if es.skill_id == skill.id), None)
-        if emp_skill:
-            # 计算等级匹配分数
-            required_score = EmployeeSkill.get_level_score_static(SkillLevel(required_level))
-            actual_score = emp_skill.get_level_score()
-            
-            if actual_score >= required_score:
-                total_score += 1.0  # 完全匹配
-            else:
-                total_score += actual_score / required_score  # 部分匹配
-            
-            matched_skills += 1
-    
-    if matched_skills == 0:
-        return 0.1
-    
-    return min(total_score / len(required_skills), 1.0)
-
-
-def _calculate_workload_score(employee: Employee, db: Session) -> float:
-    """计算工作负载分数（分数越高表示负载越轻）"""
-    # 获取当前进行中的任务数量
-    current_tasks = db.query(Task).filter(
-        and_(
-            Task.assignee_id == employee.id,
-            Task.status.in_([TaskStatus.ASSIGNED, TaskStatus.IN_PROGRESS])
+        # 计算等级匹配分数：达到要求为完全匹配，否则按比例部分匹配
+        required_score = EmployeeSkill.get_level_score_static(
+            SkillLevel(required_skill.get("level", "C"))
         )
-    ).count()
-    
-    # 根据任务数量计算负载分数
-    if current_tasks == 0:
-        return 1.0
-    elif current_tasks <= 2:
-        return 0.8
-    elif current_tasks <= 4:
-        return 0.6
-    elif current_tasks <= 6:
-        return 0.4
-    else:
-        return 0.2
+        partial_scores = np.where(
+            actual_scores >= required_score, 1.0, actual_scores / required_score
+        )
+        total_scores += np.where(has_skill, partial_scores, 0.0)
+        matched_skills += has_skill
+    
+    scores = np.minimum(total_scores / len(required_skills), 1.0)
+    # 没有技能记录或没有匹配到任何技能
+    scores[(matched_skills == 0) | ~has_skills] = 0.1
+    return scores
+
+
+def _calculate_workload_scores(current_tasks: np.ndarray) -> np.ndarray:
+    """根据进行中任务数量计算工作负载分数（分数越高表示负载越轻）"""
+    return np.select(
+        [current_tasks == 0, current_tasks <= 2, current_tasks <= 4, current_tasks <= 6],
+        [1.0, 0.8, 0.6, 0.4],
+        default=0.2,
+    )
 
 
 def _generate_assignment_reason(skill_score: float, workload_score: float, current_tasks: int) -> str:
@@ -0,0 +1,137 @@
+"""
+数据库阻塞调用并发基准测试
+
+对比两种路由写法在并发请求下的吞吐：
+- before: async def 路由内直接调用同步 Session（阻塞事件循环）
+- after:  当前的 def 路由（由线程池执行）
+
+默认使用临时 sqlite 数据库，并通过 QUERY_LATENCY 给每条 SQL 注入固定延迟来模拟 MySQL 网络往返。
+也可以通过 DATABASE_URL 指向真实数据库（注意会写入测试数据）。
+
+运行方式（在 backend 目录下）：
+    python tests/db_concurrency_bench.py
+    QUERY_LATENCY=0.005 CONCURRENCY=1,8,32 python tests/db_concurrency_bench.py
+"""
+
+import asyncio
+import functools
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.gettempdir(), 'aihr_db_bench.db')}",
+)
+
+import anyio
+import httpx
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+from app import app
+from config.database import Base, SessionLocal, engine
+from config.settings import settings
+from models.jd import JobDescription
+from models.task import Task
+
+QUERY_LATENCY = float(os.getenv("QUERY_LATENCY", "0.01"))
+CONCURRENCY = [int(c) for c in os.getenv("CONCURRENCY", "1,4,16,32").split(",")]
+REQUESTS = int(os.getenv("REQUESTS", "64"))
+PATHS = ["/api/jd/", "/api/tasks/"]
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _inject_latency(conn, cursor, statement, parameters, context, executemany):
+    # 模拟数据库网络往返，阻塞当前线程
+    time.sleep(QUERY_LATENCY)
+
+
+def seed_data(count: int = 20):
+    # init_db 未注册任务表，这里补建基准测试需要的表
+    Base.metadata.create_all(bind=engine, tables=[Task.__table__])
+    db = SessionLocal()
+    try:
+        if db.query(JobDescription).count() >= count:
+            return
+        for i in range(count):
+            db.add(
+                JobDescription(
+                    title=f"基准测试职位{i}",
+                    location="上海",
+                    description="用于并发基准测试",
+                    requirements="无",
+                )
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def build_before_app() -> FastAPI:
+    """把基准路由包装回 async def，复现同步查询阻塞事件循环的写法"""
+    before = FastAPI()
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or route.path not in PATHS:
+            continue
+
+        def make_endpoint(endpoint):
+            @functools.wraps(endpoint)
+            async def async_endpoint(*args, **kwargs):
+                return endpoint(*args, **kwargs)
+
+            return async_endpoint
+
+        before.add_api_route(
+            route.path,
+            make_endpoint(route.endpoint),
+            methods=list(route.methods),
+            response_model=route.response_model,
+        )
+    return before
+
+
+async def run_level(target: FastAPI, path: str, concurrency: int) -> float:
+    """以指定并发数发送 REQUESTS 个请求，返回每秒请求数"""
+    transport = httpx.ASGITransport(app=target)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one():
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(REQUESTS)))
+        return REQUESTS / (time.perf_counter() - start)
+
+
+async def main():
+    # ASGITransport 不触发 lifespan，这里手动设置线程池大小
+    anyio.to_thread.current_default_thread_limiter().total_tokens = (
+        settings.DB_THREADPOOL_SIZE
+    )
+    seed_data()
+    before = build_before_app()
+
+    print(f"数据库: {engine.url.render_as_string(hide_password=True)}")
+    print(f"每条SQL注入延迟: {QUERY_LATENCY * 1000:.1f}ms, 每组请求数: {REQUESTS}")
+    print(f"{'接口':<14}{'并发':>6}{'before req/s':>16}{'after req/s':>16}{'提升':>8}")
+    for path in PATHS:
+        for concurrency in CONCURRENCY:
+            before_rps = await run_level(before, path, concurrency)
+            after_rps = await run_level(app, path, concurrency)
+            print(
+                f"{path:<14}{concurrency:>6}{before_rps:>16.1f}{after_rps:>16.1f}"
+                f"{after_rps / before_rps:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
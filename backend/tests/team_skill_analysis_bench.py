@@ -0,0 +1,178 @@
+"""
+团队技能分析基准测试
+
+对比 get_team_skill_analysis 的两种实现：
+- before: 每项技能一条 COUNT 查询（带全部员工ID的 IN 列表），技能差距分析再重复统计一遍
+- after:  当前实现，一次分组查询统计覆盖情况，技能差距和建议复用该结果
+
+默认使用临时 sqlite 数据库，可以通过 DATABASE_URL 指向真实数据库（注意会写入测试数据）。
+
+运行方式（在 backend 目录下）：
+    python tests/team_skill_analysis_bench.py
+    SKILLS=500 EMPLOYEES=5000 SKILLS_PER_EMPLOYEE=8 python tests/team_skill_analysis_bench.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.gettempdir(), 'aihr_team_skill_bench.db')}",
+)
+
+from sqlalchemy import and_, event
+
+from config.database import Base, SessionLocal, engine
+from models.capability import EmployeeSkill, Skill, SkillCategory, SkillLevel
+from models.employee import Employee
+from modules.capability.service import (
+    _generate_skill_recommendations,
+    get_team_skill_analysis,
+)
+
+SKILLS = int(os.getenv("SKILLS", "500"))
+EMPLOYEES = int(os.getenv("EMPLOYEES", "5000"))
+SKILLS_PER_EMPLOYEE = int(os.getenv("SKILLS_PER_EMPLOYEE", "8"))
+ROUNDS = int(os.getenv("ROUNDS", "3"))
+
+query_count = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_queries(conn, cursor, statement, parameters, context, executemany):
+    global query_count
+    query_count += 1
+
+
+def seed_data():
+    # init_db 未注册能力管理相关的表，这里补建
+    Base.metadata.create_all(
+        bind=engine, tables=[Skill.__table__, EmployeeSkill.__table__]
+    )
+    db = SessionLocal()
+    try:
+        if db.query(Skill).count() >= SKILLS and db.query(Employee).count() >= EMPLOYEES:
+            return
+        random.seed(42)
+        categories = list(SkillCategory)
+        levels = list(SkillLevel)
+        db.bulk_insert_mappings(
+            Skill,
+            [
+                {
+                    "name": f"基准技能{i}",
+                    "category": categories[i % len(categories)],
+                    "is_active": 1,
+                }
+                for i in range(SKILLS)
+            ],
+        )
+        db.bulk_insert_mappings(
+            Employee,
+            [
+                {"name": f"员工{i}", "position": "工程师", "status": 0}
+                for i in range(EMPLOYEES)
+            ],
+        )
+        db.commit()
+
+        skill_ids = [skill_id for (skill_id,) in db.query(Skill.id)]
+        employee_ids = [employee_id for (employee_id,) in db.query(Employee.id)]
+        # 技能热度不均匀，让覆盖率分布更接近真实数据
+        weights = [1.0 / (rank + 1) for rank in range(len(skill_ids))]
+        rows = []
+        for employee_id in employee_ids:
+            picked = set(random.choices(skill_ids, weights=weights, k=SKILLS_PER_EMPLOYEE))
+            rows.extend(
+                {"employee_id": employee_id, "skill_id": skill_id, "level": random.choice(levels)}
+                for skill_id in picked
+            )
+        db.bulk_insert_mappings(EmployeeSkill, rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _coverage_before(employees, db):
+    all_skills = db.query(Skill).filter(Skill.is_active == 1).all()
+    coverage = []
+    for skill in all_skills:
+        skilled_employees = db.query(EmployeeSkill).filter(
+            and_(
+                EmployeeSkill.skill_id == skill.id,
+                EmployeeSkill.employee_id.in_([emp.id for emp in employees]),
+            )
+        ).count()
+        coverage_rate = (skilled_employees / len(employees)) * 100 if employees else 0
+        coverage.append({
+            "skill_id": skill.id,
+            "skill_name": skill.name,
+            "category": skill.category.value,
+            "skilled_employees": skilled_employees,
+            "total_employees": len(employees),
+            "coverage_rate": coverage_rate,
+        })
+    return sorted(coverage, key=lambda x: x["coverage_rate"], reverse=True)
+
+
+def team_skill_analysis_before(db):
+    """改造前的实现：覆盖情况统计两遍，每遍每项技能一条查询"""
+    employees = db.query(Employee).filter(Employee.status == 0).all()
+    skill_coverage = _coverage_before(employees, db)
+    gaps = [
+        {
+            "skill_name": skill_info["skill_name"],
+            "current_coverage": skill_info["coverage_rate"],
+            "gap_severity": "高" if skill_info["coverage_rate"] < 20 else "中",
+            "recommended_action": "需要培训或招聘",
+        }
+        for skill_info in _coverage_before(employees, db)
+        if skill_info["coverage_rate"] < 50
+    ]
+    return skill_coverage, gaps, _generate_skill_recommendations(skill_coverage, gaps)
+
+
+def team_skill_analysis_after(db):
+    analysis = get_team_skill_analysis(None, db)
+    return analysis.skill_coverage, analysis.skill_gaps, analysis.recommendations
+
+
+def bench(name, func):
+    global query_count
+    durations = []
+    result = None
+    for _ in range(ROUNDS):
+        db = SessionLocal()
+        try:
+            query_count = 0
+            start = time.perf_counter()
+            result = func(db)
+            durations.append(time.perf_counter() - start)
+        finally:
+            db.close()
+    print(f"{name:<8} 平均耗时 {sum(durations) / len(durations) * 1000:10.1f} ms  查询数 {query_count}")
+    return result
+
+
+def main():
+    seed_data()
+    print(f"技能 {SKILLS} 项 × 员工 {EMPLOYEES} 人，每人约 {SKILLS_PER_EMPLOYEE} 项技能，{ROUNDS} 轮")
+    before = bench("before", team_skill_analysis_before)
+    after = bench("after", team_skill_analysis_after)
+
+    def counts(coverage):
+        return {item["skill_id"]: item["skilled_employees"] for item in coverage}
+
+    assert counts(before[0]) == counts(after[0]), "覆盖统计结果不一致"
+    assert len(before[1]) == len(after[1]), "技能差距结果不一致"
+    assert before[2] == after[2], "改进建议不一致"
+    print("结果一致")
+
+
+if __name__ == "__main__":
+    main()
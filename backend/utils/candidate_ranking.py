@@ -0,0 +1,302 @@
+import threading
+from bisect import bisect_left, insort
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from common.logger import logger
+from config.database import SessionLocal
+from config.settings import settings
+from models.jd import JobDescription
+from models.resume import JDScoreState, Resume, ResumeJDScore
+from utils.jd_matcher import jd_match_index, jd_text_version
+
+# 匹配分保留的小数位（排名用，比 Resume.match_score 更细）
+_SCORE_DIGITS = 3
+
+# JD重新打分时每批读取的简历数
+_RESCORE_BATCH_SIZE = 500
+
+
+class _JDRanking:
+    """单个JD的候选人排名：按 (-分数, 简历ID) 有序的列表 + 简历ID到分数的映射"""
+
+    __slots__ = ("version", "corpus_version", "scored_at", "entries", "scores")
+
+    def __init__(
+        self, version: str, corpus_version: str, scored_at: datetime, scores: Dict[int, float]
+    ):
+        self.version = version
+        self.corpus_version = corpus_version
+        self.scored_at = scored_at
+        self.scores = scores
+        self.entries: List[Tuple[float, int]] = sorted(
+            (-score, resume_id) for resume_id, score in scores.items()
+        )
+
+    def upsert(self, resume_id: int, score: float):
+        self.remove(resume_id)
+        self.scores[resume_id] = score
+        insort(self.entries, (-score, resume_id))
+
+    def remove(self, resume_id: int):
+        old_score = self.scores.pop(resume_id, None)
+        if old_score is None:
+            return
+        index = bisect_left(self.entries, (-old_score, resume_id))
+        if index < len(self.entries) and self.entries[index] == (-old_score, resume_id):
+            del self.entries[index]
+
+
+class CandidateRanking:
+    """
+    按JD维护的候选人排名索引
+
+    resume_jd_scores 表保存每个 (简历, JD) 的匹配分，内存中按JD懒加载成有序列表，
+    分页查询直接切片。每条分数记录打分时JD匹配文本的版本号，jd_score_states 记录该JD
+    最近一次对全部简历打分时的版本：
+    - JD文本或评分标准变化后版本号不一致，下次查询时对该JD重新打分
+    - 其他开放JD增删改只会让 IDF 漂移，继续返回已有排名，并在后台重新打分，
+      同一JD的后台重算间隔不小于 CANDIDATE_RANKING_REFRESH_INTERVAL 秒，且同一时间只重算一个JD
+    重新打分只持有该JD的锁，期间其他JD的查询和简历入库不受阻塞
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        # 保护 _rankings / _jd_locks / _pending / _refreshing，只在内存操作时短暂持有
+        self._lock = threading.Lock()
+        self._rankings: Dict[int, _JDRanking] = {}
+        self._jd_locks: Dict[int, threading.Lock] = {}
+        # 正在加载的JD：加载期间到达的简历变更 [(简历ID, 版本号, 分数)]，分数为None表示移除
+        self._pending: Dict[int, List[Tuple[int, Optional[str], Optional[float]]]] = {}
+        # 已提交后台重算、尚未完成的JD
+        self._refreshing: Set[int] = set()
+        self._refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ranking-refresh")
+
+    def _rescore_jd(self, jd: JobDescription, version: str, db: Session) -> _JDRanking:
+        """对所有简历重新计算与该JD的匹配分，写回分数表并记录打分状态"""
+        # 先取语料版本再打分：打分期间语料变化时记录的是旧版本，之后会再次后台重算
+        corpus_version = jd_match_index.corpus_version()
+        scores: Dict[int, float] = {}
+        max_resume_id = 0
+        batch: List[Tuple[int, str]] = []
+        for row in db.query(Resume.id, Resume.content).yield_per(_RESCORE_BATCH_SIZE):
+            max_resume_id = max(max_resume_id, row.id)
+            batch.append((row.id, row.content))
+            if len(batch) >= _RESCORE_BATCH_SIZE:
+                scores.update(self._score_batch(jd, batch))
+                batch = []
+        if batch:
+            scores.update(self._score_batch(jd, batch))
+
+        # 流式读取结束后再写库：只替换已扫描过的简历的记录，之后新入库简历写入的记录保留
+        scored_at = datetime.now()
+        try:
+            db.query(ResumeJDScore).filter(
+                ResumeJDScore.jd_id == jd.id, ResumeJDScore.resume_id <= max_resume_id
+            ).delete(synchronize_session=False)
+            db.bulk_insert_mappings(
+                ResumeJDScore,
+                [
+                    {"resume_id": resume_id, "jd_id": jd.id, "score": score, "jd_version": version}
+                    for resume_id, score in scores.items()
+                ],
+            )
+            db.merge(
+                JDScoreState(
+                    jd_id=jd.id,
+                    jd_version=version,
+                    corpus_version=corpus_version,
+                    scored_at=scored_at,
+                )
+            )
+            db.commit()
+        except IntegrityError:
+            # 与并发入库的简历冲突，本次不落库，打分状态不变，下次加载时重新打分
+            db.rollback()
+            logger.warning(f"JD {jd.id} 匹配分写库冲突，仅更新内存排名")
+        return _JDRanking(version, corpus_version, scored_at, scores)
+
+    def _score_batch(
+        self, jd: JobDescription, batch: List[Tuple[int, str]]
+    ) -> Dict[int, float]:
+        batch_scores = jd_match_index.score_jd(jd, (content for _, content in batch))
+        scores = {}
+        for (resume_id, _), score in zip(batch, batch_scores):
+            score = round(float(score), _SCORE_DIGITS)
+            # 不相关的简历不入库
+            if score > 0:
+                scores[resume_id] = score
+        return scores
+
+    def _load(self, jd: JobDescription, version: str, db: Session) -> _JDRanking:
+        state = db.get(JDScoreState, jd.id)
+        if state is None or state.jd_version != version:
+            logger.info(f"JD {jd.id} 匹配文本已变化或尚未打分，重新计算候选人排名")
+            return self._rescore_jd(jd, version, db)
+        rows = (
+            db.query(ResumeJDScore.resume_id, ResumeJDScore.score)
+            .filter(ResumeJDScore.jd_id == jd.id, ResumeJDScore.jd_version == version)
+            .all()
+        )
+        return _JDRanking(
+            version,
+            state.corpus_version,
+            state.scored_at,
+            {row.resume_id: row.score for row in rows},
+        )
+
+    def _jd_lock(self, jd_id: int) -> threading.Lock:
+        with self._lock:
+            return self._jd_locks.setdefault(jd_id, threading.Lock())
+
+    def _install(self, jd_id: int, load: Callable[[], _JDRanking]) -> _JDRanking:
+        """在持有该JD锁的情况下加载排名，补上加载期间入库或删除的简历后替换内存排名"""
+        with self._lock:
+            self._pending[jd_id] = []
+        try:
+            ranking = load()
+        finally:
+            with self._lock:
+                pending = self._pending.pop(jd_id)
+        with self._lock:
+            for resume_id, record_version, score in pending:
+                if score is None:
+                    ranking.remove(resume_id)
+                elif record_version == ranking.version:
+                    ranking.upsert(resume_id, score)
+            self._rankings[jd_id] = ranking
+        return ranking
+
+    def _get_ranking(self, jd: JobDescription, db: Session) -> _JDRanking:
+        version = jd_text_version(jd)
+        ranking = self._rankings.get(jd.id)
+        if ranking is None or ranking.version != version:
+            with self._jd_lock(jd.id):
+                ranking = self._rankings.get(jd.id)
+                if ranking is None or ranking.version != version:
+                    ranking = self._install(jd.id, lambda: self._load(jd, version, db))
+        self._schedule_refresh(jd.id, ranking)
+        return ranking
+
+    def _schedule_refresh(self, jd_id: int, ranking: _JDRanking):
+        """IDF 已漂移且距上次全量打分超过间隔时，提交后台重算"""
+        if ranking.corpus_version == jd_match_index.corpus_version():
+            return
+        if (datetime.now() - ranking.scored_at).total_seconds() < self.refresh_interval:
+            return
+        with self._lock:
+            if jd_id in self._refreshing:
+                return
+            self._refreshing.add(jd_id)
+        self._refresher.submit(self._refresh, jd_id)
+
+    def _refresh(self, jd_id: int):
+        db = SessionLocal()
+        try:
+            jd = db.get(JobDescription, jd_id)
+            if jd is None:
+                return
+            version = jd_text_version(jd)
+            with self._jd_lock(jd_id):
+                logger.info(f"开放JD语料已变化，后台重新计算 JD {jd_id} 的候选人排名")
+                self._install(jd_id, lambda: self._rescore_jd(jd, version, db))
+        except Exception as e:
+            logger.error(f"后台重新计算 JD {jd_id} 的候选人排名失败: {e}")
+        finally:
+            db.close()
+            with self._lock:
+                self._refreshing.discard(jd_id)
+
+    def get_page(
+        self, jd: JobDescription, skip: int, limit: int, db: Session
+    ) -> Tuple[int, List[Tuple[int, float]]]:
+        """获取JD候选人排名的一页，返回 (总数, [(简历ID, 分数)])"""
+        ranking = self._get_ranking(jd, db)
+        entries = ranking.entries[skip : skip + limit]
+        return len(ranking.entries), [(resume_id, -score) for score, resume_id in entries]
+
+    def save_resume_scores(
+        self,
+        resume_id: int,
+        jd_scores: List[Tuple[JobDescription, float]],
+        db: Session,
+    ) -> List[Tuple[int, str, float]]:
+        """
+        写入一份简历对各开放JD的匹配分（不提交事务）
+        返回 [(JD ID, JD版本号, 分数)]，事务提交后交给 update_resume 更新内存排名
+        """
+        db.query(ResumeJDScore).filter(ResumeJDScore.resume_id == resume_id).delete(
+            synchronize_session=False
+        )
+        records = []
+        for jd, score in jd_scores:
+            score = round(float(score), _SCORE_DIGITS)
+            if score > 0:
+                records.append((jd.id, jd_text_version(jd), score))
+        db.bulk_insert_mappings(
+            ResumeJDScore,
+            [
+                {"resume_id": resume_id, "jd_id": jd_id, "score": score, "jd_version": version}
+                for jd_id, version, score in records
+            ],
+        )
+        return records
+
+    def update_resume(self, resume_id: int, records: List[Tuple[int, str, float]]):
+        """简历打分入库后增量更新已加载的JD排名"""
+        scored_jds = set()
+        with self._lock:
+            for jd_id, version, score in records:
+                scored_jds.add(jd_id)
+                if jd_id in self._pending:
+                    self._pending[jd_id].append((resume_id, version, score))
+                ranking = self._rankings.get(jd_id)
+                # 版本号不一致说明JD已变化，等下次查询时整体重算
+                if ranking is not None and ranking.version == version:
+                    ranking.upsert(resume_id, score)
+            for jd_id, ranking in self._rankings.items():
+                if jd_id not in scored_jds:
+                    ranking.remove(resume_id)
+            for jd_id, pending in self._pending.items():
+                if jd_id not in scored_jds:
+                    pending.append((resume_id, None, None))
+
+    def remove_resume(self, resume_id: int, db: Session):
+        """删除简历的所有匹配分（不提交事务）"""
+        db.query(ResumeJDScore).filter(ResumeJDScore.resume_id == resume_id).delete(
+            synchronize_session=False
+        )
+        with self._lock:
+            for ranking in self._rankings.values():
+                ranking.remove(resume_id)
+            for pending in self._pending.values():
+                pending.append((resume_id, None, None))
+
+    def remove_jd(self, jd_id: int, db: Session):
+        """删除JD的所有匹配分及打分状态（不提交事务）"""
+        db.query(ResumeJDScore).filter(ResumeJDScore.jd_id == jd_id).delete(
+            synchronize_session=False
+        )
+        db.query(JDScoreState).filter(JDScoreState.jd_id == jd_id).delete(
+            synchronize_session=False
+        )
+        with self._lock:
+            self._rankings.pop(jd_id, None)
+            self._jd_locks.pop(jd_id, None)
+
+
+    def shutdown(self):
+        self._refresher.shutdown(wait=False, cancel_futures=True)
+
+
+candidate_ranking = CandidateRanking(settings.CANDIDATE_RANKING_REFRESH_INTERVAL)
+
+
+def get_open_jd_scores(resume_content: str) -> List[Tuple[JobDescription, float]]:
+    """计算简历与所有开放JD的匹配分，按分数从高到低排列"""
+    jds, scores = jd_match_index.score(resume_content)
+    return sorted(zip(jds, scores.tolist()), key=lambda item: item[1], reverse=True)
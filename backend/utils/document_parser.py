@@ -1,45 +1,138 @@
+import os
+import tempfile
 from io import BytesIO
-from typing import Optional
+from typing import BinaryIO, Iterator, Optional, Union
 
 import docx
 import PyPDF2
 
 from common.logger import logger
+from config.settings import settings
 
+# 文件路径或二进制文件对象
+DocumentSource = Union[str, BinaryIO]
 
-def parse_pdf(content: bytes) -> str:
-    """解析PDF文件内容"""
+# 上传文件落盘时每次读取的字节数
+_UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _normalize_extension(file_extension: str) -> str:
+    return file_extension.lower().lstrip(".")
+
+
+def iter_pdf_pages(source: DocumentSource) -> Iterator[str]:
+    """逐页提取PDF文本"""
+    if isinstance(source, str):
+        # 传入文件句柄，PyPDF2 按需 seek 读取，不会把整个文件读进内存
+        with open(source, "rb") as f:
+            yield from iter_pdf_pages(f)
+        return
     try:
-        pdf_reader = PyPDF2.PdfReader(BytesIO(content))
-        text = ""
+        pdf_reader = PyPDF2.PdfReader(source)
         for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text
+            yield page.extract_text() or ""
     except Exception as e:
         raise ValueError(f"PDF解析失败: {str(e)}")
 
 
-def parse_docx(content: bytes) -> str:
-    """解析DOCX文件内容"""
+def iter_docx_paragraphs(source: DocumentSource) -> Iterator[str]:
+    """逐段提取DOCX文本"""
     try:
-        doc = docx.Document(BytesIO(content))
-        text = ""
+        doc = docx.Document(source)
         for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+            yield paragraph.text
     except Exception as e:
         raise ValueError(f"DOCX解析失败: {str(e)}")
 
 
+def iter_text_lines(source: DocumentSource) -> Iterator[str]:
+    """逐行读取UTF-8文本文件"""
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            yield from iter_text_lines(f)
+        return
+    try:
+        for line in source:
+            yield line.decode("utf-8").rstrip("\r\n")
+    except UnicodeDecodeError as e:
+        logger.error(f"文件解析失败: {str(e)}")
+        raise ValueError("不支持的文件格式: 文本不是UTF-8编码")
+
+
+def iter_document(
+    source: DocumentSource,
+    file_extension: str,
+    max_pages: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    按页（PDF）、段落（DOCX）或行（文本）流式提取文档内容
+    超过页数或字符数上限时截断并停止解析
+    """
+    extension = _normalize_extension(file_extension)
+    max_pages = settings.PARSE_MAX_PAGES if max_pages is None else max_pages
+    max_chars = settings.PARSE_MAX_CHARS if max_chars is None else max_chars
+
+    if extension == "pdf":
+        chunks = iter_pdf_pages(source)
+    elif extension == "docx":
+        chunks = iter_docx_paragraphs(source)
+    else:
+        chunks = iter_text_lines(source)
+
+    total_chars = 0
+    for index, chunk in enumerate(chunks):
+        if extension == "pdf" and max_pages and index >= max_pages:
+            logger.warning(f"PDF页数超过上限 {max_pages}，后续页面不再解析")
+            break
+        if max_chars and total_chars + len(chunk) > max_chars:
+            if total_chars < max_chars:
+                yield chunk[: max_chars - total_chars]
+            logger.warning(f"文档字符数超过上限 {max_chars}，已截断")
+            break
+        total_chars += len(chunk) + 1
+        yield chunk
+
+
+def parse_document_file(source: DocumentSource, file_extension: str) -> str:
+    """解析文件路径或文件对象中的文档内容"""
+    return "\n".join(iter_document(source, file_extension))
+
+
+def parse_pdf(content: bytes) -> str:
+    """解析PDF文件内容"""
+    return parse_document_file(BytesIO(content), "pdf")
+
+
+def parse_docx(content: bytes) -> str:
+    """解析DOCX文件内容"""
+    return parse_document_file(BytesIO(content), "docx")
+
+
 def parse_document(file_content: bytes, file_extension: str) -> str:
     """根据文件扩展名解析文档内容"""
-    if file_extension.lower() == ".pdf" or file_extension.lower() == "pdf":
-        return parse_pdf(file_content)
-    elif file_extension.lower() == ".docx" or file_extension.lower() == "docx":
-        return parse_docx(file_content)
-    else:
-        try:
-            return file_content.decode("utf-8")
-        except Exception as e:
-            logger.error(f"文件解析失败: {str(e)}")
-            raise ValueError(f"不支持的文件格式: {file_extension}")
+    return parse_document_file(BytesIO(file_content), file_extension)
+
+
+async def spool_upload(upload, max_bytes: Optional[int] = None) -> str:
+    """
+    把上传文件分块写入临时文件并返回路径，超过大小上限时抛出 ValueError
+    调用方负责在解析完成后删除临时文件
+    """
+    max_bytes = settings.PARSE_MAX_FILE_BYTES if max_bytes is None else max_bytes
+    suffix = os.path.splitext(upload.filename or "")[1]
+    fd, path = tempfile.mkstemp(prefix="aihr_upload_", suffix=suffix)
+    try:
+        written = 0
+        with os.fdopen(fd, "wb") as f:
+            while chunk := await upload.read(_UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if max_bytes and written > max_bytes:
+                    raise ValueError(
+                        f"文件大小超过上限 {max_bytes // (1024 * 1024)}MB"
+                    )
+                f.write(chunk)
+        return path
+    except BaseException:
+        os.remove(path)
+        raise
@@ -1,8 +1,200 @@
-from typing import List, Optional, Tuple
+import json
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
 
-from config.database import SessionLocal
+import numpy as np
+
+from config.database import SessionLocal, register_table_listener
+from config.settings import settings
 from models.jd import JobDescription
 
+# 中文按连续汉字切分后取二元组，英文/数字按词切分（保留 c++、c#、node.js 这类写法）
+_TOKEN_PATTERN = re.compile(r"[一-鿿]+|[a-z][a-z0-9+#.]*|\d+")
+
+# BM25 参数
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """中英文混合分词：汉字二元组 + 英文单词"""
+    tokens = []
+    for match in _TOKEN_PATTERN.findall(text.lower()):
+        if "一" <= match[0] <= "鿿":
+            if len(match) == 1:
+                tokens.append(match)
+            else:
+                tokens.extend(match[i : i + 2] for i in range(len(match) - 1))
+        else:
+            tokens.append(match.rstrip("."))
+    return tokens
+
+
+def _hash_terms(text: str, dimension: int) -> Counter:
+    """分词后把词项哈希到固定维度，返回 {维度下标: 词频}"""
+    return Counter(zlib.crc32(token.encode("utf-8")) % dimension for token in tokenize(text))
+
+
+def _criteria_terms(evaluation_criteria: Optional[str]) -> str:
+    """评分标准中的维度名与选项名（如技能名）也参与匹配"""
+    if not evaluation_criteria:
+        return ""
+    try:
+        rules = json.loads(evaluation_criteria)
+    except (TypeError, json.JSONDecodeError):
+        return ""
+
+    terms = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                terms.append(str(key))
+                walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+        elif isinstance(node, str):
+            terms.append(node)
+
+    walk(rules)
+    return " ".join(terms)
+
+
+def _jd_text(jd: JobDescription) -> str:
+    """参与匹配的JD文本：职位描述 + 评分标准"""
+    if jd.full_text:
+        parts = [jd.title, jd.full_text]
+    else:
+        parts = [jd.title, jd.description, jd.requirements]
+    parts.append(_criteria_terms(jd.evaluation_criteria))
+    return "\n".join(part for part in parts if part)
+
+
+def jd_text_version(jd: JobDescription) -> str:
+    """JD匹配文本的版本号，文本或评分标准变化时改变"""
+    return f"{zlib.crc32(_jd_text(jd).encode('utf-8')):08x}"
+
+
+class JDMatchIndex:
+    """
+    开放JD的向量索引
+
+    每个JD按 BM25 词频饱和 × IDF 加权后做L2归一化，存成一个 (JD数, 维度) 的矩阵；
+    简历向量化后与矩阵做一次矩阵-向量乘法即得到对所有JD的余弦相似度。
+    JD表有写入时标记失效，下次匹配时重建
+    """
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self._lock = threading.Lock()
+        self._dirty = True
+        # (jds, matrix, idf, 平均文档长度, 语料版本号) 作为整体替换，读取时无需加锁
+        self._snapshot: Tuple[List[JobDescription], np.ndarray, np.ndarray, float, str] = (
+            [],
+            np.zeros((0, dimension), dtype=np.float32),
+            np.ones(dimension, dtype=np.float32),
+            1.0,
+            "",
+        )
+
+    def invalidate(self):
+        self._dirty = True
+
+    def _jd_vector(
+        self, counts: Counter, idf: np.ndarray, avg_length: float
+    ) -> np.ndarray:
+        """JD向量：BM25词频饱和 × IDF，L2归一化"""
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        if not counts:
+            return vector
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * tf.sum() / avg_length)
+        vector[indices] = tf * (_BM25_K1 + 1) / (tf + norm) * idf[indices]
+        length = np.linalg.norm(vector)
+        return vector / length if length > 0 else vector
+
+    def _build(self, jds: List[JobDescription]):
+        term_counts = [_hash_terms(_jd_text(jd), self.dimension) for jd in jds]
+
+        # 文档频率与平滑IDF
+        df = np.zeros(self.dimension, dtype=np.float32)
+        for counts in term_counts:
+            df[list(counts)] += 1
+        idf = (np.log((len(jds) + 1) / (df + 1)) + 1).astype(np.float32)
+
+        doc_lengths = [sum(counts.values()) for counts in term_counts]
+        avg_length = float(np.mean(doc_lengths)) if jds else 1.0
+        avg_length = avg_length or 1.0
+
+        matrix = np.zeros((len(jds), self.dimension), dtype=np.float32)
+        for row, counts in enumerate(term_counts):
+            matrix[row] = self._jd_vector(counts, idf, avg_length)
+
+        corpus = ",".join(sorted(f"{jd.id}:{jd_text_version(jd)}" for jd in jds))
+        corpus_version = f"{zlib.crc32(corpus.encode('utf-8')):08x}"
+        self._snapshot = (jds, matrix, idf, avg_length, corpus_version)
+
+    def _ensure_fresh(self):
+        if not self._dirty:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            # 先清除标记再读库，重建期间的新写入会再次标记失效
+            self._dirty = False
+            try:
+                self._build(get_open_jds())
+            except Exception:
+                self._dirty = True
+                raise
+
+    def _resume_terms(
+        self, text: str, idf: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """简历的稀疏向量：对数词频 × IDF，L2归一化，返回 (下标, 权重)"""
+        counts = _hash_terms(text or "", self.dimension)
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        weights = (1 + np.log(tf)) * idf[indices]
+        norm = np.linalg.norm(weights)
+        return indices, (weights / norm if norm > 0 else weights)
+
+    def corpus_version(self) -> str:
+        """当前开放JD语料（决定 IDF 和平均文档长度）的版本号，用于判断已存匹配分的 IDF 是否过时"""
+        self._ensure_fresh()
+        return self._snapshot[4]
+
+    def score(self, resume_content: str) -> Tuple[List[JobDescription], np.ndarray]:
+        """计算简历与所有开放JD的匹配分（0-10）"""
+        self._ensure_fresh()
+        jds, matrix, idf, _, _ = self._snapshot
+        if not jds:
+            return jds, np.zeros(0, dtype=np.float32)
+        indices, weights = self._resume_terms(resume_content, idf)
+        return jds, matrix[:, indices] @ weights * 10
+
+    def score_jd(self, jd: JobDescription, resume_texts: Iterable[str]) -> np.ndarray:
+        """计算单个JD（可以是已关闭的JD）与一批简历的匹配分（0-10）"""
+        self._ensure_fresh()
+        _, _, idf, avg_length, _ = self._snapshot
+        jd_vector = self._jd_vector(
+            _hash_terms(_jd_text(jd), self.dimension), idf, avg_length
+        )
+        scores = []
+        for text in resume_texts:
+            indices, weights = self._resume_terms(text, idf)
+            scores.append(float(jd_vector[indices] @ weights) * 10)
+        return np.array(scores, dtype=np.float32)
+
+
+jd_match_index = JDMatchIndex(settings.JD_MATCHER_DIMENSION)
+register_table_listener(JobDescription.__tablename__, jd_match_index.invalidate)
+
 
 def get_open_jds() -> List[JobDescription]:
     """获取所有未关闭的JD"""
@@ -15,28 +207,20 @@ def get_open_jds() -> List[JobDescription]:
 
 
 def calculate_match_score(resume_content: str, jd: JobDescription) -> float:
-    """计算简历与JD的匹配度分数（模拟实现）"""
-    # 这里应该实现实际的匹配算法
-    # 目前使用简单的模拟逻辑
-    import random
-
-    return round(random.uniform(0, 10), 1)
+    """计算简历与单个JD的匹配度分数（0-10）"""
+    return round(float(jd_match_index.score_jd(jd, [resume_content])[0]), 1)
 
 
 def find_best_match(resume_content: str) -> Tuple[Optional[JobDescription], float]:
     """找到最佳匹配的JD"""
-    open_jds = get_open_jds()
+    open_jds, scores = jd_match_index.score(resume_content)
 
     if not open_jds:
         return None, 0.0
 
-    best_jd = None
-    best_score = 0.0
-
-    for jd in open_jds:
-        score = calculate_match_score(resume_content, jd)
-        if score > best_score:
-            best_score = score
-            best_jd = jd
+    best_index = int(np.argmax(scores))
+    best_score = round(float(scores[best_index]), 1)
+    if best_score <= 0:
+        return None, 0.0
 
-    return best_jd, best_score
+    return open_jds[best_index], best_score
@@ -3,8 +3,8 @@ import json
 from typing import AsyncGenerator
 
 
-async def mock_llm_analysis(content: str) -> AsyncGenerator[str, None]:
-    """模拟大模型分析过程，流式返回结果"""
+async def mock_llm_analysis(content: str, delay: float = 0.5) -> AsyncGenerator[str, None]:
+    """模拟大模型分析过程，流式返回结果（仅供测试，delay 为每步等待秒数）"""
     # 模拟分析步骤
     steps = [
         {"status": "开始解析简历内容", "progress": 10},
@@ -17,7 +17,7 @@ async def mock_llm_analysis(content: str) -> AsyncGenerator[str, None]:
 
     for step in steps:
         # 模拟处理时间
-        await asyncio.sleep(0.5)
+        await asyncio.sleep(delay)
 
         # 生成模拟的分析结果
         if step["progress"] == 100:
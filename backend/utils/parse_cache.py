@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Union
+
+from fastapi.concurrency import run_in_threadpool
+
+from common.cache import LRUCache
+from common.logger import logger
+from config.settings import settings
+from utils.parse_executor import parse_executor
+
+
+class DiskParseCache:
+    """
+    解析结果的磁盘缓存：每个文档一个 JSON 文件，
+    总大小超过上限时按最近访问时间淘汰最旧的文件，解析时间超过 max_age 秒的文件视为过期删除
+
+    缓存文件包含简历全文，目录只对当前用户可读写
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_age: float = 0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory) and self.max_bytes > 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        return bool(self.max_age) and time.time() - entry.get("parsed_at", 0) > self.max_age
+
+    def _scan(self):
+        """首次使用时删除过期文件，并统计已有缓存文件的总大小"""
+        if self._total_bytes is not None:
+            return
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            stat = entry.stat()
+            # 文件修改时间不早于解析时间，修改时间已过期的文件一定过期
+            if self.max_age and time.time() - stat.st_mtime > self.max_age:
+                try:
+                    os.remove(entry.path)
+                    continue
+                except OSError:
+                    pass
+            total += stat.st_size
+        self._total_bytes = total
+
+    def _remove(self, path: str):
+        size = os.path.getsize(path)
+        os.remove(path)
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if self._expired(entry):
+                self._remove(path)
+                self.misses += 1
+                return None
+            # 更新访问时间，用于淘汰
+            os.utime(path)
+            self.hits += 1
+            return entry
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+    def set(self, key: str, entry: Dict[str, Any]):
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self._scan()
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self._total_bytes += len(data) - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """淘汰最近最少访问的文件，直到总大小降到上限的90%"""
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        total = sum(entry.stat().st_size for entry in entries)
+        target = self.max_bytes * 0.9
+        for entry in entries:
+            if total <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+            except OSError:
+                continue
+        self._total_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "directory": self.directory,
+            "bytes": self._total_bytes or 0,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class ParseCache:
+    """
+    文档解析结果缓存，按文件内容的 SHA-256 寻址
+    内存 LRU 一级缓存 + 磁盘二级缓存，重复上传的文件直接复用解析结果
+    """
+
+    def __init__(self, memory_items: int, disk_directory: str, disk_max_bytes: int,
+                 disk_max_age: float = 0):
+        self.memory = LRUCache(memory_items)
+        self.disk = DiskParseCache(disk_directory, disk_max_bytes, disk_max_age)
+        self.parses = 0
+
+    @staticmethod
+    def _key(digest: str, file_extension: str) -> str:
+        # 解析结果受页数、字数上限影响，上限变化后旧的截断结果不再命中
+        return (
+            f"{digest}.{file_extension.lower().lstrip('.')}"
+            f".p{settings.PARSE_MAX_PAGES}.c{settings.PARSE_MAX_CHARS}"
+        )
+
+    async def parse(
+        self,
+        source: Union[str, bytes],
+        file_extension: str,
+        digest: Optional[str] = None,
+    ) -> str:
+        """
+        解析文档，命中缓存时跳过解析
+        source 为临时文件路径或文件内容；digest 为内容的 SHA-256，未提供时自动计算
+        """
+        if digest is None:
+            digest = await run_in_threadpool(sha256_of, source)
+        key = self._key(digest, file_extension)
+
+        entry = self.memory.get(key)
+        if entry is None and self.disk.enabled:
+            entry = await run_in_threadpool(self.disk.get, key)
+            if entry is not None:
+                self.memory.set(key, entry)
+        if entry is not None:
+            return entry["text"]
+
+        text = await parse_executor.parse(source, file_extension)
+        self.parses += 1
+        entry = {
+            "text": text,
+            "sha256": digest,
+            "extension": file_extension.lower().lstrip("."),
+            "chars": len(text),
+            "parsed_at": time.time(),
+        }
+        self.memory.set(key, entry)
+        if self.disk.enabled:
+            try:
+                await run_in_threadpool(self.disk.set, key, entry)
+            except OSError as e:
+                logger.warning(f"写入解析缓存失败: {e}")
+        return text
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats(),
+            "parses": self.parses,
+        }
+
+
+def sha256_of(source: Union[str, bytes]) -> str:
+    """计算文件路径或内容的 SHA-256"""
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    with open(source, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+parse_cache = ParseCache(
+    memory_items=settings.PARSE_CACHE_MEMORY_ITEMS,
+    disk_directory=settings.PARSE_CACHE_DIR,
+    disk_max_bytes=settings.PARSE_CACHE_DISK_MAX_BYTES,
+    disk_max_age=settings.PARSE_CACHE_DISK_MAX_AGE,
+)
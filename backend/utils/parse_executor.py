@@ -0,0 +1,169 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from typing import List, Optional, Union
+
+from fastapi.concurrency import run_in_threadpool
+
+from common.logger import logger
+from config.settings import settings
+from utils.document_parser import parse_document, parse_document_file
+
+
+def _parse_in_worker(source: Union[str, bytes], file_extension: str) -> str:
+    """在解析进程中执行：source 为临时文件路径或文件内容"""
+    if isinstance(source, bytes):
+        return parse_document(source, file_extension)
+    return parse_document_file(source, file_extension)
+
+
+def _worker_main(conn):
+    """解析进程主循环：逐个接收 (source, file_extension)，返回 (是否成功, 文本或异常)"""
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        try:
+            conn.send((True, _parse_in_worker(*task)))
+        except Exception as e:
+            try:
+                conn.send((False, e))
+            except Exception:
+                # 异常对象无法序列化时只传回错误信息
+                conn.send((False, ValueError(str(e))))
+
+
+class _WorkerHung(Exception):
+    """解析进程在超时时间内未返回结果"""
+
+
+class _WorkerDied(Exception):
+    """解析进程异常退出（如解析库崩溃）"""
+
+
+class _ParseWorker:
+    """单个解析进程及其通信管道，同一时间只处理一个文档"""
+
+    def __init__(self):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.parsed = 0
+
+    def run(self, source: Union[str, bytes], file_extension: str, timeout: Optional[float]) -> str:
+        """
+        在该进程中解析文档，计时从文档交给进程时开始，不包含排队时间
+        超时抛出 _WorkerHung，进程异常退出抛出 _WorkerDied，解析出错时抛出解析异常
+        """
+        try:
+            self.conn.send((source, file_extension))
+            if not self.conn.poll(timeout):
+                raise _WorkerHung
+            ok, result = self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise _WorkerDied from e
+        self.parsed += 1
+        if not ok:
+            raise result
+        return result
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=1)
+        self.conn.close()
+
+
+class DocumentParseExecutor:
+    """
+    文档解析进程池
+
+    - PDF/DOCX 文本提取是CPU密集操作，放到独立进程中执行，不阻塞事件循环
+    - 同时解析的文档数不超过进程数，排队中的文档不计入超时
+    - 单个文档解析超时后只终止并替换处理它的进程，其他进程上的文档不受影响
+    - 每个进程累计解析 recycle_after 个文档后换新进程，释放解析库累积的内存
+    """
+
+    def __init__(self, max_workers: int, timeout: float, recycle_after: int):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.recycle_after = recycle_after
+        self._lock = threading.Lock()
+        self._idle: List[_ParseWorker] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self._loop = loop
+        return self._semaphore
+
+    def _checkout(self) -> _ParseWorker:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return _ParseWorker()
+
+    def _checkin(self, worker: _ParseWorker):
+        with self._lock:
+            # 等待方被取消时可能临时多启动进程，空闲进程不超过 max_workers
+            if len(self._idle) < self.max_workers and not (
+                self.recycle_after and worker.parsed >= self.recycle_after
+            ):
+                self._idle.append(worker)
+                return
+        worker.close()
+
+    def _run(self, source: Union[str, bytes], file_extension: str) -> str:
+        worker = self._checkout()
+        try:
+            result = worker.run(source, file_extension, self.timeout or None)
+        except _WorkerHung:
+            logger.warning(f"文档解析超过 {self.timeout} 秒，终止该解析进程")
+            worker.kill()
+            raise ValueError(f"文档解析超时（{self.timeout}秒）")
+        except _WorkerDied:
+            worker.kill()
+            raise ValueError("文档解析进程异常退出")
+        except Exception:
+            # 解析本身出错，进程仍可继续使用
+            self._checkin(worker)
+            raise
+        self._checkin(worker)
+        return result
+
+    async def parse(self, source: Union[str, bytes], file_extension: str) -> str:
+        """
+        在进程池中解析文档，source 为临时文件路径或文件内容
+        解析失败抛出 ValueError
+        """
+        async with self._get_semaphore():
+            return await run_in_threadpool(self._run, source, file_extension)
+
+    def shutdown(self):
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.close()
+
+
+parse_executor = DocumentParseExecutor(
+    max_workers=settings.PARSE_WORKERS,
+    timeout=settings.PARSE_TIMEOUT,
+    recycle_after=settings.PARSE_RECYCLE_AFTER,
+)
@@ -168,7 +168,9 @@ export const polishJDTextStream = async (
     originalText: string,
     onProgress?: (data: { message: string; progress?: number }) => void,
     onComplete?: (polishedText: string) => void,
-    onError?: (error: string) => void
+    onError?: (error: string) => void,
+    onDelta?: (content: string) => void,  // 逐段返回润色文本
+    signal?: AbortSignal  // 中止时断开连接，后端随之中止大模型请求
 ): Promise<void> => {
     const baseURL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
@@ -178,7 +180,8 @@ export const polishJDTextStream = async (
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ original_text: originalText })
+            body: JSON.stringify({ original_text: originalText }),
+            signal
         });
 
         if (!response.ok) {
@@ -238,6 +241,14 @@ export const polishJDTextStream = async (
                                 return;
                             }
 
+                            // 处理润色文本片段
+                            if (eventData.event === 'delta') {
+                                if (onDelta && eventData.data?.content) {
+                                    onDelta(eventData.data.content);
+                                }
+                                continue;
+                            }
+
                             // 处理进度事件
                             if (eventData.event === 'progress' || eventData.event === 'start') {
                                 if (onProgress && eventData.data) {
@@ -281,6 +292,10 @@ export const polishJDTextStream = async (
             reader.releaseLock();
         }
     } catch (error) {
+        // 主动中止不视为错误
+        if (error instanceof DOMException && error.name === 'AbortError') {
+            return;
+        }
         const message = error instanceof Error ? error.message : '润色请求失败';
         if (onError) {
             onError(message);
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Modal, Input, Button, message, Spin, Divider, Card, Typography, Space, Tabs, Progress, Select } from 'antd';
 import { StarOutlined, EditOutlined, EyeOutlined, CopyOutlined, BankOutlined } from '@ant-design/icons';
 import ReactMarkdown from 'react-markdown';
@@ -27,6 +27,7 @@ const JDCreateModal: React.FC<JDCreateModalProps> = ({ visible, onCancel, onSucc
     const [departments, setDepartments] = useState<Department[]>([]);
     const [selectedDepartmentId, setSelectedDepartmentId] = useState<number | undefined>();
     const [loadingDepartments, setLoadingDepartments] = useState(false);
+    const polishAbortRef = useRef<AbortController | null>(null);
 
     // 重置状态
     useEffect(() => {
@@ -38,9 +39,14 @@ const JDCreateModal: React.FC<JDCreateModalProps> = ({ visible, onCancel, onSucc
             setPolishMessage('');
             setSelectedDepartmentId(undefined);
             loadDepartments();
+        } else {
+            // 关闭弹窗时中止进行中的润色
+            polishAbortRef.current?.abort();
         }
     }, [visible]);
 
+    useEffect(() => () => polishAbortRef.current?.abort(), []);
+
     // 加载部门列表
     const loadDepartments = async () => {
         setLoadingDepartments(true);
@@ -65,6 +71,12 @@ const JDCreateModal: React.FC<JDCreateModalProps> = ({ visible, onCancel, onSucc
         setPolishing(true);
         setPolishProgress(0);
         setPolishMessage('');
+        setPolishedText('');
+
+        polishAbortRef.current?.abort();
+        const controller = new AbortController();
+        polishAbortRef.current = controller;
+        let receivedDelta = false;
 
         try {
             await polishJDTextStream(
@@ -87,12 +99,24 @@ const JDCreateModal: React.FC<JDCreateModalProps> = ({ visible, onCancel, onSucc
                 (error) => {
                     message.error(`润色失败: ${error}`);
                     console.error('Polish error:', error);
-                }
+                },
+                // onDelta：边生成边展示
+                (content) => {
+                    setPolishedText((prev) => prev + content);
+                    if (!receivedDelta) {
+                        receivedDelta = true;
+                        setActiveTab('polished');
+                    }
+                },
+                controller.signal
             );
         } catch (error) {
             message.error('润色失败，请重试');
             console.error('Polish error:', error);
         } finally {
+            if (polishAbortRef.current === controller) {
+                polishAbortRef.current = null;
+            }
             setPolishing(false);
             setPolishProgress(0);
             setPolishMessage('');
@@ -67,33 +67,36 @@ const ResumeEvaluator: React.FC<ResumeEvaluatorProps> = ({ jdId, jdTitle, onCanc
                 file,
                 (step: EvaluationStep) => {
                     if (step.step === 0 && step.steps) {
-                        // 初始化任务列表
+                        // 初始化任务列表（后端并发打分，所有步骤同时开始）
                         const initialTasks: TaskState[] = step.steps.map((s, index) => ({
-                            id: index + 1,
+                            id: s.id ?? index + 1,
                             title: s.name,
                             description: s.desc,
-                            status: 'pending'
+                            status: 'running',
+                            startTime: Date.now()
                         }));
                         setTasks(initialTasks);
                     } else if (step.step > 0) {
-                        // 更新任务状态
-                        setTasks(prev => prev.map(task => {
-                            if (task.id === step.step) {
-                                return {
-                                    ...task,
-                                    status: step.score !== undefined ? 'completed' : 'running',
-                                    result: step,
-                                    startTime: task.startTime || Date.now(),
-                                    endTime: step.score !== undefined ? Date.now() : undefined
-                                };
-                            } else if (task.id < step.step) {
-                                return { ...task, status: 'completed' };
-                            }
-                            return task;
-                        }));
+                        // 更新任务状态（步骤结果按完成顺序到达，按 step 字段归位）
+                        setTasks(prev => {
+                            const next = prev.map(task => {
+                                if (task.id === step.step) {
+                                    return {
+                                        ...task,
+                                        status: step.score !== undefined ? 'completed' : 'running',
+                                        result: step,
+                                        startTime: task.startTime || Date.now(),
+                                        endTime: step.score !== undefined ? Date.now() : undefined
+                                    };
+                                }
+                                return task;
+                            });
+                            const completed = next.filter(task => task.status === 'completed').length;
+                            setOverallProgress((completed / (next.length || 1)) * 100);
+                            return next;
+                        });
 
                         setCurrentTaskId(step.step);
-                        setOverallProgress((step.step / (tasks.length || 1)) * 100);
 
                         // 自动展开当前正在执行的任务
                         if (step.score !== undefined) {